@@ -1,56 +1,147 @@
-
+from sqlalchemy import select, func, literal, union_all, and_
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.orm import Session
 from models import Contrato, Pago, EstadoContrato, EstadoPago
+from indexacion import obtener_serie, monto_vigente, IPCIncompleto
 from datetime import date, datetime
 import calendar
 
-def generar_cuotas_mensuales(db: Session, periodo: str = None):
+# Límite de periodos por corrida (SQLite admite hasta 500 SELECT en un UNION ALL)
+MAX_PERIODOS_POR_CORRIDA = 240
+
+
+def parsear_periodo(periodo: str):
+    """
+    Convierte un periodo 'YYYY-MM' en la tupla (year, month).
+    Lanza ValueError si el formato no es válido.
+    """
+    try:
+        year, month = map(int, periodo.split('-'))
+        date(year, month, 1)
+    except (ValueError, AttributeError):
+        raise ValueError(f"Periodo inválido '{periodo}'. Formato esperado: YYYY-MM")
+    return year, month
+
+
+def periodo_actual() -> str:
+    """
+    Periodo 'YYYY-MM' del mes en curso.
+    """
+    hoy = date.today()
+    return f"{hoy.year}-{hoy.month:02d}"
+
+
+def rango_periodos(desde: str, hasta: str = None):
+    """
+    Devuelve la lista de periodos 'YYYY-MM' entre desde y hasta (ambos inclusive).
+    """
+    year, month = parsear_periodo(desde)
+    year_fin, month_fin = parsear_periodo(hasta or desde)
+    if (year_fin, month_fin) < (year, month):
+        raise ValueError(f"El periodo final '{hasta}' es anterior al inicial '{desde}'")
+
+    periodos = []
+    while (year, month) <= (year_fin, month_fin):
+        periodos.append(f"{year}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    if len(periodos) > MAX_PERIODOS_POR_CORRIDA:
+        raise ValueError(f"El rango supera el máximo de {MAX_PERIODOS_POR_CORRIDA} periodos por corrida")
+    return periodos
+
+
+def _periodos_cte(periodos):
+    """
+    Arma una tabla derivada (periodo, inicio_mes, fin_mes) para cruzar contra los contratos.
+    """
+    filas = []
+    for periodo in periodos:
+        year, month = parsear_periodo(periodo)
+        ultimo_dia = calendar.monthrange(year, month)[1]
+        filas.append(select(
+            literal(periodo).label("periodo"),
+            literal(date(year, month, 1)).label("inicio_mes"),
+            literal(date(year, month, ultimo_dia)).label("fin_mes"),
+        ))
+    return union_all(*filas).cte("periodos") if len(filas) > 1 else filas[0].cte("periodos")
+
+
+def generar_cuotas_mensuales(db: Session, periodo: str = None, hasta: str = None, sin_ipc: dict = None):
     """
     Genera automáticamente las cuotas de pago para todos los contratos activos del periodo dado.
     Si no se especifica periodo, usa el mes actual (YYYY-MM).
+    Si se indica 'hasta', genera todo el rango periodo..hasta en una sola pasada.
+
+    Las cuotas faltantes (contrato, periodo) se calculan con un único anti-join y se insertan
+    en un solo INSERT por lotes. Solo se consideran los periodos dentro de la vigencia del contrato.
+    Las cuotas cuyo ajuste por IPC cae en meses todavía sin índice cargado no se generan (se
+    generan en una corrida posterior, una vez cargado el IPC).
+    Devuelve la tupla (generados, existentes). Si se pasa el dict sin_ipc, se completa con
+    {"cuotas": cantidad omitida por falta de IPC, "ipc_faltante": periodos de IPC que faltan}.
     """
-    if not periodo:
-        today = date.today()
-        periodo = f"{today.year}-{today.month:02d}"
-    
-    print(f"🔄 Iniciando generación de cuotas para el periodo: {periodo}")
-    
-    # 1. Obtener contratos activos
-    contratos_activos = db.query(Contrato).filter(Contrato.estado == EstadoContrato.ACTIVO).all()
-    count_generados = 0
-    count_existentes = 0
-    
-    for contrato in contratos_activos:
-        # Verificar vigencia del contrato para este periodo
-        # Omitimos lógica compleja de dias por ahora, asumimos que si está activo, paga el mes.
-        
-        # 2. Verificar si ya existe pago para este periodo
-        pago_existente = db.query(Pago).filter(
-            Pago.contrato_id == contrato.id,
-            Pago.periodo == periodo
-        ).first()
-        
-        if pago_existente:
-            count_existentes += 1
-            print(f"  ℹ️ Contrato {contrato.id}: Cuota {periodo} ya existe (ID Pago: {pago_existente.id})")
-            continue
-            
-        # 3. Crear nuevo pago
-        # NOTA: Aquí podríamos usar lógica de indexación si tuvieramos historial de actualizaciones
-        # Por ahora usamos monto_inicial como monto vigente.
-        nuevo_pago = Pago(
-            contrato_id=contrato.id,
-            periodo=periodo,
-            monto_alquiler=contrato.monto_inicial, # Debería ser monto_actual si existiera esa columna
-            monto_expensas=0,
-            monto_servicios=0,
-            estado=EstadoPago.PENDIENTE,
-            # fecha_pago se deja en None hasta que paguen
+    periodos = rango_periodos(periodo or periodo_actual(), hasta)
+    print(f"🔄 Iniciando generación de cuotas para: {periodos[0]}" + (f" a {periodos[-1]}" if len(periodos) > 1 else ""))
+
+    per = _periodos_cte(periodos)
+    vigentes = and_(
+        Contrato.estado == EstadoContrato.ACTIVO,
+        Contrato.fecha_inicio <= per.c.fin_mes,
+        Contrato.fecha_fin >= per.c.inicio_mes,
+    )
+
+    # 1. Total de pares (contrato, periodo) que deberían tener cuota
+    total = db.execute(
+        select(func.count()).select_from(Contrato).join(per, vigentes)
+    ).scalar()
+
+    # 2. Pares sin cuota: anti-join contra pagos (con las reglas de ajuste de cada contrato)
+    faltantes = db.execute(
+        select(
+            Contrato.id, per.c.periodo, Contrato.monto_inicial,
+            Contrato.proxima_actualizacion, Contrato.porcentaje_actualizacion, Contrato.meses_actualizacion,
         )
-        
-        db.add(nuevo_pago)
-        count_generados += 1
-        print(f"  ✅ Contrato {contrato.id}: Generada cuota {periodo} por ${contrato.monto_inicial}")
-        
+        .join(per, vigentes)
+        .outerjoin(Pago, and_(Pago.contrato_id == Contrato.id, Pago.periodo == per.c.periodo))
+        .where(Pago.id.is_(None))
+    ).all()
+
+    # 3. Insertar todas las cuotas nuevas en un solo executemany
+    # El alquiler de cada cuota sale del motor de indexación (serie IPC cacheada, O(1) por fila).
+    # ON CONFLICT DO NOTHING sobre (contrato_id, periodo): si otro proceso generó la misma cuota
+    # entre el anti-join y el INSERT, se ignora en lugar de duplicarla.
+    count_generados = 0
+    omitidas, ipc_faltante = 0, set()
+    if faltantes:
+        serie = obtener_serie(db)
+        filas = []
+        for contrato_id, periodo_cuota, monto, proxima, porcentaje, meses in faltantes:
+            try:
+                monto_alquiler = monto_vigente(serie, periodo_cuota, monto, proxima, porcentaje, meses)
+            except IPCIncompleto as e:
+                omitidas += 1
+                ipc_faltante.update(e.faltantes)
+                continue
+            filas.append({
+                "contrato_id": contrato_id,
+                "periodo": periodo_cuota,
+                "monto_alquiler": monto_alquiler,
+                "monto_expensas": 0,
+                "monto_servicios": 0,
+                "monto_mora": 0,
+                "estado": EstadoPago.PENDIENTE,
+                # fecha_pago se deja en None hasta que paguen
+            })
+        if filas:
+            resultado = db.execute(
+                insert(Pago.__table__).on_conflict_do_nothing(index_elements=["contrato_id", "periodo"]), filas
+            )
+            count_generados = resultado.rowcount
+
     db.commit()
+    count_existentes = total - count_generados - omitidas
+    print(f"  ✅ Cuotas generadas: {count_generados} (ya existían: {count_existentes})")
+    if omitidas:
+        print(f"  ⚠️ Cuotas sin generar por falta de IPC: {omitidas} (faltan: {', '.join(sorted(ipc_faltante))})")
+    if sin_ipc is not None:
+        sin_ipc.update(cuotas=omitidas, ipc_faltante=sorted(ipc_faltante))
     return count_generados, count_existentes
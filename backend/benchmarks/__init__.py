@@ -0,0 +1,14 @@
+"""
+Benchmarks de OIKOS sobre una base grande (ver generar_datos_sinteticos.py).
+
+Mide los motores de automatización (cuotas y mora), los endpoints de listado y detalle y la
+importación del Excel. Reporta p50/p95/max y filas/s, guarda los resultados en JSON y los
+compara contra una línea base con un umbral de regresión.
+
+Uso (desde backend/):
+    python -m benchmarks --db sintetico.db
+    python -m benchmarks --db sintetico.db --guardar-baseline
+    python -m benchmarks --db sintetico.db --baseline benchmarks/baseline.json --umbral 0.2
+
+Los casos que escriben en la base corren sobre una copia temporal: el archivo original no se modifica.
+"""
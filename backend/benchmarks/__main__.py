@@ -0,0 +1,136 @@
+"""
+Ejecuta los benchmarks: python -m benchmarks --db sintetico.db [opciones]
+"""
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import closing
+from datetime import date, datetime
+
+from benchmarks.medicion import comparar
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DEFAULT = os.path.join(DIRECTORIO, "baseline.json")
+
+
+def _copiar_base(origen: str, destino: str):
+    """
+    Copia consistente de la base (API de backup de SQLite: incluye lo que esté en el WAL).
+    """
+    with closing(sqlite3.connect(origen)) as fuente, closing(sqlite3.connect(destino)) as copia:
+        fuente.backup(copia)
+
+
+def _imprimir(resultados: dict):
+    print(f"\n{'caso':<38}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'filas/s':>12}")
+    for caso, r in resultados.items():
+        if r.get("omitido"):
+            print(f"{caso:<38}  ⏭️ omitido: {r['omitido']}")
+            continue
+        filas_s = f"{r['filas_s']:,.0f}" if r["filas_s"] else "-"
+        print(f"{caso:<38}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['max_ms']:>10.1f}{filas_s:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks de OIKOS sobre una base grande.")
+    parser.add_argument("--db", required=True, help="Base SQLite generada con generar_datos_sinteticos.py (no se modifica)")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Mediciones por caso (default: 5)")
+    parser.add_argument("--casos", help="Filtro de casos con comodines, separados por coma (ej: 'api_*,mora_*')")
+    parser.add_argument("--excel", default=os.path.join("..", "OIKOS_Datos_Maestros.xlsx"), help="Planilla para el caso de importación")
+    parser.add_argument("--hoy", help="Fecha de cálculo de la mora YYYY-MM-DD (default: hoy)")
+    parser.add_argument("--salida", default=os.path.join(DIRECTORIO, "resultados.json"), help="Archivo JSON de resultados")
+    parser.add_argument("--baseline", default=BASELINE_DEFAULT, help="Resultados de referencia a comparar")
+    parser.add_argument("--umbral", type=float, default=0.20, help="Regresión tolerada sobre el p50 (default: 0.20 = +20%%)")
+    parser.add_argument("--guardar-baseline", action="store_true", help="Guarda estos resultados como la nueva referencia")
+    args = parser.parse_args()
+    if args.repeticiones < 1:
+        parser.error("--repeticiones debe ser al menos 1")
+    if not os.path.exists(args.db):
+        parser.error(f"No existe la base {args.db} (generarla con generar_datos_sinteticos.py)")
+    hoy = date.fromisoformat(args.hoy) if args.hoy else date.today()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        # Los casos de cuotas y mora escriben: se trabaja sobre una copia
+        copia = os.path.join(directorio, "benchmark.db")
+        print(f"📋 Copiando {args.db} a una base de trabajo...")
+        _copiar_base(args.db, copia)
+        os.environ["OIKOS_DATABASE_URL"] = f"sqlite:///{copia}"
+        os.environ["OIKOS_PLANIFICADOR"] = "0"
+        # Las repeticiones piden la misma URL: con el cache HTTP se mediría el LRU y no el endpoint
+        os.environ["OIKOS_CACHE_HTTP"] = "0"
+
+        from benchmarks.casos import CASOS, Entorno
+
+        filtros = [f.strip() for f in args.casos.split(",")] if args.casos else ["*"]
+        seleccionados = [(n, f) for n, f in CASOS if any(fnmatch.fnmatch(n, patron) for patron in filtros)]
+        if not seleccionados:
+            parser.error(f"Ningún caso coincide con {args.casos}")
+
+        entorno = Entorno(args.excel, hoy)
+        print(f"📊 Base: {entorno.total_pagos:,} pagos, {entorno.total_contratos:,} contratos")
+        resultados = {}
+        try:
+            for nombre, caso in seleccionados:
+                print(f"⏱️ {nombre}...", flush=True)
+                inicio = time.perf_counter()
+                resultados[nombre] = caso(entorno, args.repeticiones)
+                resultados[nombre]["segundos_totales"] = round(time.perf_counter() - inicio, 2)
+        finally:
+            entorno.cerrar()
+
+    _imprimir(resultados)
+
+    reporte = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "db": os.path.abspath(args.db),
+        "pagos": entorno.total_pagos,
+        "contratos": entorno.total_contratos,
+        "repeticiones": args.repeticiones,
+        "entorno": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "plataforma": platform.platform(),
+        },
+        "resultados": resultados,
+    }
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(reporte, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Resultados en {args.salida}")
+
+    if args.guardar_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False)
+        print(f"📌 Guardado como baseline en {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("ℹ️ Sin baseline para comparar (usar --guardar-baseline)")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        base = json.load(f)
+    if base.get("pagos") not in (None, entorno.total_pagos):
+        print(f"⚠️ La baseline se midió con {base.get('pagos'):,} pagos y esta base tiene {entorno.total_pagos:,}: la comparación es orientativa")
+
+    regresiones = 0
+    print(f"\n{'caso':<38}{'base p50':>10}{'p50':>10}{'variación':>11}")
+    for caso, anterior, actual, variacion, es_regresion in comparar(resultados, base["resultados"], args.umbral):
+        regresiones += es_regresion
+        marca = "  ❌ REGRESIÓN" if es_regresion else ""
+        print(f"{caso:<38}{anterior:>10.1f}{actual:>10.1f}{variacion:>+10.0%}{marca}")
+
+    if regresiones:
+        print(f"\n❌ {regresiones} caso(s) empeoraron más de {args.umbral:.0%} respecto de la baseline")
+        return 1
+    print(f"\n✅ Sin regresiones (umbral {args.umbral:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,399 @@
+"""
+Casos de benchmark. Cada caso recibe el Entorno y la cantidad de repeticiones y devuelve el
+resumen de medicion.medir() (o {"omitido": motivo} si no se puede correr en este entorno).
+
+Este módulo se importa recién después de que __main__ fija OIKOS_DATABASE_URL sobre la copia
+de trabajo, porque database.py crea el engine al importarse.
+"""
+import contextlib
+import io
+import itertools
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from datetime import date
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+import main
+import respuesta_rapida
+from automation_pagos import generar_cuotas_mensuales
+from database import SessionLocal, engine, init_db
+from indexacion import indice_periodo
+from motor_intereses import calcular_mora_pagos
+
+from benchmarks.medicion import medir, resumen
+
+DIRECTORIO_BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _periodo(indice: int) -> str:
+    year, month = divmod(indice, 12)
+    return f"{year}-{month + 1:02d}"
+
+
+class Entorno:
+    """
+    Datos de la base de trabajo que usan los casos (periodos, ids, tamaños) y el cliente HTTP.
+    """
+
+    def __init__(self, excel: str, hoy: date):
+        self.excel = excel
+        self.hoy = hoy
+        self.cliente = TestClient(main.app)
+        # El cliente no dispara el startup de la app: las migraciones pendientes se aplican acá
+        init_db()
+        with SessionLocal() as db:
+            self._completar_ipc(db)
+            self.total_pagos = db.execute(text("SELECT COUNT(*) FROM pagos")).scalar()
+            self.total_contratos = db.execute(text("SELECT COUNT(*) FROM contratos")).scalar()
+            self.ultimo_periodo = db.execute(text("SELECT MAX(periodo) FROM pagos")).scalar()
+            self.contrato_ids = db.execute(
+                text("SELECT id FROM contratos ORDER BY id LIMIT 200 OFFSET :salto"),
+                {"salto": self.total_contratos // 2},
+            ).scalars().all()
+            self.departamento_id = db.execute(
+                text("SELECT departamento_id FROM contratos WHERE id = :id"), {"id": self.contrato_ids[0]}
+            ).scalar()
+            # Página profunda: las últimas 100 filas, por offset y por cursor (mismo resultado)
+            self.salto_pagos = max(self.total_pagos - 100, 0)
+            self.cursor_pagos = db.execute(
+                text("SELECT id FROM pagos ORDER BY id LIMIT 1 OFFSET :salto"), {"salto": max(self.salto_pagos - 1, 0)}
+            ).scalar()
+            self.cursor_contratos = db.execute(
+                text("SELECT id FROM contratos ORDER BY id LIMIT 1 OFFSET :salto"),
+                {"salto": max(self.total_contratos - 101, 0)},
+            ).scalar()
+
+    @staticmethod
+    def _completar_ipc(db):
+        """
+        Carga un IPC de 2% en los meses que faltan hasta dos años después del último pago: sin
+        índice, la generación omite las cuotas ajustadas por IPC y los casos medirían menos trabajo.
+        """
+        ultimo_periodo = db.execute(text("SELECT MAX(periodo) FROM pagos")).scalar()
+        if not ultimo_periodo:
+            return
+        primero = db.execute(text("SELECT MIN(periodo) FROM indices_ipc")).scalar() or ultimo_periodo
+        db.execute(
+            text("INSERT OR IGNORE INTO indices_ipc (periodo, valor) VALUES (:periodo, 2)"),
+            [{"periodo": _periodo(mes)} for mes in range(indice_periodo(primero), indice_periodo(ultimo_periodo) + 25)],
+        )
+        db.commit()
+
+    def periodo_siguiente(self, meses: int = 1) -> str:
+        return _periodo(indice_periodo(self.ultimo_periodo) + meses)
+
+    def cerrar(self):
+        self.cliente.close()
+        engine.dispose()
+
+
+@contextlib.contextmanager
+def _silencio():
+    # Los motores informan por print: no se mezcla con el reporte
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+# ============================================================================
+# MOTORES DE AUTOMATIZACIÓN
+# ============================================================================
+
+def _cuotas(entorno: Entorno, repeticiones: int, meses: int):
+    desde = entorno.periodo_siguiente()
+    hasta = entorno.periodo_siguiente(meses) if meses > 1 else None
+
+    def preparar():
+        with SessionLocal() as db:
+            db.execute(text("DELETE FROM pagos WHERE periodo >= :desde"), {"desde": desde})
+            db.commit()
+
+    def correr():
+        with SessionLocal() as db, _silencio():
+            generados, _ = generar_cuotas_mensuales(db, periodo=desde, hasta=hasta)
+            return generados
+
+    try:
+        return medir(correr, repeticiones, preparar)
+    finally:
+        preparar()
+
+
+def cuotas_1_periodo(entorno, repeticiones):
+    return _cuotas(entorno, repeticiones, 1)
+
+
+def cuotas_12_periodos(entorno, repeticiones):
+    return _cuotas(entorno, repeticiones, 12)
+
+
+def _reiniciar_mora():
+    with SessionLocal() as db:
+        db.execute(text("UPDATE pagos SET monto_mora = 0, mora_calculada_al = NULL WHERE estado = 'PENDIENTE'"))
+        db.commit()
+
+
+def mora_completa(entorno, repeticiones):
+    def correr():
+        with SessionLocal() as db, _silencio():
+            return calcular_mora_pagos(db, hoy=entorno.hoy)
+
+    return medir(correr, repeticiones, _reiniciar_mora)
+
+
+def mora_incremental(entorno, repeticiones):
+    """
+    Segunda corrida del mismo día: no debería tocar ninguna fila. Las filas reportadas son los
+    pagos pendientes revisados.
+    """
+    with SessionLocal() as db, _silencio():
+        calcular_mora_pagos(db, hoy=entorno.hoy)
+        pendientes = db.execute(text("SELECT COUNT(*) FROM pagos WHERE estado = 'PENDIENTE'")).scalar()
+
+    def correr():
+        with SessionLocal() as db, _silencio():
+            calcular_mora_pagos(db, hoy=entorno.hoy)
+        return pendientes
+
+    return medir(correr, repeticiones)
+
+
+# ============================================================================
+# ENDPOINTS
+# ============================================================================
+
+def _get(entorno: Entorno, url, params):
+    """
+    GET a la API que valida el estado y devuelve la cantidad de filas de la respuesta.
+    url y params pueden ser funciones, para variar la solicitud en cada repetición.
+    """
+    def correr():
+        respuesta = entorno.cliente.get(url() if callable(url) else url, params=params() if callable(params) else params)
+        if respuesta.status_code != 200:
+            raise RuntimeError(f"{respuesta.request.url} -> {respuesta.status_code}: {respuesta.text[:200]}")
+        cuerpo = respuesta.json()
+        return len(cuerpo) if isinstance(cuerpo, list) else 1
+    return correr
+
+
+def pagos_primera_pagina(entorno, repeticiones):
+    return medir(_get(entorno, "/pagos", {"limit": 100}), repeticiones)
+
+
+def pagos_filtros(entorno, repeticiones):
+    params = {
+        "estado": "PENDIENTE",
+        "periodo_desde": _periodo(indice_periodo(entorno.ultimo_periodo) - 11),
+        "periodo_hasta": entorno.ultimo_periodo,
+        "limit": 100,
+    }
+    return medir(_get(entorno, "/pagos", params), repeticiones)
+
+
+def pagos_por_departamento(entorno, repeticiones):
+    return medir(_get(entorno, "/pagos", {"departamento_id": entorno.departamento_id, "limit": 100}), repeticiones)
+
+
+def pagos_pagina_profunda_offset(entorno, repeticiones):
+    return medir(_get(entorno, "/pagos", {"skip": entorno.salto_pagos, "limit": 100}), repeticiones)
+
+
+def pagos_pagina_profunda_cursor(entorno, repeticiones):
+    return medir(_get(entorno, "/pagos", {"cursor": entorno.cursor_pagos, "limit": 100}), repeticiones)
+
+
+def contratos_con_pagos(entorno, repeticiones):
+    return medir(_get(entorno, "/contratos", {"limit": 100}), repeticiones)
+
+
+def contratos_sin_relaciones(entorno, repeticiones):
+    return medir(_get(entorno, "/contratos", {"limit": 100, "include": ""}), repeticiones)
+
+
+def contratos_pagina_profunda_cursor(entorno, repeticiones):
+    return medir(_get(entorno, "/contratos", {"cursor": entorno.cursor_contratos, "limit": 100}), repeticiones)
+
+
+def contrato_detalle(entorno, repeticiones):
+    # Un contrato distinto en cada repetición para no medir solo el caché de páginas de SQLite
+    ids = itertools.cycle(entorno.contrato_ids)
+    return medir(_get(entorno, lambda: f"/contratos/{next(ids)}", None), repeticiones)
+
+
+def buscar(entorno, repeticiones):
+    # Consultas por prefijo típicas del buscador (nombre, calle, DNI parcial)
+    consultas = itertools.cycle(["gonz", "san mart", "hug pere", "2012", "sarmiento 1", "maria lo"])
+    return medir(_get(entorno, "/buscar", lambda: {"q": next(consultas), "limit": 20}), repeticiones)
+
+
+_CAMINOS_JSON = {"/pagos": main.JSON_RAPIDO_PAGOS, "/contratos": main.JSON_RAPIDO_CONTRATOS}
+
+
+@contextlib.contextmanager
+def _ruta_json(url, rapido: bool):
+    """Configura solo la ruta 'url' con o sin camino rápido, vía la dependencia propia de esa ruta."""
+    dependencia = _CAMINOS_JSON[url]
+    main.app.dependency_overrides[dependencia] = respuesta_rapida.CaminoRapido(rapido)
+    try:
+        yield
+    finally:
+        main.app.dependency_overrides.pop(dependencia, None)
+
+
+def _serializacion(url, params, rapido: bool):
+    """
+    Página grande con la ruta configurada en el camino normal de FastAPI (validación +
+    jsonable_encoder) o en respuesta_rapida, para comparar los dos sobre las mismas filas.
+    """
+    def caso(entorno, repeticiones):
+        with _ruta_json(url, rapido):
+            return medir(_get(entorno, url, params), repeticiones)
+    return caso
+
+
+# ============================================================================
+# IMPORTACIÓN DEL EXCEL
+# ============================================================================
+
+_SCRIPT_IMPORTACION = """
+import json, sys, time
+import importar_datos
+incremental = sys.argv[2] == "incremental"
+if incremental:
+    importar_datos.run_import(sys.argv[1])  # carga inicial, no se mide
+inicio = time.perf_counter()
+importar_datos.run_import(sys.argv[1], incremental=incremental)
+print("__BENCHMARK__" + json.dumps(time.perf_counter() - inicio))
+"""
+
+
+def _importacion(entorno, repeticiones, modo: str):
+    """
+    Corre importar_datos.run_import() en un proceso aparte sobre una base descartable (el
+    importador escribe con el engine global de database.py). En modo incremental se mide la
+    re-importación de la misma planilla sobre la base ya cargada.
+    """
+    if not os.path.exists(entorno.excel):
+        return {"omitido": f"no se encontró {entorno.excel}"}
+
+    tiempos, filas = [], 0
+    with tempfile.TemporaryDirectory() as directorio:
+        for i in range(repeticiones):
+            archivo = os.path.join(directorio, f"importacion_{i}.db")
+            proceso = subprocess.run(
+                [sys.executable, "-c", _SCRIPT_IMPORTACION, os.path.abspath(entorno.excel), modo],
+                cwd=DIRECTORIO_BACKEND, capture_output=True, text=True,
+                env={**os.environ, "OIKOS_DATABASE_URL": f"sqlite:///{archivo}"},
+            )
+            if proceso.returncode != 0:
+                if "ModuleNotFoundError" in proceso.stderr:
+                    return {"omitido": proceso.stderr.strip().splitlines()[-1]}
+                raise RuntimeError(f"La importación falló:\n{proceso.stderr[-2000:]}")
+            marca = [l for l in proceso.stdout.splitlines() if l.startswith("__BENCHMARK__")]
+            tiempos.append(json.loads(marca[-1][len("__BENCHMARK__"):]))
+            with sqlite3.connect(archivo) as conn:
+                filas += sum(
+                    conn.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+                    for tabla in ("departamentos", "inquilinos", "contratos")
+                )
+    return resumen(tiempos, filas)
+
+
+_SCRIPT_SENTENCIAS = """
+import json, sys, time
+from sqlalchemy import event
+import importar_datos
+from database import SessionLocal, engine, init_db
+init_db()
+n = int(sys.argv[1])
+sentencias = 0
+
+@event.listens_for(engine, "before_cursor_execute")
+def _contar(*args):
+    global sentencias
+    sentencias += 1
+
+hojas = [
+    (importar_datos.importar_departamentos, [{"alias": f"Bench {i}", "direccion": f"Calle {i}"} for i in range(n)]),
+    (importar_datos.importar_inquilinos, [{"nombre_apellido": f"Inquilino {i}", "dni": str(10_000_000 + i)} for i in range(n)]),
+    (importar_datos.importar_contratos, [
+        {"departamento_alias": f"Bench {i}", "inquilino_name": f"Inquilino {i}", "fecha_inicio": "2024-01-01",
+         "fecha_fin": "2025-12-31", "monto_actual": "100000"}
+        for i in range(n)
+    ]),
+]
+with SessionLocal() as session:
+    sentencias = 0
+    inicio = time.perf_counter()
+    for importar, filas in hojas:
+        importar(session, filas, lote=n)
+    print("__BENCHMARK__" + json.dumps({"segundos": time.perf_counter() - inicio, "sentencias": sentencias}))
+"""
+FILAS_SENTENCIAS = 2000  # filas por hoja, en un solo lote
+MAX_SENTENCIAS = 100  # holgado: un lote son unas pocas sentencias por hoja, no una por fila
+
+
+def importacion_sentencias(entorno, repeticiones):
+    """
+    Alta de FILAS_SENTENCIAS departamentos, inquilinos y contratos (un lote por hoja) contando las
+    sentencias enviadas a SQLite. Si el INSERT masivo vuelve a ejecutarse fila por fila (p. ej.
+    con RETURNING ordenado), la cuenta crece con las filas y el caso falla en lugar de solo tardar más.
+    """
+    tiempos, sentencias = [], 0
+    with tempfile.TemporaryDirectory() as directorio:
+        for i in range(repeticiones):
+            proceso = subprocess.run(
+                [sys.executable, "-c", _SCRIPT_SENTENCIAS, str(FILAS_SENTENCIAS)],
+                cwd=DIRECTORIO_BACKEND, capture_output=True, text=True,
+                env={**os.environ, "OIKOS_DATABASE_URL": f"sqlite:///{os.path.join(directorio, f'sentencias_{i}.db')}"},
+            )
+            if proceso.returncode != 0:
+                raise RuntimeError(f"La importación falló:\n{proceso.stderr[-2000:]}")
+            marca = [l for l in proceso.stdout.splitlines() if l.startswith("__BENCHMARK__")]
+            medicion = json.loads(marca[-1][len("__BENCHMARK__"):])
+            tiempos.append(medicion["segundos"])
+            sentencias = medicion["sentencias"]
+    if sentencias > MAX_SENTENCIAS:
+        raise RuntimeError(
+            f"La importación de {3 * FILAS_SENTENCIAS} filas ejecutó {sentencias} sentencias "
+            f"(máximo {MAX_SENTENCIAS}): el alta masiva dejó de ser un executemany por lote"
+        )
+    return {**resumen(tiempos, 3 * FILAS_SENTENCIAS * repeticiones), "sentencias": sentencias}
+
+
+def importacion_excel(entorno, repeticiones):
+    return _importacion(entorno, repeticiones, "completa")
+
+
+def importacion_excel_incremental(entorno, repeticiones):
+    return _importacion(entorno, repeticiones, "incremental")
+
+
+CASOS = [
+    ("cuotas_1_periodo", cuotas_1_periodo),
+    ("cuotas_12_periodos", cuotas_12_periodos),
+    ("mora_completa", mora_completa),
+    ("mora_incremental", mora_incremental),
+    ("api_pagos_primera_pagina", pagos_primera_pagina),
+    ("api_pagos_filtros", pagos_filtros),
+    ("api_pagos_por_departamento", pagos_por_departamento),
+    ("api_pagos_pagina_profunda_offset", pagos_pagina_profunda_offset),
+    ("api_pagos_pagina_profunda_cursor", pagos_pagina_profunda_cursor),
+    ("api_contratos_con_pagos", contratos_con_pagos),
+    ("api_contratos_sin_relaciones", contratos_sin_relaciones),
+    ("api_contratos_pagina_profunda_cursor", contratos_pagina_profunda_cursor),
+    ("api_contrato_detalle", contrato_detalle),
+    ("api_buscar", buscar),
+    ("json_pagos_1000_estandar", _serializacion("/pagos", {"limit": 1000}, rapido=False)),
+    ("json_pagos_1000_rapido", _serializacion("/pagos", {"limit": 1000}, rapido=True)),
+    ("json_contratos_200_estandar", _serializacion("/contratos", {"limit": 200, "include": "pagos,departamento,inquilino"}, rapido=False)),
+    ("json_contratos_200_rapido", _serializacion("/contratos", {"limit": 200, "include": "pagos,departamento,inquilino"}, rapido=True)),
+    ("importacion_excel", importacion_excel),
+    ("importacion_excel_incremental", importacion_excel_incremental),
+    ("importacion_sentencias", importacion_sentencias),
+]
@@ -0,0 +1,60 @@
+"""
+Medición de tiempos y comparación contra la línea base.
+"""
+import math
+import time
+
+
+def percentil(valores, p: float) -> float:
+    """
+    Percentil por rango más cercano (valores ya medidos, p entre 0 y 100).
+    """
+    ordenados = sorted(valores)
+    posicion = max(math.ceil(p / 100 * len(ordenados)) - 1, 0)
+    return ordenados[posicion]
+
+
+def medir(funcion, repeticiones: int, preparar=None, calentamiento: int = 1):
+    """
+    Ejecuta funcion() 'repeticiones' veces (más las de calentamiento, que no se cuentan).
+    preparar() corre antes de cada ejecución y no se mide. funcion() puede devolver la cantidad
+    de filas procesadas para calcular filas/s.
+    """
+    tiempos, filas = [], 0
+    for i in range(calentamiento + repeticiones):
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        resultado = funcion()
+        duracion = time.perf_counter() - inicio
+        if i >= calentamiento:
+            tiempos.append(duracion)
+            filas += resultado if isinstance(resultado, int) else 0
+    return resumen(tiempos, filas)
+
+
+def resumen(tiempos, filas: int = 0):
+    total = sum(tiempos)
+    return {
+        "repeticiones": len(tiempos),
+        "p50_ms": round(percentil(tiempos, 50) * 1000, 3),
+        "p95_ms": round(percentil(tiempos, 95) * 1000, 3),
+        "max_ms": round(max(tiempos) * 1000, 3),
+        "filas": filas,
+        "filas_s": round(filas / total, 1) if filas and total else None,
+    }
+
+
+def comparar(actuales: dict, base: dict, umbral: float):
+    """
+    Compara el p50 de cada caso contra la línea base. Devuelve una lista de
+    (caso, p50_base, p50_actual, variacion, es_regresion).
+    """
+    filas = []
+    for caso, actual in actuales.items():
+        anterior = base.get(caso)
+        if not anterior or actual.get("omitido") or anterior.get("omitido"):
+            continue
+        variacion = actual["p50_ms"] / anterior["p50_ms"] - 1 if anterior["p50_ms"] else 0.0
+        filas.append((caso, anterior["p50_ms"], actual["p50_ms"], variacion, variacion > umbral))
+    return filas
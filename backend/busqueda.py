@@ -0,0 +1,79 @@
+"""
+Búsqueda de texto completo sobre la tabla FTS5 'busqueda' (ver migración 0010).
+
+Cada palabra de la consulta se busca como prefijo ("hug pere" encuentra "Hugo Pérez") y todas
+tienen que aparecer. Los resultados mezclan departamentos, inquilinos y contratos ordenados por
+bm25, con más peso para alias, nombre y DNI que para dirección o propietario.
+"""
+import re
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+TIPOS = ("departamento", "inquilino", "contrato")
+MAX_RESULTADOS = 100
+MIN_PREFIJO = 2
+
+# Pesos de bm25 en el orden de las columnas de la tabla (tipo y entidad_id no se indexan)
+_PESOS = {
+    "tipo": 0, "entidad_id": 0,
+    "alias": 10.0, "direccion": 4.0, "propietario_nombre": 2.0,
+    "nombre_apellido": 8.0, "dni": 10.0, "email": 3.0, "telefono": 3.0,
+}
+
+_PALABRAS = re.compile(r"\w+", re.UNICODE)
+
+
+def consulta_fts(q: str) -> str:
+    """
+    Traduce el texto del usuario a una consulta FTS5 segura: cada palabra entre comillas
+    (los operadores y la puntuación no se interpretan) y con * para buscar por prefijo.
+    Las palabras de una letra se buscan exactas: como prefijo matchean casi todo el índice.
+    """
+    return " ".join(
+        f'"{palabra}"*' if len(palabra) >= MIN_PREFIJO else f'"{palabra}"'
+        for palabra in _PALABRAS.findall(q or "")
+    )
+
+
+def buscar(db: Session, q: str, tipo: str = None, limite: int = 20):
+    """
+    Devuelve hasta 'limite' resultados [{tipo, id, titulo, detalle, rango}] ordenados por relevancia.
+    Lanza ValueError si el tipo o el límite no son válidos.
+    """
+    if tipo is not None and tipo not in TIPOS:
+        raise ValueError(f"tipo debe ser uno de: {', '.join(TIPOS)}")
+    if not 1 <= limite <= MAX_RESULTADOS:
+        raise ValueError(f"limit debe estar entre 1 y {MAX_RESULTADOS}")
+    consulta = consulta_fts(q)
+    if not consulta:
+        return []
+
+    filas = db.execute(text(f"""
+        SELECT tipo, entidad_id, alias, direccion, nombre_apellido, dni, email,
+               bm25(busqueda, {", ".join(str(p) for p in _PESOS.values())}) AS rango
+        FROM busqueda
+        WHERE busqueda MATCH :consulta {"AND tipo = :tipo" if tipo else ""}
+        ORDER BY rango
+        LIMIT :limite
+    """), {"consulta": consulta, "tipo": tipo, "limite": limite}).all()
+
+    resultados = []
+    for fila in filas:
+        # dni se indexa con una copia solo de dígitos: se muestra la primera forma
+        dni = (fila.dni or "").split(" ")[0] or None
+        if fila.tipo == "departamento":
+            titulo, detalle = fila.alias, fila.direccion
+        elif fila.tipo == "inquilino":
+            titulo, detalle = fila.nombre_apellido, " · ".join(filter(None, (dni and f"DNI {dni}", fila.email)))
+        else:
+            titulo = " · ".join(filter(None, (fila.alias, fila.nombre_apellido)))
+            detalle = fila.direccion
+        resultados.append({
+            "tipo": fila.tipo,
+            "id": fila.entidad_id,
+            "titulo": titulo or "",
+            "detalle": detalle or None,
+            "rango": round(-fila.rango, 4),
+        })
+    return resultados
@@ -0,0 +1,108 @@
+"""
+Cache en memoria para lecturas costosas (dashboard, listados).
+
+Cada tabla tiene un contador de versión que se incrementa cuando una sesión hace commit
+de cambios sobre ella (ORM o INSERT/UPDATE/DELETE masivos ejecutados con la sesión).
+Las entradas del cache guardan las versiones con las que se calcularon: si alguna tabla
+cambió, la entrada deja de valer aunque no haya vencido su TTL.
+
+El cache es por proceso: con varios workers de uvicorn cada uno mantiene el suyo y el TTL
+acota cuánto puede tardar en verse un cambio hecho por otro worker.
+"""
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import event
+from sqlalchemy.sql.dml import UpdateBase
+
+from database import SessionLocal
+
+_versiones = defaultdict(int)
+_lock = threading.Lock()
+
+
+def version(tabla: str) -> int:
+    return _versiones[tabla]
+
+
+def versiones(*tablas) -> tuple:
+    return tuple(_versiones[t] for t in tablas)
+
+
+def invalidar(*tablas):
+    """
+    Incrementa la versión de las tablas indicadas.
+    """
+    with _lock:
+        for tabla in tablas:
+            _versiones[tabla] += 1
+
+
+class CacheTTL:
+    """
+    Diccionario clave -> valor con vencimiento por tiempo y por versión de tablas.
+    """
+
+    def __init__(self, ttl_segundos: float):
+        self.ttl_segundos = ttl_segundos
+        self._datos = {}
+        self._lock = threading.Lock()
+
+    def obtener(self, clave, tablas=()):
+        with self._lock:
+            entrada = self._datos.get(clave)
+        if entrada is None:
+            return None
+        valor, vence, versiones_guardadas = entrada
+        if time.monotonic() > vence or versiones_guardadas != versiones(*tablas):
+            return None
+        return valor
+
+    def guardar(self, clave, valor, tablas=(), versiones_calculo=None):
+        """
+        Guarda el valor. versiones_calculo son las versiones leídas ANTES de consultar la base,
+        así un commit concurrente durante el cálculo invalida la entrada en lugar de perderse.
+        """
+        if versiones_calculo is None:
+            versiones_calculo = versiones(*tablas)
+        with self._lock:
+            self._datos[clave] = (valor, time.monotonic() + self.ttl_segundos, versiones_calculo)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+
+# ============================================================================
+# INVALIDACIÓN AUTOMÁTICA DESDE LAS SESIONES
+# ============================================================================
+
+def _tablas_pendientes(session):
+    return session.info.setdefault("tablas_modificadas", set())
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _registrar_cambios_orm(session, flush_context):
+    tablas = _tablas_pendientes(session)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        tablas.add(obj.__table__.name)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _registrar_cambios_masivos(orm_execute_state):
+    statement = orm_execute_state.statement
+    if isinstance(statement, UpdateBase):
+        _tablas_pendientes(orm_execute_state.session).add(statement.table.name)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidar_al_confirmar(session):
+    tablas = session.info.pop("tablas_modificadas", None)
+    if tablas:
+        invalidar(*tablas)
+
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _descartar_cambios(session, previous_transaction):
+    session.info.pop("tablas_modificadas", None)
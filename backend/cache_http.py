@@ -0,0 +1,179 @@
+"""
+Cache HTTP de las lecturas (GET) con ETag, basado en las versiones por tabla de cache.py.
+
+- El ETag de una respuesta sale de la URL (ruta + query string) y de las versiones de las
+  tablas de las que depende. Cualquier commit sobre esas tablas (POST/PUT/DELETE, jobs) cambia
+  la versión y con ella el ETag.
+- If-None-Match con el ETag vigente se responde 304 sin llegar al endpoint ni a la base.
+- Las respuestas 200 se guardan serializadas en un LRU acotado por bytes (OIKOS_CACHE_HTTP_MB,
+  default 64): una repetición de la misma URL con las mismas versiones no ejecuta el endpoint.
+- Las respuestas llevan Cache-Control: no-cache, así el navegador revalida siempre con el ETag
+  (y recibe 304 si nada cambió). If-None-Match: * solo se responde 304 si la URL tiene una
+  respuesta guardada vigente (si no, no se sabe si el recurso existe).
+- Las respuestas servidas desde el cache dejan en el scope la ruta que las habría atendido,
+  para que las métricas por ruta las cuenten igual que a las que pasan por el endpoint.
+
+Igual que cache.py, es por proceso: los ETags incluyen un identificador del proceso y una
+generación que cambia cada OIKOS_CACHE_HTTP_TTL segundos (default 60), lo que acota cuánto
+puede tardar en verse un cambio hecho por otro worker o por un script externo.
+Se desactiva con OIKOS_CACHE_HTTP=0.
+"""
+import hashlib
+import os
+import time
+from collections import OrderedDict
+
+from starlette.routing import Match
+
+import cache
+import metricas
+
+HABILITADO = os.getenv("OIKOS_CACHE_HTTP", "1") != "0"
+TTL_SEGUNDOS = float(os.getenv("OIKOS_CACHE_HTTP_TTL", "60"))
+MAX_BYTES = int(float(os.getenv("OIKOS_CACHE_HTTP_MB", "64")) * 1024 * 1024)
+MAX_BYTES_RESPUESTA = MAX_BYTES // 8  # una sola respuesta no puede ocupar todo el cache
+
+# Primer segmento de la ruta -> tablas de las que dependen sus respuestas
+TABLAS_POR_RUTA = {
+    "departamentos": ("departamentos",),
+    "inquilinos": ("inquilinos",),
+    "contratos": ("contratos", "pagos", "departamentos", "inquilinos", "indices_ipc"),
+    "pagos": ("pagos", "contratos"),
+    "dashboard": ("departamentos", "inquilinos", "contratos", "pagos"),
+    "buscar": ("departamentos", "inquilinos", "contratos"),
+    "indices-ipc": ("indices_ipc",),
+}
+
+_PROCESO = os.urandom(4).hex()
+
+cache_http_solicitudes = metricas.Contador(
+    "oikos_cache_http_total", "Lecturas por resultado del cache HTTP (no_modificado, acierto, fallo)", ("resultado",)
+)
+cache_http_bytes = metricas.Medidor("oikos_cache_http_bytes", "Bytes de respuestas guardadas en el cache HTTP")
+
+
+class CacheLRU:
+    """
+    LRU de respuestas serializadas acotado por la suma de los tamaños de los cuerpos.
+    Se usa solo desde el event loop, así que no necesita lock.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._datos = OrderedDict()  # clave -> (etag, status, headers, cuerpo, ruta)
+
+    def obtener(self, clave, etag):
+        entrada = self._datos.get(clave)
+        if entrada is None or entrada[0] != etag:
+            return None
+        self._datos.move_to_end(clave)
+        return entrada
+
+    def guardar(self, clave, etag, status, headers, cuerpo: bytes, ruta=None):
+        anterior = self._datos.pop(clave, None)
+        if anterior is not None:
+            self.bytes -= len(anterior[3])
+        self._datos[clave] = (etag, status, headers, cuerpo, ruta)
+        self.bytes += len(cuerpo)
+        while self.bytes > self.max_bytes and self._datos:
+            _, descartada = self._datos.popitem(last=False)
+            self.bytes -= len(descartada[3])
+        cache_http_bytes.set(self.bytes)
+
+    def limpiar(self):
+        self._datos.clear()
+        self.bytes = 0
+        cache_http_bytes.set(0)
+
+    def __len__(self):
+        return len(self._datos)
+
+
+LRU = CacheLRU(MAX_BYTES)
+
+
+def calcular_etag(clave, tablas) -> str:
+    generacion = int(time.monotonic() // TTL_SEGUNDOS) if TTL_SEGUNDOS > 0 else 0
+    base = repr((_PROCESO, generacion, clave, cache.versiones(*tablas)))
+    return '"' + hashlib.blake2b(base.encode(), digest_size=12).hexdigest() + '"'
+
+
+def _coincide(if_none_match: str, etag: str, existe: bool) -> bool:
+    """
+    'existe' indica que hay una respuesta guardada para la URL: solo entonces vale el comodín "*".
+    """
+    candidatos = [e.strip() for e in if_none_match.split(",")]
+    # Se aceptan también las formas débiles (W/"...") que agregan algunos proxies
+    return ("*" in candidatos and existe) or etag in candidatos or f"W/{etag}" in candidatos
+
+
+def _ruta(scope):
+    """
+    Ruta de la app que atendería la solicitud (la que pone el router en scope["route"]).
+    """
+    for ruta in scope["app"].router.routes:
+        coincidencia, _ = ruta.matches(scope)
+        if coincidencia == Match.FULL:
+            return ruta
+    return None
+
+
+class MiddlewareCacheHTTP:
+    """
+    Middleware ASGI del cache HTTP. Va por dentro de CORS, para que los headers de CORS se
+    calculen en cada solicitud y no queden guardados en el cache.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not HABILITADO or scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        tablas = TABLAS_POR_RUTA.get(scope["path"].strip("/").split("/")[0])
+        if tablas is None:
+            await self.app(scope, receive, send)
+            return
+
+        clave = (scope["path"], scope.get("query_string", b""))
+        # Versiones leídas ANTES de ejecutar el endpoint: un commit concurrente deja la entrada vieja
+        etag = calcular_etag(clave, tablas)
+        headers_cache = [(b"etag", etag.encode()), (b"cache-control", b"no-cache")]
+
+        guardada = LRU.obtener(clave, etag)
+        if_none_match = next((v.decode("latin-1") for k, v in scope["headers"] if k == b"if-none-match"), None)
+        if if_none_match and _coincide(if_none_match, etag, guardada is not None):
+            cache_http_solicitudes.inc("no_modificado")
+            scope["route"] = guardada[4] if guardada is not None else _ruta(scope)
+            await send({"type": "http.response.start", "status": 304, "headers": headers_cache})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if guardada is not None:
+            cache_http_solicitudes.inc("acierto")
+            _, status, headers, cuerpo, scope["route"] = guardada
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            await send({"type": "http.response.body", "body": cuerpo})
+            return
+
+        cache_http_solicitudes.inc("fallo")
+        respuesta = {"status": None, "headers": None, "partes": [], "bytes": 0}
+
+        async def _send(mensaje):
+            if mensaje["type"] == "http.response.start":
+                respuesta["status"] = mensaje["status"]
+                if mensaje["status"] == 200:
+                    mensaje["headers"] = [*mensaje.get("headers", []), *headers_cache]
+                respuesta["headers"] = mensaje["headers"]
+            elif mensaje["type"] == "http.response.body" and respuesta["status"] == 200:
+                cuerpo = mensaje.get("body", b"")
+                respuesta["bytes"] += len(cuerpo)
+                if respuesta["bytes"] <= MAX_BYTES_RESPUESTA:
+                    respuesta["partes"].append(cuerpo)
+                if not mensaje.get("more_body", False) and respuesta["bytes"] <= MAX_BYTES_RESPUESTA:
+                    LRU.guardar(clave, etag, 200, respuesta["headers"], b"".join(respuesta["partes"]), scope.get("route"))
+            await send(mensaje)
+
+        await self.app(scope, receive, _send)
@@ -1,6 +1,8 @@
 import sqlite3
 from datetime import date
 
+from resolutor_inquilinos import ResolutorInquilinos
+
 db_path = "toro_gestion.db"
 
 # Datos extraídos de la imagen
@@ -18,6 +20,7 @@ cursor = conn.cursor()
 
 try:
     print("--- INICIANDO CARGA DE DATOS REALES (Diciembre 2025) ---")
+    resolutor = ResolutorInquilinos.desde_filas(cursor.execute("SELECT id, nombre_apellido, dni FROM inquilinos").fetchall())
 
     for item in datos_reales:
         alias = item["alias"]
@@ -35,17 +38,20 @@ try:
         depto_id = depto[0]
 
         # 2. Buscar/Actualizar Inquilino
-        # Buscamos por nombre parcial (ej: %DAVID%) o creamos uno nuevo
-        cursor.execute("SELECT id FROM inquilinos WHERE nombre_apellido LIKE ?", (f"%{nombre_inquilino}%",))
-        inq = cursor.fetchone()
+        # Buscamos por nombre (sin acentos ni mayúsculas, palabras o prefijos: EZE -> Ezequiel) o creamos uno nuevo
+        resolucion = resolutor.resolver(nombre_inquilino)
         
-        if inq:
-            inquilino_id = inq[0]
+        if resolucion.ambigua:
+            print(f"⚠️ Inquilino ambiguo: {nombre_inquilino} -> {resolutor.describir(resolucion)}. Saltando...")
+            continue
+        if resolucion.inquilino_id:
+            inquilino_id = resolucion.inquilino_id
             # Actualizamos nombre completo si es muy corto? No, mantenemos lo que hay mejor.
         else:
             print(f"➕ Creando inquilino: {nombre_inquilino}")
             cursor.execute("INSERT INTO inquilinos (nombre_apellido, estado) VALUES (?, 'ACTIVO')", (nombre_inquilino,))
             inquilino_id = cursor.lastrowid
+            resolutor.agregar(inquilino_id, nombre_inquilino)
             
         # 3. Actualizar CONTRATO Vigente
         # Buscamos si ya tiene contrato activo
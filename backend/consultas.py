@@ -0,0 +1,199 @@
+"""
+Filtros y paginación compartidos por los endpoints de listado (y las exportaciones).
+La paginación es por cursor (keyset) sobre id: cada página es un rango del índice de la PK,
+sin el costo lineal de OFFSET en páginas profundas.
+"""
+import os
+from typing import Optional
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import select, func
+from sqlalchemy.orm import selectinload, raiseload
+
+import cache
+from automation_pagos import parsear_periodo
+from models import Departamento, Inquilino, Contrato, Pago
+from respuesta_rapida import a_dict
+from schemas import ContratoBase, PagoResponse, DepartamentoResponse, InquilinoResponse
+
+_cache_conteos = cache.CacheTTL(float(os.getenv("OIKOS_CONTEO_TTL", "60")))
+
+
+def _validar_periodo(nombre: str, periodo: Optional[str]):
+    if periodo is None:
+        return None
+    try:
+        year, month = parsear_periodo(periodo)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{nombre}: {e}")
+    return f"{year}-{month:02d}"
+
+
+# ============================================================================
+# FILTROS
+# ============================================================================
+
+def condiciones_departamentos(estado=None):
+    return [Departamento.estado == estado] if estado else []
+
+
+def condiciones_inquilinos(estado=None):
+    return [Inquilino.estado == estado] if estado else []
+
+
+def condiciones_contratos(estado=None, departamento_id=None, inquilino_id=None):
+    condiciones = []
+    if estado:
+        condiciones.append(Contrato.estado == estado)
+    if departamento_id is not None:
+        condiciones.append(Contrato.departamento_id == departamento_id)
+    if inquilino_id is not None:
+        condiciones.append(Contrato.inquilino_id == inquilino_id)
+    return condiciones
+
+
+def condiciones_pagos(estado=None, contrato_id=None, periodo_desde=None, periodo_hasta=None,
+                      departamento_id=None, inquilino_id=None):
+    condiciones = []
+    if estado:
+        condiciones.append(Pago.estado == estado)
+    if contrato_id is not None:
+        condiciones.append(Pago.contrato_id == contrato_id)
+    desde = _validar_periodo("periodo_desde", periodo_desde)
+    hasta = _validar_periodo("periodo_hasta", periodo_hasta)
+    if desde:
+        condiciones.append(Pago.periodo >= desde)
+    if hasta:
+        condiciones.append(Pago.periodo <= hasta)
+    if departamento_id is not None or inquilino_id is not None:
+        contratos = select(Contrato.id).where(*condiciones_contratos(departamento_id=departamento_id, inquilino_id=inquilino_id))
+        condiciones.append(Pago.contrato_id.in_(contratos))
+    return condiciones
+
+
+# ============================================================================
+# PAGINACIÓN
+# ============================================================================
+
+def paginar(query, modelo, response: Response, cursor: Optional[int] = None, skip: int = 0, limit: int = 100):
+    """
+    Devuelve una página ordenada por id. Con cursor trae los ids mayores al cursor;
+    sin cursor mantiene el skip/limit de siempre. Si la página vino completa,
+    el header X-Next-Cursor lleva el id desde el que pedir la siguiente.
+    """
+    query = query.order_by(modelo.id)
+    if cursor is not None:
+        query = query.filter(modelo.id > cursor)
+    elif skip:
+        query = query.offset(skip)
+    filas = query.limit(limit).all()
+    if filas and len(filas) == limit:
+        response.headers["X-Next-Cursor"] = str(filas[-1].id)
+    return filas
+
+
+def contar(db, modelo, condiciones, response: Response, clave_filtros: tuple, tablas=()):
+    """
+    Pone en X-Total-Count la cantidad de filas que cumplen los filtros.
+    El conteo se cachea por filtros y se invalida cuando cambia alguna de las tablas.
+    """
+    tablas = tablas or (modelo.__tablename__,)
+    clave = (modelo.__tablename__, clave_filtros)
+    total = _cache_conteos.obtener(clave, tablas)
+    if total is None:
+        versiones_calculo = cache.versiones(*tablas)
+        total = db.execute(select(func.count()).select_from(modelo).where(*condiciones)).scalar()
+        _cache_conteos.guardar(clave, total, tablas, versiones_calculo)
+    response.headers["X-Total-Count"] = str(total)
+    return total
+
+
+# ============================================================================
+# CONTRATOS: RELACIONES EMBEBIDAS (include=)
+# ============================================================================
+
+RELACIONES_CONTRATO = ("pagos", "departamento", "inquilino")
+
+
+def parsear_include(include: Optional[str], por_defecto: str):
+    """
+    Interpreta include="pagos,departamento,inquilino,pagos_recientes=N".
+    Devuelve (relaciones, n_recientes). include="" no embebe nada.
+    """
+    texto = por_defecto if include is None else include
+    relaciones, recientes = set(), None
+    for parte in filter(None, (p.strip() for p in texto.split(","))):
+        nombre, _, valor = parte.partition("=")
+        if nombre == "pagos_recientes":
+            try:
+                recientes = int(valor)
+                if recientes < 1:
+                    raise ValueError
+            except ValueError:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="pagos_recientes debe ser un entero positivo")
+        elif nombre in RELACIONES_CONTRATO:
+            relaciones.add(nombre)
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"include inválido '{nombre}'. Opciones: {', '.join(RELACIONES_CONTRATO)}, pagos_recientes=N"
+            )
+    return relaciones, recientes
+
+
+def opciones_carga_contrato(relaciones, recientes):
+    """
+    Carga ansiosa (selectin) de las relaciones pedidas y raiseload para el resto:
+    la cantidad de queries queda fija sin importar el tamaño de la página.
+    """
+    opciones = []
+    if "pagos" in relaciones and not recientes:
+        opciones.append(selectinload(Contrato.pagos))
+    if "departamento" in relaciones:
+        opciones.append(selectinload(Contrato.departamento))
+    if "inquilino" in relaciones:
+        opciones.append(selectinload(Contrato.inquilino))
+    opciones.append(raiseload("*"))
+    return opciones
+
+
+def pagos_recientes_por_contrato(db, contrato_ids, n: int):
+    """
+    Los n pagos más recientes (por periodo) de cada contrato, en una sola query con ROW_NUMBER().
+    """
+    if not contrato_ids:
+        return {}
+    orden = func.row_number().over(partition_by=Pago.contrato_id, order_by=(Pago.periodo.desc(), Pago.id.desc())).label("orden")
+    numerados = select(Pago.id, orden).where(Pago.contrato_id.in_(contrato_ids)).subquery()
+    pagos = (
+        db.query(Pago)
+        .join(numerados, numerados.c.id == Pago.id)
+        .filter(numerados.c.orden <= n)
+        .order_by(Pago.contrato_id, Pago.periodo.desc())
+        .all()
+    )
+    resultado = {}
+    for pago in pagos:
+        resultado.setdefault(pago.contrato_id, []).append(pago)
+    return resultado
+
+
+def serializar_contrato(contrato, relaciones, recientes_map=None, rapido: bool = False):
+    """
+    Arma el dict de respuesta con los campos del contrato y solo las relaciones pedidas
+    (las no pedidas quedan fuera de la respuesta, nunca se cargan de forma perezosa).
+    Con rapido=True las relaciones se arman como dicts sin validar (ver respuesta_rapida).
+    """
+    serializar = a_dict if rapido else (lambda objeto, schema: schema.model_validate(objeto))
+    datos = {"id": contrato.id}
+    for campo, info in ContratoBase.model_fields.items():
+        datos[campo] = getattr(contrato, campo, info.default)
+    if recientes_map is not None:
+        datos["pagos"] = [serializar(p, PagoResponse) for p in recientes_map.get(contrato.id, [])]
+    elif "pagos" in relaciones:
+        datos["pagos"] = [serializar(p, PagoResponse) for p in contrato.pagos]
+    if "departamento" in relaciones:
+        datos["departamento"] = serializar(contrato.departamento, DepartamentoResponse) if contrato.departamento else None
+    if "inquilino" in relaciones:
+        datos["inquilino"] = serializar(contrato.inquilino, InquilinoResponse) if contrato.inquilino else None
+    return datos
@@ -0,0 +1,146 @@
+"""
+Datos agregados del Dashboard: departamentos con su inquilino activo, conteos por estado,
+totales de pagos pendientes/mora y la lista de alertas.
+Se calcula con pocas consultas SQL (joins y agregados) y se cachea por un TTL corto.
+"""
+import os
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import select, func, and_
+from sqlalchemy.orm import Session
+
+import cache
+from models import Departamento, Inquilino, Contrato, Pago, EstadoDepartamento, EstadoContrato, EstadoPago
+
+# Ventanas de alerta (mismos criterios que usaba el frontend)
+DIAS_ALERTA_VENCIMIENTO = 60
+DIAS_ALERTA_AUMENTO = 45
+# Máximo de alertas de mora listadas (el total sigue en "totales")
+LIMITE_ALERTAS_MORA = 200
+
+TABLAS_DASHBOARD = ("departamentos", "inquilinos", "contratos", "pagos")
+_cache_dashboard = cache.CacheTTL(float(os.getenv("OIKOS_DASHBOARD_TTL", "30")))
+
+
+def _departamentos_con_inquilino(db: Session):
+    contrato_activo = and_(Contrato.departamento_id == Departamento.id, Contrato.estado == EstadoContrato.ACTIVO)
+    filas = db.execute(
+        select(Departamento, Contrato.id, Inquilino.nombre_apellido)
+        .outerjoin(Contrato, contrato_activo)
+        .outerjoin(Inquilino, Inquilino.id == Contrato.inquilino_id)
+        .order_by(Departamento.id)
+    ).all()
+    return [
+        {
+            "id": d.id,
+            "alias": d.alias,
+            "direccion": d.direccion,
+            "propietario_nombre": d.propietario_nombre,
+            "tipo": d.tipo,
+            "estado": d.estado,
+            "contrato_activo_id": contrato_id,
+            "inquilino_nombre": inquilino_nombre,
+        }
+        for d, contrato_id, inquilino_nombre in filas
+    ]
+
+
+def _totales_pagos(db: Session):
+    cantidad, monto_pendiente, monto_mora = db.execute(
+        select(
+            func.count(Pago.id),
+            func.coalesce(func.sum(
+                func.coalesce(Pago.monto_alquiler, 0) + func.coalesce(Pago.monto_expensas, 0) + func.coalesce(Pago.monto_servicios, 0)
+            ), 0),
+            func.coalesce(func.sum(Pago.monto_mora), 0),
+        ).where(Pago.estado == EstadoPago.PENDIENTE)
+    ).one()
+    return {"pagos_pendientes": cantidad, "monto_pendiente": monto_pendiente, "monto_mora": monto_mora}
+
+
+def _alertas(db: Session, departamentos, hoy: date):
+    alertas = []
+
+    # A. Pagos pendientes (MORA)
+    filas = db.execute(
+        select(Pago.id, Pago.periodo, Pago.contrato_id, Departamento.alias)
+        .join(Contrato, Contrato.id == Pago.contrato_id, isouter=True)
+        .join(Departamento, Departamento.id == Contrato.departamento_id, isouter=True)
+        .where(Pago.estado == EstadoPago.PENDIENTE)
+        .order_by(Pago.periodo.desc(), Pago.id)
+        .limit(LIMITE_ALERTAS_MORA)
+    ).all()
+    for pago_id, periodo, contrato_id, alias in filas:
+        alertas.append({
+            "id": f"pago-{pago_id}",
+            "tipo": "MORA",
+            "mensaje": f"Pago pendiente ({periodo}) - {alias or f'Contrato #{contrato_id}'}",
+            "fecha": "Hoy",
+        })
+
+    # B. Contratos por vencer y D. próximos aumentos (una sola consulta sobre contratos activos)
+    limite = hoy + timedelta(days=max(DIAS_ALERTA_VENCIMIENTO, DIAS_ALERTA_AUMENTO))
+    filas = db.execute(
+        select(Contrato.id, Contrato.fecha_fin, Contrato.proxima_actualizacion, Contrato.porcentaje_actualizacion, Departamento.alias)
+        .join(Departamento, Departamento.id == Contrato.departamento_id, isouter=True)
+        .where(
+            Contrato.estado == EstadoContrato.ACTIVO,
+            (Contrato.fecha_fin.between(hoy + timedelta(days=1), limite))
+            | (Contrato.proxima_actualizacion.between(hoy + timedelta(days=1), limite)),
+        )
+    ).all()
+    for contrato_id, fecha_fin, proxima, porcentaje, alias in filas:
+        if fecha_fin and hoy < fecha_fin <= hoy + timedelta(days=DIAS_ALERTA_VENCIMIENTO):
+            alertas.append({
+                "id": f"contrato-{contrato_id}",
+                "tipo": "VENCE",
+                "mensaje": f"Vence pronto - {alias or '??'}",
+                "fecha": fecha_fin.isoformat(),
+            })
+        if proxima and hoy < proxima <= hoy + timedelta(days=DIAS_ALERTA_AUMENTO):
+            alertas.append({
+                "id": f"aumento-{contrato_id}",
+                "tipo": "INFO",
+                "mensaje": f"Aumento Programado: {alias or '??'} ({porcentaje if porcentaje is not None else '?'}%)",
+                "fecha": proxima.isoformat(),
+            })
+
+    # C. Inconsistencia: departamento ALQUILADO sin contrato activo
+    for d in departamentos:
+        if d["estado"] == EstadoDepartamento.ALQUILADO and d["contrato_activo_id"] is None:
+            alertas.append({
+                "id": f"inconsistencia-{d['id']}",
+                "tipo": "ERROR",
+                "mensaje": f"Inconsistencia: {d['alias']} figura ALQUILADO sin contrato activo",
+                "fecha": "Revisar Ahora",
+            })
+
+    return alertas
+
+
+def obtener_dashboard(db: Session, hoy: date = None):
+    """
+    Devuelve el dashboard completo, desde el cache si ninguna de las cuatro tablas cambió
+    y no venció el TTL.
+    """
+    hoy = hoy or date.today()
+    clave = ("dashboard", hoy)
+    resultado = _cache_dashboard.obtener(clave, TABLAS_DASHBOARD)
+    if resultado is not None:
+        return resultado
+
+    versiones_calculo = cache.versiones(*TABLAS_DASHBOARD)
+    departamentos = _departamentos_con_inquilino(db)
+    conteos = {"total": len(departamentos)}
+    for estado in EstadoDepartamento:
+        conteos[estado.value] = sum(1 for d in departamentos if d["estado"] == estado)
+
+    resultado = {
+        "departamentos": departamentos,
+        "conteos": conteos,
+        "totales": _totales_pagos(db),
+        "alertas": _alertas(db, departamentos, hoy),
+        "generado_en": datetime.now(),
+    }
+    _cache_dashboard.guardar(clave, resultado, TABLAS_DASHBOARD, versiones_calculo)
+    return resultado
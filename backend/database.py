@@ -1,20 +1,84 @@
 """
 Configuración de la base de datos SQLite para el sistema de gestión de departamentos.
 """
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-# URL de la base de datos SQLite
-SQLALCHEMY_DATABASE_URL = "sqlite:///./toro_gestion.db"
+# URL de la base de datos SQLite (se puede cambiar con OIKOS_DATABASE_URL, p. ej. para benchmarks)
+SQLALCHEMY_DATABASE_URL = os.getenv("OIKOS_DATABASE_URL", "sqlite:///./toro_gestion.db")
+
+# Perfiles de PRAGMAs que se aplican a cada conexión nueva (elegir con OIKOS_DB_PERFIL)
+# - rendimiento: WAL + synchronous=NORMAL; las lecturas no se bloquean detrás de los jobs de escritura.
+# - seguro: WAL pero con synchronous=FULL (cada commit llega al disco).
+# - basico: comportamiento por defecto de SQLite, solo con claves foráneas activas.
+PERFILES_SQLITE = {
+    "rendimiento": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,        # ms esperando un lock antes de "database is locked"
+        "mmap_size": 268435456,      # 256 MB mapeados en memoria
+        "cache_size": -65536,        # 64 MB (valor negativo = KiB)
+        "temp_store": "MEMORY",
+        "foreign_keys": "ON",
+    },
+    "seguro": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+        "foreign_keys": "ON",
+    },
+    "basico": {
+        "foreign_keys": "ON",
+    },
+}
+PERFIL_SQLITE = os.getenv("OIKOS_DB_PERFIL", "rendimiento")
+
+
+def aplicar_perfil_sqlite(motor, perfil: str = None):
+    """
+    Registra un listener que aplica los PRAGMAs del perfil a cada conexión que abre el motor.
+    """
+    perfil = perfil or PERFIL_SQLITE
+    if perfil not in PERFILES_SQLITE:
+        raise ValueError(f"Perfil SQLite desconocido '{perfil}'. Opciones: {', '.join(PERFILES_SQLITE)}")
+    pragmas = PERFILES_SQLITE[perfil]
+
+    @event.listens_for(motor, "connect")
+    def _configurar_conexion(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for nombre, valor in pragmas.items():
+            cursor.execute(f"PRAGMA {nombre}={valor}")
+        cursor.close()
+
+
+def reporte_pragmas(motor) -> dict:
+    """
+    Devuelve los valores efectivos de los PRAGMAs del perfil leídos desde una conexión real.
+    """
+    nombres = list(PERFILES_SQLITE["rendimiento"])
+    with motor.connect() as conn:
+        return {nombre: conn.exec_driver_sql(f"PRAGMA {nombre}").scalar() for nombre in nombres}
+
+
+# Pool de conexiones (no aplica a SQLite en memoria, que usa una única conexión)
+OPCIONES_POOL = {} if SQLALCHEMY_DATABASE_URL in ("sqlite://", "sqlite:///:memory:") else {
+    "pool_size": int(os.getenv("OIKOS_DB_POOL_SIZE", "10")),
+    "max_overflow": int(os.getenv("OIKOS_DB_MAX_OVERFLOW", "20")),
+}
 
 # Crear el motor de la base de datos
 # connect_args={"check_same_thread": False} es necesario para SQLite
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    echo=False  # Cambiar a True para ver las queries SQL en consola
+    echo=False,  # Cambiar a True para ver las queries SQL en consola
+    **OPCIONES_POOL
 )
+if engine.dialect.name == "sqlite":
+    aplicar_perfil_sqlite(engine)
 
 # Crear la clase base para los modelos
 Base = declarative_base()
@@ -37,7 +101,8 @@ def get_db():
 
 def init_db():
     """
-    Inicializa la base de datos creando todas las tablas.
+    Inicializa la base de datos aplicando las migraciones pendientes (ver paquete migraciones).
+    Si el esquema ya está al día cuesta un único SELECT sobre schema_version.
     """
-    Base.metadata.create_all(bind=engine)
-
+    from migraciones import aplicar_migraciones
+    aplicar_migraciones(engine)
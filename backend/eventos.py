@@ -0,0 +1,251 @@
+"""
+Feed de cambios en vivo (GET /events, Server-Sent Events).
+
+Los cambios se toman de las sesiones, igual que la invalidación de cache.py: lo que se
+modifica en un flush (altas, cambios campo por campo, bajas) y las sentencias masivas
+(INSERT/UPDATE/DELETE) se acumulan en la sesión y se publican recién en el commit; si hay
+rollback se descartan. Así quedan cubiertos los endpoints de escritura y los jobs
+(cuotas, mora) sin tocar cada uno.
+
+Cada commit genera eventos compactos agrupados por tabla, operación y campos:
+    {"tabla": "pagos", "op": "update", "ids": [12, 13], "campos": ["estado", "fecha_pago"]}
+ids (o campos) en null significa que no se conocen (p. ej. el UPDATE del motor de mora, que
+filtra por condición): el cliente tiene que volver a pedir esa tabla. El evento "reset" pide
+recargar todo (cliente que se atrasó o que reconecta con un Last-Event-ID que ya no está).
+
+Las sesiones hacen commit en hilos (threadpool de FastAPI, jobs del planificador); el Difusor
+pasa los eventos al event loop con call_soon_threadsafe y los reparte en una cola por cliente.
+Como cache.py, es por proceso: con varios workers cada uno publica sus propios cambios. Por eso
+los ids de evento llevan la época del proceso ("<época>-<n>"): un Last-Event-ID de otro worker o
+de antes de un reinicio no se confunde con un id local y el cliente recibe un reset.
+"""
+import asyncio
+import json
+import os
+from collections import deque
+
+from sqlalchemy import event, inspect
+from sqlalchemy.sql.dml import Delete, Insert, Update
+
+import metricas
+from database import SessionLocal
+
+TABLAS = ("departamentos", "inquilinos", "contratos", "pagos", "indices_ipc")
+MAX_PENDIENTES = 1000  # eventos encolados por cliente antes de mandarle un reset
+HISTORIAL = 1000  # eventos recientes que se reenvían a quien reconecta con Last-Event-ID
+LATIDO_SEGUNDOS = 15  # comentario periódico para que proxies y navegadores no corten la conexión
+
+RESET = {"op": "reset"}
+
+
+class Difusor:
+    """
+    Reparte eventos entre los clientes conectados. suscribir/desuscribir y el reparto corren en
+    el event loop; publicar() se puede llamar desde cualquier hilo.
+    """
+
+    def __init__(self, max_pendientes: int = MAX_PENDIENTES, historial: int = HISTORIAL):
+        self.max_pendientes = max_pendientes
+        self._loop = None
+        self._suscriptores = set()
+        self._historial = deque(maxlen=historial)
+        self._ultimo_id = 0
+        # Los contadores de id arrancan en 0 en cada proceso: la época los distingue
+        self.epoca = os.urandom(4).hex()
+
+    @property
+    def activo(self) -> bool:
+        """
+        True desde que se conectó el primer cliente. A partir de ahí los cambios se registran
+        aunque no haya nadie conectado, para poder reenviarlos a quien reconecte.
+        """
+        return self._loop is not None
+
+    @property
+    def suscriptores(self) -> int:
+        return len(self._suscriptores)
+
+    def id_evento(self, numero: int) -> str:
+        return f"{self.epoca}-{numero}"
+
+    def _numero_local(self, id_evento: str):
+        """Número de un id de este proceso; None si es de otra época o no tiene el formato."""
+        epoca, _, numero = id_evento.partition("-")
+        return int(numero) if epoca == self.epoca and numero.isdigit() else None
+
+    def suscribir(self, ultimo_id: str = None) -> asyncio.Queue:
+        """
+        Cola con los eventos (número, evento) que se publiquen de ahora en más. Si se pasa el
+        último id recibido, se agregan antes los eventos posteriores del historial, o un reset si
+        ya no están o si el id es de otra época (otro worker o un reinicio).
+        """
+        self._loop = asyncio.get_running_loop()
+        cola = asyncio.Queue(maxsize=self.max_pendientes)
+        numero = self._numero_local(ultimo_id) if ultimo_id else None
+        if ultimo_id and numero is None:
+            self._encolar(cola, (self._ultimo_id, RESET))
+        elif numero is not None and numero != self._ultimo_id:
+            primero = self._historial[0][0] if self._historial else self._ultimo_id + 1
+            if primero <= numero + 1 <= self._ultimo_id + 1:
+                for mensaje in self._historial:
+                    if mensaje[0] > numero:
+                        self._encolar(cola, mensaje)
+            else:
+                self._encolar(cola, (self._ultimo_id, RESET))
+        self._suscriptores.add(cola)
+        return cola
+
+    def desuscribir(self, cola: asyncio.Queue):
+        self._suscriptores.discard(cola)
+
+    def publicar(self, eventos):
+        loop = self._loop
+        if loop is None or not eventos or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._repartir, eventos)
+
+    def _repartir(self, eventos):
+        for evento in eventos:
+            self._ultimo_id += 1
+            mensaje = (self._ultimo_id, evento)
+            self._historial.append(mensaje)
+            for cola in self._suscriptores:
+                self._encolar(cola, mensaje)
+
+    @staticmethod
+    def _encolar(cola: asyncio.Queue, mensaje):
+        try:
+            cola.put_nowait(mensaje)
+        except asyncio.QueueFull:
+            # Cliente que no da abasto: se descarta lo pendiente y se le pide recargar
+            while not cola.empty():
+                cola.get_nowait()
+            cola.put_nowait((mensaje[0], RESET))
+
+
+difusor = Difusor()
+
+metricas.Medidor(
+    "oikos_eventos_suscriptores", "Clientes conectados a GET /events", funcion=lambda: {(): difusor.suscriptores}
+)
+eventos_publicados = metricas.Contador("oikos_eventos_publicados_total", "Eventos publicados en GET /events", ("tabla",))
+
+
+# ============================================================================
+# SSE
+# ============================================================================
+
+def formatear(id_evento: str, evento: dict) -> str:
+    nombre = "reset" if evento is RESET else "cambio"
+    return f"id: {id_evento}\nevent: {nombre}\ndata: {json.dumps(evento, separators=(',', ':'))}\n\n"
+
+
+async def flujo(tablas=None, ultimo_id: str = None, desconectado=None):
+    """
+    Generador del cuerpo text/event-stream. 'tablas' filtra los eventos (los reset pasan siempre);
+    'ultimo_id' es el Last-Event-ID tal como llega; 'desconectado' es una corrutina que indica si
+    el cliente se fue, consultada en cada latido.
+    """
+    cola = difusor.suscribir(ultimo_id)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                numero, evento = await asyncio.wait_for(cola.get(), timeout=LATIDO_SEGUNDOS)
+            except asyncio.TimeoutError:
+                if desconectado is not None and await desconectado():
+                    break
+                yield ": latido\n\n"
+                continue
+            if tablas and evento is not RESET and evento["tabla"] not in tablas:
+                continue
+            yield formatear(difusor.id_evento(numero), evento)
+    finally:
+        difusor.desuscribir(cola)
+
+
+# ============================================================================
+# CAPTURA DESDE LAS SESIONES
+# ============================================================================
+
+def _pendientes(session):
+    return session.info.setdefault("eventos_pendientes", {})
+
+
+def _registrar(session, tabla, op, ids, campos):
+    """Agrupa por (tabla, op, campos); ids None (desconocidos) absorbe a los conocidos."""
+    clave = (tabla, op, campos)
+    pendientes = _pendientes(session)
+    if clave in pendientes and pendientes[clave] is None:
+        return
+    if ids is None:
+        pendientes[clave] = None
+    else:
+        pendientes.setdefault(clave, []).extend(ids)
+
+
+def _campos_modificados(objeto):
+    estado = inspect(objeto)
+    return tuple(sorted(
+        atributo.key for atributo in estado.mapper.column_attrs
+        if estado.attrs[atributo.key].history.has_changes()
+    ))
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _registrar_cambios_orm(session, flush_context):
+    if not difusor.activo:
+        return
+    for op, objetos in (("insert", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for objeto in objetos:
+            tabla = objeto.__table__.name
+            if tabla not in TABLAS:
+                continue
+            if op == "update":
+                campos = _campos_modificados(objeto)
+                if not campos:
+                    continue
+            else:
+                campos = None
+            _registrar(session, tabla, op, [objeto.id], campos)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _registrar_cambios_masivos(orm_execute_state):
+    statement = orm_execute_state.statement
+    if not difusor.activo or not isinstance(statement, (Insert, Update, Delete)):
+        return
+    tabla = statement.table.name
+    if tabla not in TABLAS:
+        return
+    op = "insert" if isinstance(statement, Insert) else "update" if isinstance(statement, Update) else "delete"
+    parametros = orm_execute_state.parameters
+    # UPDATE masivo por clave primaria (session.execute(update(Modelo), [{"id": ..., ...}])): ids y campos conocidos
+    if op == "update" and isinstance(parametros, list) and parametros and all("id" in p for p in parametros):
+        for parametro in parametros:
+            campos = tuple(sorted(k for k in parametro if k != "id"))
+            _registrar(orm_execute_state.session, tabla, op, [parametro["id"]], campos)
+        return
+    _registrar(orm_execute_state.session, tabla, op, None, None)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _publicar_al_confirmar(session):
+    pendientes = session.info.pop("eventos_pendientes", None)
+    if not pendientes:
+        return
+    eventos = []
+    for (tabla, op, campos), ids in pendientes.items():
+        eventos.append({
+            "tabla": tabla,
+            "op": op,
+            "ids": sorted(set(ids)) if ids is not None else None,
+            "campos": list(campos) if campos is not None else None,
+        })
+        eventos_publicados.inc(tabla)
+    difusor.publicar(eventos)
+
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _descartar_eventos(session, previous_transaction):
+    session.info.pop("eventos_pendientes", None)
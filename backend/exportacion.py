@@ -0,0 +1,89 @@
+"""
+Exportación masiva de pagos y contratos en CSV o NDJSON (GET /export/...).
+
+Las filas salen de un cursor del servidor (yield_per) en tandas de LOTE y se escriben
+apenas se leen: la memoria queda acotada a una tanda, sin importar cuántas filas se exporten.
+Se leen columnas de la tabla ya formateadas por SQLite (sin objetos del ORM ni modelos de Pydantic).
+El generador abre su propia sesión porque se consume después de que el endpoint devolvió
+la respuesta; los filtros se validan antes, en el endpoint, para poder responder 400.
+"""
+import csv
+import io
+import json
+
+from sqlalchemy import Date, DateTime, Enum, Numeric, String, case, func, select, type_coerce
+
+from database import SessionLocal
+from models import Contrato, Pago
+
+FORMATOS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+LOTE = 2000
+MODELOS = {"pagos": Pago, "contratos": Contrato}
+
+
+def _columna_texto(columna):
+    """
+    La columna tal como tiene que salir en el archivo, formateada por SQLite: los montos con
+    sus decimales ("448000.00"), fechas y estados como el texto guardado. Así las filas llegan
+    como str/int/None y no hay conversión valor por valor en Python (Decimal, date, Enum).
+    """
+    if isinstance(columna.type, Numeric) and columna.type.scale:
+        return case(
+            (columna.is_not(None), func.printf(f"%.{columna.type.scale}f", columna)), else_=None
+        ).label(columna.name)
+    if isinstance(columna.type, (Date, DateTime, Enum)):
+        return type_coerce(columna, String).label(columna.name)
+    return columna
+
+
+COLUMNAS = {entidad: [_columna_texto(c) for c in modelo.__table__.columns] for entidad, modelo in MODELOS.items()}
+
+
+def validar_formato(formato: str) -> str:
+    if formato not in FORMATOS:
+        raise ValueError(f"formato debe ser uno de: {', '.join(FORMATOS)}")
+    return formato
+
+
+def _tandas(entidad: str, condiciones):
+    """Filas de la entidad ordenadas por id, en listas de hasta LOTE filas."""
+    columnas = COLUMNAS[entidad]
+    consulta = (
+        select(*columnas)
+        .where(*condiciones)
+        .order_by(MODELOS[entidad].id)
+        .execution_options(yield_per=LOTE)
+    )
+    db = SessionLocal()
+    try:
+        # Core (db.connection()) y no db.execute: las filas no pasan por la carga del ORM
+        yield from db.connection().execute(consulta).partitions()
+    finally:
+        db.close()
+
+
+def exportar(entidad: str, formato: str, condiciones):
+    """
+    Generador con el contenido del archivo, una tanda de filas por chunk.
+    """
+    nombres = [c.name for c in COLUMNAS[entidad]]
+    if formato == "csv":
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        escritor.writerow(nombres)
+        for filas in _tandas(entidad, condiciones):
+            escritor.writerows(filas)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    else:
+        for filas in _tandas(entidad, condiciones):
+            yield "".join(
+                json.dumps(dict(zip(nombres, fila)), ensure_ascii=False) + "\n"
+                for fila in filas
+            )
@@ -0,0 +1,311 @@
+"""
+Generador de una cartera sintética grande (departamentos, inquilinos, contratos y pagos)
+para pruebas de carga y benchmarks.
+
+- Determinístico: la misma semilla y el mismo --hasta generan exactamente los mismos datos. La
+  ventana no depende de la fecha del sistema: sin --hasta termina en HASTA_DEFAULT, y los pagos
+  se fechan como si se generaran el último día de ese mes.
+- Respeta las reglas del esquema: alias y DNI únicos, un solo contrato ACTIVO por departamento
+  y una cuota por contrato y periodo.
+- Cada departamento tiene una sucesión de contratos (con vacancias entre uno y otro) dentro de
+  la ventana de años pedida; hay una cuota por cada mes de vigencia, con el alquiler ajustado
+  por el motor de indexación, y estados COBRADO / PARCIAL / PENDIENTE.
+- Inserta con INSERT masivos (executemany) por lotes sobre una base nueva migrada a la última versión.
+
+Como las cuotas salen de los contratos, la cantidad de pagos es aproximadamente
+departamentos x meses ocupados: la escala "grande" (85k departamentos, 5 años) da ~5M de pagos.
+
+Uso:
+    python generar_datos_sinteticos.py --escala media --db sintetico.db
+    python generar_datos_sinteticos.py --departamentos 2000 --contratos 15000 --anios 3 --semilla 7
+"""
+import argparse
+import calendar
+import os
+import random
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, insert, select, func
+
+from database import aplicar_perfil_sqlite
+from indexacion import SerieIPC, monto_vigente
+from migraciones import aplicar_migraciones
+from models import (
+    Departamento, Inquilino, Contrato, Pago, IndiceIPC,
+    EstadoDepartamento, EstadoInquilino, EstadoContrato, EstadoPago
+)
+from motor_intereses import DIA_VENCIMIENTO, TASA_DIARIA_MORA
+
+# Último periodo por defecto: fijo, para que una semilla reproduzca la misma cartera cualquier día
+HASTA_DEFAULT = "2025-12"
+
+ESCALAS = {
+    "chica": {"departamentos": 200, "inquilinos": 1000, "contratos": 2000},
+    "media": {"departamentos": 10000, "inquilinos": 50000, "contratos": 100000},
+    "grande": {"departamentos": 85000, "inquilinos": 200000, "contratos": 400000},
+}
+
+NOMBRES = ["Juan", "María", "Carlos", "Ana", "Luis", "Laura", "Jorge", "Sofía", "Diego", "Lucía",
+           "Martín", "Valeria", "Pablo", "Camila", "Hugo", "Florencia", "Andrés", "Julieta", "Tomás", "Paula"]
+APELLIDOS = ["Pérez", "González", "Rodríguez", "Fernández", "López", "Martínez", "García", "Sánchez",
+             "Romero", "Díaz", "Álvarez", "Torres", "Ruiz", "Ramírez", "Flores", "Acosta", "Benítez", "Medina"]
+CALLES = ["Av. San Martín", "Belgrano", "Sarmiento", "Rivadavia", "Mitre", "Av. Libertador", "Asunción",
+          "Córdoba", "Corrientes", "Tucumán", "Laprida", "Moreno", "Italia", "España", "Urquiza"]
+TIPOS = ["departamento", "departamento", "departamento", "casa", "local", "cochera"]
+
+
+def _mes(indice: int):
+    year, month = divmod(indice, 12)
+    return year, month + 1
+
+
+def _primer_dia(indice: int) -> date:
+    return date(*_mes(indice), 1)
+
+
+def _ultimo_dia(indice: int) -> date:
+    year, month = _mes(indice)
+    return date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _sumar_meses(fecha: date, meses: int) -> date:
+    indice = fecha.year * 12 + fecha.month - 1 + meses
+    year, month = _mes(indice)
+    return date(year, month, min(fecha.day, calendar.monthrange(year, month)[1]))
+
+
+def _repartir(total: int, partes: int, rng: random.Random):
+    """
+    Reparte 'total' en 'partes' enteros >= 1 al azar (cortes aleatorios sobre el total).
+    """
+    if partes <= 1:
+        return [total]
+    cortes = sorted(rng.sample(range(1, total), partes - 1))
+    return [b - a for a, b in zip([0, *cortes], [*cortes, total])]
+
+
+class Generador:
+    def __init__(self, conn, args):
+        self.conn = conn
+        self.args = args
+        self.rng = random.Random(args.semilla)
+        year, month = map(int, args.hasta.split("-"))
+        self.mes_final = year * 12 + month - 1
+        self.mes_inicial = self.mes_final - args.anios * 12 + 1
+        self.hoy = _ultimo_dia(self.mes_final)
+        self.serie = SerieIPC(conn.execute(select(IndiceIPC.periodo, IndiceIPC.valor)).all())
+        self.cantidades = {}
+
+    # --- Inserción por lotes ---
+    def _insertar(self, tabla, filas):
+        lote, total = [], 0
+        inicio = time.perf_counter()
+        for fila in filas:
+            lote.append(fila)
+            if len(lote) >= self.args.lote:
+                self.conn.execute(insert(tabla), lote)
+                total += len(lote)
+                lote = []
+        if lote:
+            self.conn.execute(insert(tabla), lote)
+            total += len(lote)
+        self.conn.commit()
+        segundos = time.perf_counter() - inicio
+        self.cantidades[tabla.name] = total
+        print(f"  ✅ {tabla.name}: {total:,} filas en {segundos:.1f} s ({total / max(segundos, 1e-9):,.0f} filas/s)")
+
+    # --- Entidades ---
+    def _inquilinos(self):
+        n = self.args.inquilinos
+        dnis = self.rng.sample(range(10_000_000, 50_000_000), n)
+        for i in range(n):
+            nombre = f"{self.rng.choice(NOMBRES)} {self.rng.choice(APELLIDOS)}"
+            yield {
+                "id": i + 1,
+                "nombre_apellido": nombre,
+                "dni": str(dnis[i]),
+                "telefono": f"+54 9 11 {self.rng.randint(1000, 9999)} {self.rng.randint(1000, 9999)}",
+                "email": f"inquilino{i + 1}@example.com",
+                "canal_comunicacion": self.rng.choice(["WhatsApp", "WhatsApp", "Email", "Teléfono"]),
+                "estado": EstadoInquilino.ACTIVO if self.rng.random() < 0.9 else EstadoInquilino.INACTIVO,
+            }
+
+    def _planificar_contratos(self):
+        """
+        Decide para cada departamento su sucesión de contratos. Devuelve (departamentos, contratos).
+        """
+        D, C = self.args.departamentos, self.args.contratos
+        meses_ventana = self.mes_final - self.mes_inicial + 1
+        propietarios = [f"{self.rng.choice(NOMBRES)} {self.rng.choice(APELLIDOS)}" for _ in range(max(1, D // 20))]
+        por_departamento = [C // D + (1 if i < C % D else 0) for i in range(D)]
+        self.rng.shuffle(por_departamento)
+
+        departamentos, contratos = [], []
+        for d in range(D):
+            depto_id = d + 1
+            cantidad = min(por_departamento[d], meses_ventana // 2) if meses_ventana >= 2 else 1
+            cantidad = max(cantidad, 1) if por_departamento[d] else 0
+            activo = False
+            if cantidad:
+                # Segmentos consecutivos (contrato + vacancia) que cubren la ventana
+                segmentos = _repartir(meses_ventana, cantidad, self.rng) if cantidad > 1 else [meses_ventana]
+                mes = self.mes_inicial
+                for k, largo in enumerate(segmentos):
+                    vacancia = self.rng.randint(0, min(2, largo - 1)) if largo > 1 else 0
+                    inicio = mes + vacancia
+                    fin = mes + largo - 1
+                    ultimo = k == len(segmentos) - 1
+                    if ultimo and self.rng.random() < 0.85:
+                        # Sigue vigente: vence en el futuro
+                        fin = self.mes_final + self.rng.randint(1, 24)
+                        estado = EstadoContrato.ACTIVO
+                        activo = True
+                    else:
+                        estado = EstadoContrato.RESCINDIDO if self.rng.random() < 0.1 else EstadoContrato.VENCIDO
+                    fecha_inicio = _primer_dia(inicio)
+                    meses_act = self.rng.choice([3, 4, 6, 6, 6])
+                    contratos.append({
+                        "id": len(contratos) + 1,
+                        "departamento_id": depto_id,
+                        "inquilino_id": self.rng.randint(1, self.args.inquilinos),
+                        "fecha_inicio": fecha_inicio,
+                        "fecha_fin": _ultimo_dia(fin),
+                        "monto_inicial": self.rng.randrange(150_000, 900_000, 1000),
+                        "deposito_garantia": None,
+                        "proxima_actualizacion": _sumar_meses(fecha_inicio, meses_act),
+                        "porcentaje_actualizacion": self.rng.choice([5, 8, 10, 12]) if self.rng.random() < 0.3 else None,
+                        "meses_actualizacion": meses_act,
+                        "estado": estado,
+                    })
+                    mes += largo
+
+            if activo:
+                estado_depto = EstadoDepartamento.ALQUILADO
+            else:
+                estado_depto = EstadoDepartamento.REFACCION if self.rng.random() < 0.15 else EstadoDepartamento.VACIO
+            calle = self.rng.choice(CALLES)
+            departamentos.append({
+                "id": depto_id,
+                "alias": f"D{depto_id:06d} - {calle} {self.rng.randint(100, 4999)}",
+                "direccion": f"{calle} {self.rng.randint(100, 4999)}, Piso {self.rng.randint(0, 15)}",
+                "propietario_nombre": self.rng.choice(propietarios),
+                "tipo": self.rng.choice(TIPOS),
+                "estado": estado_depto,
+            })
+        return departamentos, contratos
+
+    def _pagos(self, contratos):
+        """
+        Una cuota por mes de vigencia dentro de la ventana (hasta el mes final inclusive).
+        """
+        mes_reciente = self.mes_final - 1
+        tasa = float(TASA_DIARIA_MORA)
+        for c in contratos:
+            desde = max(c["fecha_inicio"].year * 12 + c["fecha_inicio"].month - 1, self.mes_inicial)
+            hasta = min(c["fecha_fin"].year * 12 + c["fecha_fin"].month - 1, self.mes_final)
+            expensas = self.rng.choice([0, 0, 20_000, 35_000, 50_000])
+            for mes in range(desde, hasta + 1):
+                year, month = _mes(mes)
+                periodo = f"{year}-{month:02d}"
+                # Datos de prueba: los meses sin IPC cargado se toman sin variación
+                alquiler = monto_vigente(self.serie, periodo, c["monto_inicial"], c["proxima_actualizacion"],
+                                         c["porcentaje_actualizacion"], c["meses_actualizacion"], proyectar=True)
+                azar = self.rng.random()
+                prob_pendiente = 0.7 if mes == self.mes_final else 0.4 if mes >= mes_reciente else 0.04
+                vencimiento = date(year, month, DIA_VENCIMIENTO)
+                fecha_pago, mora = None, 0
+                if azar < prob_pendiente:
+                    estado = EstadoPago.PENDIENTE
+                elif azar < prob_pendiente + 0.03:
+                    estado = EstadoPago.PARCIAL
+                    fecha_pago = vencimiento + timedelta(days=self.rng.randint(0, 20))
+                else:
+                    estado = EstadoPago.COBRADO
+                    fecha_pago = date(year, month, self.rng.randint(1, 20))
+                if fecha_pago and fecha_pago > self.hoy:
+                    # No se registran pagos en el futuro
+                    estado, fecha_pago = EstadoPago.PENDIENTE, None
+                if fecha_pago and fecha_pago > vencimiento:
+                    mora = round(float(alquiler) * tasa * (fecha_pago - vencimiento).days, 2)
+                yield {
+                    "contrato_id": c["id"],
+                    "periodo": periodo,
+                    "monto_alquiler": alquiler,
+                    "monto_expensas": expensas,
+                    "monto_servicios": 0,
+                    "fecha_pago": fecha_pago,
+                    "estado": estado,
+                    "monto_mora": mora,
+                    "mora_calculada_al": None,
+                }
+
+    def generar(self):
+        print(f"🏗️ Generando cartera sintética (semilla {self.args.semilla}, "
+              f"{_primer_dia(self.mes_inicial):%Y-%m} a {_primer_dia(self.mes_final):%Y-%m}, al {self.hoy})")
+        departamentos, contratos = self._planificar_contratos()
+        self._insertar(Departamento.__table__, departamentos)
+        self._insertar(Inquilino.__table__, self._inquilinos())
+        self._insertar(Contrato.__table__, contratos)
+        self._insertar(Pago.__table__, self._pagos(contratos))
+        return self.cantidades
+
+
+def _url(db: str) -> str:
+    return db if "://" in db else f"sqlite:///{db}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera una cartera sintética grande para pruebas de carga.")
+    parser.add_argument("--db", default="sintetico.db", help="Archivo SQLite o URL de SQLAlchemy (default: sintetico.db)")
+    parser.add_argument("--escala", choices=ESCALAS, default="chica", help="Tamaños predefinidos (se pueden pisar abajo)")
+    parser.add_argument("--departamentos", type=int)
+    parser.add_argument("--inquilinos", type=int)
+    parser.add_argument("--contratos", type=int)
+    parser.add_argument("--anios", type=int, default=5, help="Años de historia de pagos (default: 5)")
+    parser.add_argument("--hasta", default=HASTA_DEFAULT, help=f"Último periodo YYYY-MM (default: {HASTA_DEFAULT})")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--lote", type=int, default=20000, help="Filas por INSERT masivo")
+    parser.add_argument("--reemplazar", action="store_true", help="Borra el archivo SQLite si ya existe")
+    args = parser.parse_args()
+    for campo, valor in ESCALAS[args.escala].items():
+        if getattr(args, campo) is None:
+            setattr(args, campo, valor)
+    if min(args.departamentos, args.inquilinos) < 1 or args.contratos < 0 or args.anios < 1:
+        parser.error("departamentos, inquilinos y anios deben ser positivos")
+    try:
+        year, month = map(int, args.hasta.split("-"))
+        date(year, month, 1)
+    except ValueError:
+        parser.error(f"--hasta inválido '{args.hasta}'. Formato esperado: YYYY-MM")
+
+    url = _url(args.db)
+    if url.startswith("sqlite:///") and args.reemplazar:
+        archivo = url[len("sqlite:///"):]
+        for sufijo in ("", "-wal", "-shm"):
+            if os.path.exists(archivo + sufijo):
+                os.remove(archivo + sufijo)
+
+    motor = create_engine(url)
+    if motor.dialect.name == "sqlite":
+        aplicar_perfil_sqlite(motor, "rendimiento")
+    aplicar_migraciones(motor)
+
+    inicio = time.perf_counter()
+    with motor.connect() as conn:
+        if conn.execute(select(func.count()).select_from(Departamento.__table__)).scalar():
+            parser.error(f"La base {args.db} ya tiene datos (usar --reemplazar o otro archivo)")
+        if motor.dialect.name == "sqlite":
+            # Base descartable: no hace falta esperar al disco en cada commit
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        cantidades = Generador(conn, args).generar()
+        if motor.dialect.name == "sqlite":
+            conn.exec_driver_sql("ANALYZE")
+
+    total = sum(cantidades.values())
+    print(f"🎉 Listo: {total:,} filas en {time.perf_counter() - inicio:.1f} s -> {args.db} "
+          f"(semilla {args.semilla}, hasta {args.hasta})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,169 +1,613 @@
-import pandas as pd
+"""
+Importación de la planilla maestra (OIKOS_Datos_Maestros.xlsx): hojas Departamentos, Inquilinos y Contratos.
+
+- Lee las hojas en streaming (openpyxl en modo read-only) o, si se pasa un directorio, desde
+  Departamentos.csv / Inquilinos.csv / Contratos.csv.
+- Valida y normaliza por lotes y escribe con INSERT/UPDATE masivos (un executemany por lote).
+- Es un upsert: no borra nada. Departamentos por alias, inquilinos por DNI (o por nombre si no
+  tienen DNI) y contratos por (departamento, inquilino, fecha de inicio).
+- Guarda una huella (hash) de cada fila en huellas_importacion. Con --incremental solo se
+  escriben las filas nuevas o modificadas y se dan de baja las que ya no están; --dry-run
+  muestra esas diferencias sin escribir.
+- Al final informa, por hoja, las diferencias, las filas escritas y omitidas y el tiempo.
+
+Uso: python importar_datos.py [archivo.xlsx | directorio_csv] [--lote 1000] [--incremental] [--dry-run]
+"""
+import argparse
+import csv
+import hashlib
+import json
 import os
-import sys
+import time
 from datetime import date, datetime, timedelta
-from database import SessionLocal, init_db, engine
-from models import Base, Departamento, Inquilino, Contrato, Pago, EstadoContrato, EstadoPago
-from sqlalchemy import text
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import select, insert, update, delete, func, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database import SessionLocal, init_db
+from models import Departamento, Inquilino, Contrato, HuellaImportacion, EstadoDepartamento, EstadoInquilino, EstadoContrato
+from resolutor_inquilinos import ResolutorInquilinos
 
 FILENAME = "../OIKOS_Datos_Maestros.xlsx"
+LOTE = 1000
 
 # Valores por defecto para datos faltantes
 DEFAULT_DATE_START = date.today()
 DEFAULT_DATE_END = date.today() + timedelta(days=365) # 1 año por defecto
 
+VALORES_VACIOS = {'nan', 'none', 'null', '', 'a completar', 'constatar', 'verificar', 'no', 'ninguno', 'no necesita', 'a digitalizar', '-'}
+FORMATOS_FECHA = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y", "%Y-%m-%d %H:%M:%S")
+
+
 def clean_value(val, default=None):
-    if pd.isna(val):
+    if val is None or (isinstance(val, float) and val != val):
         return default
     s = str(val).strip()
-    if s.lower() in ['nan', 'none', 'null', '', 'a completar', 'constatar', 'verificar', 'no', 'ninguno', 'no necesita', 'a digitalizar', '-']:
+    if s.lower() in VALORES_VACIOS:
         return default
     return s
 
 def parse_date_smart(val, default=None):
+    if isinstance(val, datetime):
+        return val.date()
+    if isinstance(val, date):
+        return val
     cleaned = clean_value(val)
     if cleaned is None:
         return default
-    try:
-        return pd.to_datetime(cleaned).date()
-    except:
-        return default
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(cleaned, formato).date()
+        except ValueError:
+            continue
+    return default
 
 def parse_money(val):
-    if pd.isna(val): return 0
-    s = str(val).replace('$', '').replace('.', '').replace(',', '.').strip()
+    if isinstance(val, (int, float, Decimal)) and val == val:
+        return Decimal(str(val))
+    s = clean_value(val)
+    if s is None:
+        return Decimal(0)
+    # Formato local: "$ 315.303,50"
+    s = s.replace('$', '').replace(' ', '')
+    if ',' in s:
+        s = s.replace('.', '').replace(',', '.')
+    try:
+        return Decimal(s)
+    except InvalidOperation:
+        return Decimal(0)
+
+def parse_enum(val, enum, default):
+    cleaned = clean_value(val)
+    if cleaned is None:
+        return default
     try:
-        return float(val)
-    except:
-        return 0
-
-def run_import():
-    print("🚀 Iniciando Importación Inteligente OIKOS (V3 match models.py)...")
-    
-    if not os.path.exists(FILENAME):
-        print(f"❌ Archivo no encontrado: {FILENAME}")
+        return enum(cleaned.upper())
+    except ValueError:
+        return None
+
+
+# ============================================================================
+# LECTURA EN STREAMING
+# ============================================================================
+
+def leer_hoja(origen: str, hoja: str):
+    """
+    Genera las filas de la hoja como dicts {encabezado: valor}, sin cargar el archivo entero.
+    """
+    if os.path.isdir(origen):
+        with open(os.path.join(origen, f"{hoja}.csv"), newline="", encoding="utf-8-sig") as f:
+            for fila in csv.DictReader(f):
+                if any(v and v.strip() for v in fila.values()):
+                    yield fila
         return
 
-    # 1. Reset DB
-    print("🧹 Limpiando base de datos...")
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
-    
-    session = SessionLocal()
-    
-    # Cargar DataFrames
+    from openpyxl import load_workbook
+
+    libro = load_workbook(origen, read_only=True, data_only=True)
     try:
-        xls = pd.ExcelFile(FILENAME)
-        df_deptos = pd.read_excel(xls, 'Departamentos')
-        df_inquilinos = pd.read_excel(xls, 'Inquilinos')
-        df_contratos = pd.read_excel(xls, 'Contratos')
-    except Exception as e:
-        print(f"❌ Error leyendo Excel: {e}")
+        filas = libro[hoja].iter_rows(values_only=True)
+        encabezados = [str(c).strip() if c is not None else "" for c in next(filas, ())]
+        for valores in filas:
+            if any(v is not None and str(v).strip() for v in valores):
+                yield dict(zip(encabezados, valores))
+    finally:
+        libro.close()
+
+
+def en_lotes(filas, tamano: int):
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+class Reporte:
+    def __init__(self, hoja: str):
+        self.hoja = hoja
+        self.leidas = self.insertadas = self.actualizadas = self.omitidas = 0
+        self.inicio = time.perf_counter()
+        self.segundos = 0.0
+
+    def omitir(self, motivo: str):
+        self.omitidas += 1
+        print(f"⚠️ [{self.hoja}] {motivo}")
+
+    def cerrar(self):
+        self.segundos = time.perf_counter() - self.inicio
+        return self
+
+    def resumen(self) -> dict:
+        return {"leidas": self.leidas, "insertadas": self.insertadas, "actualizadas": self.actualizadas,
+                "omitidas": self.omitidas, "segundos": round(self.segundos, 3)}
+
+
+def _escribir(session, modelo, nuevos, existentes):
+    """
+    INSERT masivo de los nuevos y UPDATE masivo por id de los existentes.
+    Devuelve los ids de los nuevos en el mismo orden en que se pasaron.
+
+    Los ids de los nuevos se asignan acá, a continuación de MAX(id) leído en la misma
+    transacción: en SQLite un INSERT ... RETURNING con orden garantizado se ejecuta fila por
+    fila, y así el alta es un único executemany. Si otro proceso inserta en la misma tabla
+    entre la lectura y el INSERT, la clave primaria choca y el lote falla (no se pisa nada).
+    """
+    ids = []
+    if nuevos:
+        desde = (session.execute(select(func.max(modelo.id))).scalar() or 0) + 1
+        ids = list(range(desde, desde + len(nuevos)))
+        session.execute(insert(modelo), [{"id": id_nuevo, **datos} for id_nuevo, datos in zip(ids, nuevos)])
+    if existentes:
+        session.execute(update(modelo), existentes)
+    return ids
+
+
+def _registrar_ids(ids, claves_nuevas, ids_nuevos, existentes, claves_existentes):
+    if ids is None:
         return
+    ids.update(zip(claves_nuevas, ids_nuevos))
+    ids.update(zip(claves_existentes, (e["id"] for e in existentes)))
 
-    # --- DEPARTAMENTOS ---
-    print(f"🏢 Procesando {len(df_deptos)} departamentos...")
-    deptos_map = {} # alias -> id
-    
-    for _, row in df_deptos.iterrows():
-        alias = str(row['alias']).strip()
-        
-        # Mapeo estricto a models.py (Departamento)
-        d = Departamento(
-            alias=alias,
-            direccion=str(row['direccion']),
-            propietario_nombre=clean_value(row['propietario_nombre']),
-            tipo=clean_value(row['tipo'], 'departamento'),
-            servicios_incluidos=clean_value(row['servicios_incluidos']),
-            seguro_poliza=clean_value(row['seguro_poliza']),
-            seguro_vencimiento=parse_date_smart(row['seguro_vencimiento']),
-            estado=clean_value(row['estado'], 'VACIO'),
-            notas_inventario=clean_value(row['notas_inventario'])
-        )
-        session.add(d)
-        session.flush()
-        deptos_map[alias] = d.id
-    
-    print("✅ Departamentos cargados.")
-
-    # --- INQUILINOS ---
-    print(f"👥 Procesando {len(df_inquilinos)} inquilinos...")
-    inquilinos_map = {} # nombre -> id
-    
-    for _, row in df_inquilinos.iterrows():
-        nombre = str(row['nombre_apellido']).strip()
-        
-        # Mapeo estricto a models.py (Inquilino)
-        # dni es Unique, pero si viene None, debería permitirse... 
-        # Si 'clean_value' retorna None, SQLAlchemy intentará insertar NULL.
-        # SQLite NULL en Unique columna: permite múltiples NULLs? Sí, estándar SQL.
-        
-        i = Inquilino(
-            nombre_apellido=nombre,
-            dni=clean_value(row['dni']), 
-            telefono=clean_value(row['telefono']),
-            email=clean_value(row['email']),
-            canal_comunicacion=clean_value(row['canal_comunicacion'], 'WhatsApp'),
-            estado=clean_value(row['estado'], 'ACTIVO')
-        )
-        session.add(i)
-        session.flush()
-        inquilinos_map[nombre] = i.id
-    
-    print("✅ Inquilinos cargados.")
-
-    # --- CONTRATOS ---
-    print(f"📜 Procesando {len(df_contratos)} contratos...")
-    cnt_ok = 0
-    cnt_skip = 0
-    
-    for _, row in df_contratos.iterrows():
-        depto_alias = str(row['departamento_alias']).strip()
-        inq_name = str(row['inquilino_name']).strip()
-        
-        if depto_alias not in deptos_map:
-            print(f"⚠️ Salto contrato: Depto '{depto_alias}' no existe.")
-            cnt_skip += 1
-            continue
-        
-        inq_id = inquilinos_map.get(inq_name)
-        if not inq_id:
-            # Fallback
-            for k, v in inquilinos_map.items():
-                if k.lower().startswith(inq_name.lower().split('/')[0]):
-                     inq_id = v
-                     break
-        
-        if not inq_id:
-            print(f"⚠️ Salto contrato: Inquilino '{inq_name}' no encontrado. (Disponible: {list(inquilinos_map.keys())})")
-            cnt_skip += 1
-            continue
 
-        f_inicio = parse_date_smart(row['fecha_inicio'], DEFAULT_DATE_START)
-        f_fin = parse_date_smart(row['fecha_fin'], DEFAULT_DATE_END)
-        
-        if f_fin <= f_inicio:
-            f_fin = f_inicio + timedelta(days=365)
-
-        monto = parse_money(row['monto_actual'])
-        
-        # Mapeo estricto a models.py (Contrato)
-        c = Contrato(
-            departamento_id=deptos_map[depto_alias],
-            inquilino_id=inq_id,
-            fecha_inicio=f_inicio,
-            fecha_fin=f_fin,
-            monto_inicial=monto, # models.py usa 'monto_inicial'
-            deposito_garantia=parse_money(row['deposito_garantia']),
-            contrato_firmado_url=clean_value(row['contrato_firmado_url']),
-            estado=EstadoContrato.ACTIVO
-        )
-        session.add(c)
-        cnt_ok += 1
+# ============================================================================
+# HOJAS
+# ============================================================================
+
+def importar_departamentos(session, filas, lote: int = LOTE, ids: dict = None) -> Reporte:
+    """
+    Upsert por alias. Si se pasa 'ids', lo completa con clave de la fila -> id del departamento.
+    """
+    reporte = Reporte("Departamentos")
+    for filas in en_lotes(filas, lote):
+        reporte.leidas += len(filas)
+        validos = {}
+        for row in filas:
+            alias = clean_value(row.get('alias'))
+            direccion = clean_value(row.get('direccion'))
+            estado = parse_enum(row.get('estado'), EstadoDepartamento, EstadoDepartamento.VACIO)
+            if not alias or not direccion:
+                reporte.omitir(f"Fila sin alias o dirección: {alias or '-'}")
+                continue
+            if estado is None:
+                reporte.omitir(f"Estado inválido '{row.get('estado')}' en {alias}")
+                continue
+            # Si el alias se repite en la hoja, gana la última fila
+            validos[alias] = {
+                "alias": alias,
+                "direccion": direccion,
+                "propietario_nombre": clean_value(row.get('propietario_nombre')),
+                "tipo": clean_value(row.get('tipo'), 'departamento'),
+                "servicios_incluidos": clean_value(row.get('servicios_incluidos')),
+                "seguro_poliza": clean_value(row.get('seguro_poliza')),
+                "seguro_vencimiento": parse_date_smart(row.get('seguro_vencimiento')),
+                "estado": estado,
+                "notas_inventario": clean_value(row.get('notas_inventario')),
+            }
+
+        ids_alias = dict(session.execute(
+            select(Departamento.alias, Departamento.id).where(Departamento.alias.in_(validos))
+        ).all())
+        existentes = [{"id": ids_alias[alias], **datos} for alias, datos in validos.items() if alias in ids_alias]
+        nuevos = [datos for alias, datos in validos.items() if alias not in ids_alias]
+        ids_nuevos = _escribir(session, Departamento, nuevos, existentes)
+        _registrar_ids(ids, [d["alias"] for d in nuevos], ids_nuevos, existentes, [d["alias"] for d in existentes])
+        reporte.insertadas += len(nuevos)
+        reporte.actualizadas += len(existentes)
+    session.commit()
+    return reporte.cerrar()
+
 
+def importar_inquilinos(session, filas, lote: int = LOTE, ids: dict = None) -> Reporte:
+    """
+    Upsert por DNI (por nombre si la fila no tiene DNI). Completa 'ids' como importar_departamentos.
+    """
+    reporte = Reporte("Inquilinos")
+    for filas in en_lotes(filas, lote):
+        reporte.leidas += len(filas)
+        por_dni, por_nombre = {}, {}
+        for row in filas:
+            nombre = clean_value(row.get('nombre_apellido'))
+            estado = parse_enum(row.get('estado'), EstadoInquilino, EstadoInquilino.ACTIVO)
+            if not nombre:
+                reporte.omitir("Fila sin nombre_apellido")
+                continue
+            if estado is None:
+                reporte.omitir(f"Estado inválido '{row.get('estado')}' en {nombre}")
+                continue
+            datos = {
+                "nombre_apellido": nombre,
+                "dni": clean_value(row.get('dni')),
+                "telefono": clean_value(row.get('telefono')),
+                "email": clean_value(row.get('email')),
+                "canal_comunicacion": clean_value(row.get('canal_comunicacion'), 'WhatsApp'),
+                "estado": estado,
+            }
+            if datos["dni"]:
+                por_dni[datos["dni"]] = datos
+            else:
+                # Sin DNI la única clave posible es el nombre
+                por_nombre[nombre] = datos
+
+        ids_dni = dict(session.execute(
+            select(Inquilino.dni, Inquilino.id).where(Inquilino.dni.in_(por_dni))
+        ).all())
+        ids_nombre = dict(session.execute(
+            select(Inquilino.nombre_apellido, Inquilino.id)
+            .where(Inquilino.dni.is_(None), Inquilino.nombre_apellido.in_(por_nombre))
+        ).all())
+        # Un inquilino cargado sin DNI que ahora llega con DNI se completa en lugar de duplicarse
+        sin_dni = dict(session.execute(
+            select(Inquilino.nombre_apellido, Inquilino.id).where(
+                Inquilino.dni.is_(None),
+                Inquilino.nombre_apellido.in_([d["nombre_apellido"] for dni, d in por_dni.items() if dni not in ids_dni]),
+            )
+        ).all())
+
+        nuevos, existentes = [], []
+        for dni, datos in por_dni.items():
+            id_existente = ids_dni.get(dni) or sin_dni.get(datos["nombre_apellido"])
+            (existentes.append({"id": id_existente, **datos}) if id_existente else nuevos.append(datos))
+        for nombre, datos in por_nombre.items():
+            (existentes.append({"id": ids_nombre[nombre], **datos}) if nombre in ids_nombre else nuevos.append(datos))
+
+        ids_nuevos = _escribir(session, Inquilino, nuevos, existentes)
+        _registrar_ids(ids, [_clave_inquilino_datos(d) for d in nuevos], ids_nuevos,
+                       existentes, [_clave_inquilino_datos(d) for d in existentes])
+        reporte.insertadas += len(nuevos)
+        reporte.actualizadas += len(existentes)
     session.commit()
-    print(f"✅ Contratos cargados: {cnt_ok} (Omitidos: {cnt_skip})")
-    print(f"✨ Importación finalizada.")
+    return reporte.cerrar()
+
+
+def importar_contratos(session, filas, lote: int = LOTE, ids: dict = None) -> Reporte:
+    """
+    Upsert por (departamento, inquilino, fecha de inicio). Completa 'ids' como importar_departamentos.
+    El inquilino se resuelve por nombre (o por la columna opcional inquilino_dni) con ResolutorInquilinos;
+    si el nombre coincide con más de un inquilino el contrato se omite y se informan los candidatos.
+    """
+    reporte = Reporte("Contratos")
+    resolutor = ResolutorInquilinos.desde_filas(
+        session.execute(select(Inquilino.id, Inquilino.nombre_apellido, Inquilino.dni))
+    )
+
+    for filas in en_lotes(filas, lote):
+        reporte.leidas += len(filas)
+        aliases = {str(row.get('departamento_alias') or '').strip() for row in filas}
+        deptos_map = dict(session.execute(
+            select(Departamento.alias, Departamento.id).where(Departamento.alias.in_(aliases))
+        ).all())
+
+        validos, claves_fuente = {}, {}
+        for row in filas:
+            depto_alias = str(row.get('departamento_alias') or '').strip()
+            inq_name = str(row.get('inquilino_name') or '').strip()
+            if depto_alias not in deptos_map:
+                reporte.omitir(f"Salto contrato: Depto '{depto_alias}' no existe.")
+                continue
+            resolucion = resolutor.resolver(inq_name, dni=row.get('inquilino_dni'))
+            if resolucion.ambigua:
+                reporte.omitir(f"Salto contrato: Inquilino '{inq_name}' ambiguo ({resolucion.criterio}): {resolutor.describir(resolucion)}")
+                continue
+            inq_id = resolucion.inquilino_id
+            if not inq_id:
+                reporte.omitir(f"Salto contrato: Inquilino '{inq_name}' no encontrado.")
+                continue
+            estado = parse_enum(row.get('estado'), EstadoContrato, EstadoContrato.ACTIVO)
+            if estado is None:
+                reporte.omitir(f"Estado inválido '{row.get('estado')}' en el contrato de {depto_alias}")
+                continue
+
+            f_inicio = parse_date_smart(row.get('fecha_inicio'), DEFAULT_DATE_START)
+            f_fin = parse_date_smart(row.get('fecha_fin'), DEFAULT_DATE_END)
+            if f_fin <= f_inicio:
+                f_fin = f_inicio + timedelta(days=365)
+
+            clave = (deptos_map[depto_alias], inq_id, f_inicio)
+            claves_fuente[clave] = clave_contrato(row)
+            validos[clave] = {
+                "departamento_id": clave[0],
+                "inquilino_id": inq_id,
+                "fecha_inicio": f_inicio,
+                "fecha_fin": f_fin,
+                "monto_inicial": parse_money(row.get('monto_actual')),
+                "deposito_garantia": parse_money(row.get('deposito_garantia')),
+                "contrato_firmado_url": clean_value(row.get('contrato_firmado_url')),
+                "estado": estado,
+            }
+
+        ids_clave = {
+            (d, i, f): id_
+            for id_, d, i, f in session.execute(
+                select(Contrato.id, Contrato.departamento_id, Contrato.inquilino_id, Contrato.fecha_inicio)
+                .where(tuple_(Contrato.departamento_id, Contrato.inquilino_id, Contrato.fecha_inicio).in_(list(validos)))
+            ).all()
+        } if validos else {}
+        # Un solo contrato ACTIVO por departamento: no se pisa el activo de otro inquilino
+        activos = dict(session.execute(
+            select(Contrato.departamento_id, Contrato.id).where(
+                Contrato.estado == EstadoContrato.ACTIVO,
+                Contrato.departamento_id.in_({c[0] for c in validos}),
+            )
+        ).all())
+
+        nuevos, existentes = [], []
+        for clave, datos in validos.items():
+            id_existente = ids_clave.get(clave)
+            activo = activos.get(clave[0])
+            if datos["estado"] == EstadoContrato.ACTIVO and activo and activo != id_existente:
+                reporte.omitir(f"Salto contrato: el departamento {clave[0]} ya tiene otro contrato activo (id {activo}).")
+                continue
+            if datos["estado"] == EstadoContrato.ACTIVO:
+                activos[clave[0]] = id_existente or -1
+            (existentes.append({"id": id_existente, **datos}) if id_existente else nuevos.append(datos))
+
+        ids_nuevos = _escribir(session, Contrato, nuevos, existentes)
+        _registrar_ids(ids, [claves_fuente[_clave_datos_contrato(d)] for d in nuevos], ids_nuevos,
+                       existentes, [claves_fuente[_clave_datos_contrato(d)] for d in existentes])
+        reporte.insertadas += len(nuevos)
+        reporte.actualizadas += len(existentes)
+    session.commit()
+    return reporte.cerrar()
+
+
+# ============================================================================
+# IMPORTACIÓN INCREMENTAL (HUELLAS)
+# ============================================================================
+
+def clave_departamento(row) -> str:
+    return clean_value(row.get('alias')) or ""
+
+
+def _clave_inquilino_datos(datos) -> str:
+    return datos["dni"] or f"nombre:{datos['nombre_apellido']}"
+
+
+def clave_inquilino(row) -> str:
+    return _clave_inquilino_datos({"dni": clean_value(row.get('dni')), "nombre_apellido": clean_value(row.get('nombre_apellido'))})
+
+
+def _clave_datos_contrato(datos):
+    return datos["departamento_id"], datos["inquilino_id"], datos["fecha_inicio"]
+
+
+def clave_contrato(row) -> str:
+    # La fecha cruda de la planilla (no el default de hoy) para que la clave sea estable entre corridas
+    inicio = parse_date_smart(row.get('fecha_inicio'))
+    return "|".join((
+        str(row.get('departamento_alias') or '').strip(),
+        str(row.get('inquilino_name') or '').strip(),
+        inicio.isoformat() if inicio else "",
+    ))
+
+
+def huella_fila(row) -> str:
+    contenido = json.dumps(sorted((str(k), None if v is None else str(v)) for k, v in row.items()), ensure_ascii=False)
+    return hashlib.blake2b(contenido.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class Diferencias:
+    """
+    Compara las filas de una hoja contra las huellas guardadas: nuevas, modificadas, sin cambios
+    y (al terminar de recorrer la hoja) eliminadas.
+    """
+
+    def __init__(self, hoja: str, guardadas: dict):
+        self.hoja = hoja
+        self.guardadas = guardadas  # clave -> (huella, entidad_id)
+        self.huellas = {}  # clave -> huella de las filas a escribir
+        self.vistas = set()
+        self.nuevas, self.modificadas = [], []
+        self.sin_cambios = 0
+
+    def filtrar(self, filas, clave_de, solo_cambios: bool):
+        for row in filas:
+            clave = clave_de(row)
+            huella = huella_fila(row)
+            self.vistas.add(clave)
+            anterior = self.guardadas.get(clave)
+            if anterior is None:
+                self.nuevas.append(clave)
+            elif anterior[0] != huella:
+                self.modificadas.append(clave)
+            else:
+                self.sin_cambios += 1
+                if solo_cambios:
+                    continue
+            self.huellas[clave] = huella
+            yield row
+
+    @property
+    def eliminadas(self):
+        return sorted(set(self.guardadas) - self.vistas)
+
+
+def _huellas_guardadas(session, hoja: str) -> dict:
+    filas = session.execute(
+        select(HuellaImportacion.clave, HuellaImportacion.huella, HuellaImportacion.entidad_id)
+        .where(HuellaImportacion.hoja == hoja)
+    ).all()
+    return {clave: (huella, entidad_id) for clave, huella, entidad_id in filas}
+
+
+def _guardar_huellas(session, diferencias: Diferencias, ids: dict, borrar_eliminadas: bool):
+    # Las filas omitidas no tienen id: sin huella, se vuelven a intentar en la próxima corrida
+    filas = [
+        {"hoja": diferencias.hoja, "clave": clave, "huella": huella, "entidad_id": ids[clave]}
+        for clave, huella in diferencias.huellas.items() if clave in ids
+    ]
+    if filas:
+        sentencia = sqlite_insert(HuellaImportacion.__table__)
+        session.execute(sentencia.on_conflict_do_update(
+            index_elements=["hoja", "clave"],
+            set_={"huella": sentencia.excluded.huella, "entidad_id": sentencia.excluded.entidad_id},
+        ), filas)
+    eliminadas = diferencias.eliminadas
+    if borrar_eliminadas and eliminadas:
+        session.execute(delete(HuellaImportacion).where(
+            HuellaImportacion.hoja == diferencias.hoja, HuellaImportacion.clave.in_(eliminadas)
+        ))
+
+
+def baja_departamentos(session, ids) -> dict:
+    """
+    Borra los departamentos que salieron de la planilla, salvo los que tienen contratos (historial).
+    """
+    con_contratos = set(session.execute(
+        select(Contrato.departamento_id).where(Contrato.departamento_id.in_(ids)).distinct()
+    ).scalars())
+    borrables = [i for i in ids if i not in con_contratos]
+    if borrables:
+        session.execute(delete(Departamento).where(Departamento.id.in_(borrables)))
+    return {"aplicadas": len(borrables), "conservadas": len(ids) - len(borrables)}
+
+
+def baja_inquilinos(session, ids) -> dict:
+    resultado = session.execute(
+        update(Inquilino).where(Inquilino.id.in_(ids), Inquilino.estado != EstadoInquilino.INACTIVO)
+        .values(estado=EstadoInquilino.INACTIVO).execution_options(synchronize_session=False)
+    )
+    return {"aplicadas": resultado.rowcount, "conservadas": len(ids) - resultado.rowcount}
+
+
+def baja_contratos(session, ids) -> dict:
+    resultado = session.execute(
+        update(Contrato).where(Contrato.id.in_(ids), Contrato.estado == EstadoContrato.ACTIVO)
+        .values(estado=EstadoContrato.RESCINDIDO).execution_options(synchronize_session=False)
+    )
+    return {"aplicadas": resultado.rowcount, "conservadas": len(ids) - resultado.rowcount}
+
+
+# Orden de importación: los contratos resuelven departamentos e inquilinos por alias y nombre
+HOJAS = [
+    ("Departamentos", clave_departamento, importar_departamentos, baja_departamentos),
+    ("Inquilinos", clave_inquilino, importar_inquilinos, baja_inquilinos),
+    ("Contratos", clave_contrato, importar_contratos, baja_contratos),
+]
+
+
+def _importar_hoja(session, origen, hoja, clave_de, importar, dar_de_baja, lote, incremental, dry_run):
+    inicio = time.perf_counter()
+    diferencias = Diferencias(hoja, _huellas_guardadas(session, hoja))
+    filas = diferencias.filtrar(leer_hoja(origen, hoja), clave_de, solo_cambios=incremental)
+    resultado = {}
+
+    if dry_run:
+        for _ in filas:
+            pass
+    elif incremental:
+        # Primero las bajas (p. ej. un contrato que cambió de fecha de inicio se rescinde antes de
+        # dar de alta el nuevo) y después solo las filas nuevas o modificadas.
+        cambios = list(filas)
+        eliminadas = [diferencias.guardadas[clave][1] for clave in diferencias.eliminadas]
+        resultado["bajas"] = dar_de_baja(session, eliminadas) if eliminadas else {"aplicadas": 0, "conservadas": 0}
+        ids = {}
+        resultado["escritura"] = importar(session, cambios, lote, ids).resumen()
+        _guardar_huellas(session, diferencias, ids, borrar_eliminadas=True)
+    else:
+        ids = {}
+        # Sin bajas: las huellas de las filas que faltan quedan para la próxima corrida incremental
+        resultado["escritura"] = importar(session, filas, lote, ids).resumen()
+        _guardar_huellas(session, diferencias, ids, borrar_eliminadas=False)
+    session.commit()
+
+    resultado.update({
+        "nuevas": diferencias.nuevas,
+        "modificadas": diferencias.modificadas,
+        "eliminadas": diferencias.eliminadas,
+        "sin_cambios": diferencias.sin_cambios,
+        "segundos": round(time.perf_counter() - inicio, 3),
+    })
+    return resultado
+
+
+def _imprimir_reporte(reporte: dict):
+    print(f"\n{'Hoja':<15}{'Nuevas':>8}{'Modif.':>8}{'Elimin.':>9}{'Iguales':>9}{'Escritas':>10}{'Omitidas':>10}{'Segundos':>10}")
+    for hoja, r in reporte["hojas"].items():
+        escritura = r.get("escritura", {})
+        escritas = escritura.get("insertadas", 0) + escritura.get("actualizadas", 0) + r.get("bajas", {}).get("aplicadas", 0)
+        print(f"{hoja:<15}{len(r['nuevas']):>8}{len(r['modificadas']):>8}{len(r['eliminadas']):>9}{r['sin_cambios']:>9}"
+              f"{escritas:>10}{escritura.get('omitidas', 0):>10}{r['segundos']:>10.2f}")
+    if reporte["dry_run"]:
+        for hoja, r in reporte["hojas"].items():
+            for tipo in ("nuevas", "modificadas", "eliminadas"):
+                if r[tipo]:
+                    muestra = ", ".join(r[tipo][:10]) + (f" (+{len(r[tipo]) - 10})" if len(r[tipo]) > 10 else "")
+                    print(f"   {hoja} {tipo}: {muestra}")
+
+
+def run_import(origen: str = None, lote: int = LOTE, incremental: bool = False, dry_run: bool = False):
+    """
+    Importa la planilla (o el directorio de CSV) y devuelve el reporte de diferencias por hoja.
+
+    - Completa (default): upsert de todas las filas; refresca las huellas.
+    - incremental: solo escribe las filas nuevas o modificadas respecto de la última importación
+      y da de baja las que desaparecieron (contratos rescindidos, inquilinos inactivos,
+      departamentos borrados si no tienen contratos).
+    - dry_run: solo calcula las diferencias, sin escribir nada.
+    """
+    origen = origen or FILENAME
+    print(f"🚀 Iniciando importación OIKOS desde {origen}" + (" (vista previa)" if dry_run else " (incremental)" if incremental else "") + "...")
+
+    if not os.path.exists(origen):
+        print(f"❌ Archivo no encontrado: {origen}")
+        return None
+
+    init_db()
+    reporte = {"origen": origen, "incremental": incremental, "dry_run": dry_run, "hojas": {}}
+    with SessionLocal() as session:
+        for hoja, clave_de, importar, dar_de_baja in HOJAS:
+            try:
+                reporte["hojas"][hoja] = _importar_hoja(session, origen, hoja, clave_de, importar, dar_de_baja,
+                                                        lote, incremental, dry_run)
+            except (KeyError, OSError) as e:
+                session.rollback()
+                print(f"❌ Error leyendo {hoja}: {e}")
+                return None
+
+    _imprimir_reporte(reporte)
+    print("👀 Vista previa: no se escribió nada." if dry_run else "✨ Importación finalizada.")
+    return reporte
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa la planilla maestra de OIKOS (upsert, no borra datos).")
+    parser.add_argument("origen", nargs="?", default=FILENAME, help=f"Archivo .xlsx o directorio con los CSV (default: {FILENAME})")
+    parser.add_argument("--lote", type=int, default=LOTE, help=f"Filas por INSERT/UPDATE masivo (default: {LOTE})")
+    parser.add_argument("--incremental", action="store_true", help="Solo escribe lo que cambió desde la última importación")
+    parser.add_argument("--dry-run", action="store_true", help="Muestra las diferencias sin escribir")
+    parser.add_argument("--reporte", help="Guarda el reporte de diferencias en este archivo JSON")
+    args = parser.parse_args()
+    reporte = run_import(args.origen, args.lote, incremental=args.incremental or args.dry_run, dry_run=args.dry_run)
+    if reporte and args.reporte:
+        with open(args.reporte, "w", encoding="utf-8") as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False)
+        print(f"💾 Reporte en {args.reporte}")
+
 
 if __name__ == "__main__":
-    run_import()
+    main()
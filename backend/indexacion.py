@@ -0,0 +1,160 @@
+"""
+Motor de indexación de alquileres.
+
+Reglas por contrato:
+- Hasta el mes de proxima_actualizacion (primer ajuste) se cobra monto_inicial.
+- Desde ahí el alquiler se ajusta cada meses_actualizacion meses (6 por defecto).
+- Con porcentaje_actualizacion cargado, cada ajuste aplica ese porcentaje fijo.
+- Sin porcentaje, cada ajuste aplica el IPC acumulado de los meses_actualizacion meses
+  anteriores al ajuste (igual que la Calculadora IPC: el ajuste de diciembre usa junio-noviembre).
+
+La serie IPC se guarda como un arreglo de productos acumulados: prefijo[i] es el producto de
+(1 + ipc/100) de todos los meses anteriores al i-ésimo. Como las ventanas de ajuste son
+consecutivas, el factor acumulado de k ajustes es un cociente de dos prefijos: O(1) por cuota.
+
+Un ajuste por IPC cuya ventana tiene meses sin dato (huecos o meses posteriores al último
+cargado) no se calcula: factor_ajuste lanza IPCIncompleto con los periodos que faltan, para no
+cobrar esos meses como 0%. Los pronósticos, que proyectan a futuro, piden proyectar=True y
+ahí los meses sin dato sí cuentan como 0%.
+"""
+import os
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import cache
+from models import IndiceIPC
+
+MESES_ACTUALIZACION_DEFAULT = 6
+
+TABLAS_IPC = ("indices_ipc",)
+_cache_serie = cache.CacheTTL(float(os.getenv("OIKOS_IPC_TTL", "300")))
+
+
+def indice_mes(year: int, month: int) -> int:
+    return year * 12 + month - 1
+
+
+def periodo_de_indice(indice: int) -> str:
+    year, month = divmod(indice, 12)
+    return f"{year}-{month + 1:02d}"
+
+
+def indice_periodo(periodo: str) -> int:
+    """
+    Índice del mes de un periodo 'YYYY-MM' ya validado (ver automation_pagos.parsear_periodo).
+    """
+    year, month = periodo.split("-")
+    return indice_mes(int(year), int(month))
+
+
+class IPCIncompleto(ValueError):
+    """
+    La serie IPC no cubre la ventana de un ajuste. 'faltantes' son los periodos sin dato.
+    """
+
+    def __init__(self, faltantes):
+        self.faltantes = faltantes
+        super().__init__(f"Faltan los índices IPC de: {', '.join(faltantes)}")
+
+
+class SerieIPC:
+    """
+    Productos acumulados de la serie mensual de IPC. Los meses sin dato cuentan como 0% en los
+    productos; cubre() indica si una ventana tiene todos sus meses cargados.
+    """
+
+    def __init__(self, valores):
+        # valores: lista de (periodo 'YYYY-MM', variación mensual en %)
+        meses = {indice_periodo(periodo): float(valor) for periodo, valor in valores}
+        self.meses = frozenset(meses)
+        self.inicio = min(meses) if meses else 0
+        fin = max(meses) + 1 if meses else 0
+        # factores[i]: (1 + ipc/100) del mes inicio + i
+        self.factores = [1 + meses.get(mes, 0.0) / 100 for mes in range(self.inicio, fin)]
+        self.prefijo = [1.0]
+        # con_dato[i]: cantidad de meses con dato anteriores al mes inicio + i
+        self.con_dato = [0]
+        for i, factor in enumerate(self.factores):
+            self.prefijo.append(self.prefijo[-1] * factor)
+            self.con_dato.append(self.con_dato[-1] + (self.inicio + i in self.meses))
+
+    def cubre(self, desde: int, hasta: int) -> bool:
+        """
+        True si todos los meses desde..hasta-1 tienen dato.
+        """
+        if desde >= hasta:
+            return True
+        if desde < self.inicio or hasta > self.inicio + len(self.factores):
+            return False
+        return self.con_dato[hasta - self.inicio] - self.con_dato[desde - self.inicio] == hasta - desde
+
+    def faltantes(self, desde: int, hasta: int) -> list:
+        """
+        Periodos 'YYYY-MM' sin dato entre desde y hasta-1.
+        """
+        return [periodo_de_indice(mes) for mes in range(desde, hasta) if mes not in self.meses]
+
+    def acumulado_hasta(self, mes: int) -> float:
+        """
+        Producto de los factores de todos los meses anteriores a 'mes'.
+        """
+        posicion = min(max(mes - self.inicio, 0), len(self.prefijo) - 1)
+        return self.prefijo[posicion]
+
+    def factor(self, desde: int, hasta: int) -> float:
+        """
+        Variación acumulada (como factor) de los meses desde..hasta-1.
+        """
+        return self.acumulado_hasta(hasta) / self.acumulado_hasta(desde)
+
+
+def obtener_serie(db: Session) -> SerieIPC:
+    """
+    Serie IPC cacheada; se reconstruye cuando cambia la tabla indices_ipc o vence el TTL.
+    """
+    serie = _cache_serie.obtener("serie", TABLAS_IPC)
+    if serie is None:
+        versiones_calculo = cache.versiones(*TABLAS_IPC)
+        serie = SerieIPC(db.execute(select(IndiceIPC.periodo, IndiceIPC.valor)).all())
+        _cache_serie.guardar("serie", serie, TABLAS_IPC, versiones_calculo)
+    return serie
+
+
+def factor_ajuste(serie: SerieIPC, periodo: str, proxima_actualizacion: date = None,
+                  porcentaje_actualizacion=None, meses_actualizacion: int = None, proyectar: bool = False):
+    """
+    Devuelve (factor, ajustes_aplicados) sobre monto_inicial para la cuota del periodo dado.
+    Lanza IPCIncompleto si el ajuste es por IPC y la serie no cubre su ventana, salvo con proyectar=True.
+    """
+    if proxima_actualizacion is None:
+        return 1.0, 0
+    mes = indice_periodo(periodo)
+    primer_ajuste = indice_mes(proxima_actualizacion.year, proxima_actualizacion.month)
+    if mes < primer_ajuste:
+        return 1.0, 0
+
+    frecuencia = meses_actualizacion or MESES_ACTUALIZACION_DEFAULT
+    ajustes = (mes - primer_ajuste) // frecuencia + 1
+    if porcentaje_actualizacion is not None:
+        return (1 + float(porcentaje_actualizacion) / 100) ** ajustes, ajustes
+    ultimo_ajuste = primer_ajuste + (ajustes - 1) * frecuencia
+    if not proyectar and not serie.cubre(primer_ajuste - frecuencia, ultimo_ajuste):
+        raise IPCIncompleto(serie.faltantes(primer_ajuste - frecuencia, ultimo_ajuste))
+    return serie.factor(primer_ajuste - frecuencia, ultimo_ajuste), ajustes
+
+
+def redondear_monto(monto_inicial, factor: float) -> Decimal:
+    return (Decimal(monto_inicial) * Decimal(repr(factor))).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def monto_vigente(serie: SerieIPC, periodo: str, monto_inicial, proxima_actualizacion: date = None,
+                  porcentaje_actualizacion=None, meses_actualizacion: int = None, proyectar: bool = False) -> Decimal:
+    """
+    Alquiler ajustado de un contrato para el periodo 'YYYY-MM' (ver factor_ajuste).
+    """
+    factor, _ = factor_ajuste(serie, periodo, proxima_actualizacion, porcentaje_actualizacion, meses_actualizacion,
+                              proyectar)
+    return redondear_monto(monto_inicial, factor)
@@ -1,14 +1,19 @@
 """
 Aplicación principal FastAPI para el Sistema de Gestión de Departamentos TORO.
-Inicia el servidor y crea las tablas automáticamente al arrancar.
+Inicia el servidor y aplica las migraciones pendientes del esquema al arrancar.
 """
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, Header, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import text
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+import time
 
-from database import init_db, engine, get_db
-from models import Base, Departamento, Inquilino, Contrato, Pago, EstadoContrato, EstadoPago
+from database import init_db, engine, get_db, reporte_pragmas, PERFIL_SQLITE
+from models import Base, Departamento, Inquilino, Contrato, Pago, IndiceIPC, EstadoDepartamento, EstadoInquilino, EstadoContrato, EstadoPago
 from schemas import (
     DepartamentoCreate,
     DepartamentoUpdate,
@@ -19,10 +24,48 @@ from schemas import (
     ContratoCreate,
     ContratoUpdate,
     ContratoResponse,
-    ContratoResponseDetallado,
+    ContratoConRelaciones,
     PagoCreate,
     PagoResponse,
-    PagoUpdate
+    PagoUpdate,
+    PagoUpdateLote,
+    ResultadoLoteResponse,
+    JobEstadoResponse,
+    DashboardResponse,
+    IndiceIPCBase,
+    IndiceIPCResponse,
+    MontoContratoResponse,
+    SimulacionRequest,
+    SimulacionResponse,
+    PronosticoResponse,
+    ResultadoBusqueda
+)
+import planificador
+import metricas
+import perfilador
+import cache  # registra la invalidación del cache en los commits de las sesiones
+import cache_http
+import respuesta_rapida
+import eventos  # publica en GET /events los cambios confirmados por las sesiones
+from dashboard import obtener_dashboard
+from automation_pagos import parsear_periodo
+from indexacion import obtener_serie, factor_ajuste, redondear_monto, IPCIncompleto
+from simulaciones import simular
+from pronostico import pronosticar
+from busqueda import buscar
+from pagos_lote import crear_pagos, actualizar_pagos, PAGO_INEXISTENTE, CONTRATO_INEXISTENTE
+from exportacion import exportar, validar_formato, FORMATOS
+from consultas import (
+    condiciones_departamentos,
+    condiciones_inquilinos,
+    condiciones_contratos,
+    condiciones_pagos,
+    paginar,
+    contar,
+    parsear_include,
+    opciones_carga_contrato,
+    pagos_recientes_por_contrato,
+    serializar_contrato
 )
 
 # Crear la aplicación FastAPI
@@ -31,6 +74,9 @@ from config import APP_METADATA
 # Crear la aplicación FastAPI
 app = FastAPI(**APP_METADATA)
 
+# ETag / 304 y LRU de respuestas para los GET, invalidado por las versiones de tabla de cache.py.
+# Se agrega antes que CORS para quedar por dentro: los headers de CORS no se guardan en el cache.
+app.add_middleware(cache_http.MiddlewareCacheHTTP)
 # Configurar CORS para permitir conexiones desde el frontend
 app.add_middleware(
     CORSMiddleware,
@@ -38,63 +84,103 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-DB-Queries", "X-DB-Time", "ETag"],
 )
+# Consultas SQL por solicitud: log de lentas, detección de N+1 y headers X-DB-* con OIKOS_DEBUG_SQL=1
+app.add_middleware(perfilador.MiddlewarePerfilador)
+perfilador.instrumentar(engine)
+# Latencia, estados y solicitudes en curso por ruta (ver GET /metrics)
+app.add_middleware(metricas.MiddlewareMetricas)
+metricas.registrar_pool(engine)
+
+# Camino rápido de JSON (respuesta_rapida), activado ruta por ruta
+JSON_RAPIDO_PAGOS = respuesta_rapida.CaminoRapido()
+JSON_RAPIDO_CONTRATOS = respuesta_rapida.CaminoRapido()
 
 
 @app.on_event("startup")
 async def startup_event():
     """
     Evento que se ejecuta al iniciar la aplicación.
-    Crea todas las tablas de la base de datos si no existen.
+    Crea todas las tablas de la base de datos si no existen y arranca el planificador de jobs.
+    La generación de cuotas y el cálculo de mora corren en segundo plano, no bloquean el arranque.
     """
     print("🚀 Iniciando OIKOS (Sistema de Gestión TORO)...")
-    print("📊 Creando tablas de base de datos...")
+    print("📊 Verificando esquema de base de datos...")
     init_db()
     print("✅ Base de datos inicializada correctamente")
+    if engine.dialect.name == "sqlite":
+        pragmas = ", ".join(f"{k}={v}" for k, v in reporte_pragmas(engine).items())
+        print(f"⚙️ Perfil SQLite '{PERFIL_SQLITE}': {pragmas}")
     print("🌐 Servidor listo en http://localhost:8001")
     print("📚 Documentación disponible en http://localhost:8001/docs")
 
-    # Automatización: Generar cuotas del mes actual al iniciar
-    try:
-        from automation_pagos import generar_cuotas_mensuales
-        db = SessionLocal()
-        generados, existentes = generar_cuotas_mensuales(db)
-        print(f"💰 Automatización Pagos: Se generaron {generados} nuevas cuotas ({existentes} ya existían).")
-        
-        # Automatización: Calcular intereses por mora
-        from motor_intereses import calcular_mora_pagos
-        actualizados = calcular_mora_pagos(db)
-        
-        db.close()
-    except Exception as e:
-        print(f"⚠️ Error en automatización de pagos/mora: {e}")
+    # Automatización: cuotas mensuales (día 1) y mora diaria (00:05), en segundo plano
+    if planificador.iniciar():
+        print("⏱️ Planificador de jobs iniciado (ver GET /jobs)")
+    else:
+        print("⏸️ Planificador de jobs desactivado (OIKOS_PLANIFICADOR=0)")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Detiene el planificador de jobs al apagar el servidor.
+    """
+    await planificador.detener()
+
+
+@app.get("/jobs", response_model=List[JobEstadoResponse], tags=["Jobs"])
+def listar_jobs(db: Session = Depends(get_db)):
+    """
+    Estado de los jobs programados: próxima corrida y resultado de la última ejecución.
+    """
+    return planificador.estado_jobs(db)
 
 
 @app.post("/pagos/calcular-intereses", tags=["Pagos"])
 def forzar_calculo_intereses(db: Session = Depends(get_db)):
     """
     Endpoint para forzar el recálculo de intereses por mora.
+    La corrida se registra en las métricas del job calcular_mora_pagos.
     """
-    from motor_intereses import calcular_mora_pagos
-    actualizados = calcular_mora_pagos(db)
+    with planificador.medir_corrida("calcular_mora_pagos") as corrida:
+        actualizados = planificador.calcular_mora(db, corrida)
     return {
         "message": "Cálculo de intereses finalizado",
         "pagos_actualizados": actualizados
     }
 
 @app.post("/pagos/generar-cuotas", tags=["Pagos"])
-def forzar_generacion_cuotas(periodo: str = None, db: Session = Depends(get_db)):
+def forzar_generacion_cuotas(
+    periodo: str = None,
+    desde: str = None,
+    hasta: str = None,
+    db: Session = Depends(get_db)
+):
     """
     Endpoint para forzar la generación de cuotas de un mes específico (o el actual).
+    Con desde/hasta genera todo un rango de periodos en una sola pasada (backfill).
+    Las cuotas que necesitan un IPC todavía no cargado no se generan: se informan en
+    cuotas_sin_ipc / ipc_faltante.
     Formato periodo: 'YYYY-MM'
+    La corrida se registra en las métricas del job generar_cuotas_mensuales.
     """
-    from automation_pagos import generar_cuotas_mensuales
-    generados, existentes = generar_cuotas_mensuales(db, periodo)
+    from automation_pagos import periodo_actual, rango_periodos
+    inicio = desde or periodo or periodo_actual()
+    try:
+        periodos = rango_periodos(inicio, hasta)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    with planificador.medir_corrida("generar_cuotas_mensuales") as corrida:
+        generados, existentes, sin_ipc = planificador.generar_cuotas(db, corrida, inicio, hasta)
     return {
         "message": "Proceso finalizado",
         "cuotas_generadas": generados,
         "cuotas_existentes": existentes,
-        "periodo": periodo or "Mes Actual"
+        "cuotas_sin_ipc": sin_ipc["cuotas"],
+        "ipc_faltante": sin_ipc["ipc_faltante"],
+        "periodo": f"{periodos[0]} a {periodos[-1]}" if len(periodos) > 1 else periodos[0]
     }
 
 
@@ -113,31 +199,152 @@ async def root():
 
 
 @app.get("/health")
-async def health_check():
+def health_check():
     """
-    Endpoint de health check para verificar el estado del servicio.
+    Endpoint de health check: ejecuta un SELECT 1 real y reporta la latencia de la base.
+    Devuelve 503 si la base no responde.
     """
+    inicio = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unhealthy", "database": "error", "detail": str(e)}
+        )
+    latencia = time.perf_counter() - inicio
+    metricas.db_latencia_ping.set(round(latencia, 6))
     return {
         "status": "healthy",
-        "database": "connected"
+        "database": "connected",
+        "database_latency_ms": round(latencia * 1000, 3)
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def ver_metricas():
+    """
+    Métricas en formato de texto de Prometheus (HTTP, jobs y pool de conexiones).
+    """
+    return PlainTextResponse(metricas.exponer(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/dashboard", response_model=DashboardResponse, tags=["Dashboard"])
+def ver_dashboard(db: Session = Depends(get_db)):
+    """
+    Datos agregados del Dashboard en una sola llamada: departamentos con su inquilino activo,
+    conteos por estado, totales de pagos pendientes/mora y alertas.
+    """
+    return obtener_dashboard(db)
+
+
+@app.get("/pronostico", response_model=PronosticoResponse, tags=["Dashboard"])
+def ver_pronostico(
+    desde: Optional[str] = None,
+    meses: int = 12,
+    meses_vacancia: int = 2,
+    db: Session = Depends(get_db)
+):
+    """
+    Cobranza esperada mes a mes (alquileres ajustados, renovaciones tras la vacancia y mora
+    esperada según el historial), total y por departamento y propietario.
+    Solo se vuelven a proyectar los contratos que cambiaron desde la corrida anterior.
+    """
+    try:
+        return pronosticar(db, desde, meses, meses_vacancia)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+# ============================================================================
+# EVENTOS (SSE)
+# ============================================================================
+
+@app.get("/events", tags=["Eventos"])
+async def flujo_eventos(
+    request: Request,
+    tablas: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Server-Sent Events con los cambios confirmados: un evento "cambio" por tabla, operación y
+    campos en cada commit ({"tabla", "op", "ids", "campos"}) y "reset" cuando el cliente tiene
+    que recargar todo. tablas=pagos,contratos filtra; al reconectar, el navegador manda
+    Last-Event-ID y se reenvían los eventos que se perdió (o un reset si el id es de otro
+    proceso o de antes de un reinicio).
+    """
+    filtro = set(filter(None, (t.strip() for t in tablas.split(",")))) if tablas else None
+    if filtro and not filtro <= set(eventos.TABLAS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"tablas inválidas. Opciones: {', '.join(eventos.TABLAS)}"
+        )
+    return StreamingResponse(
+        eventos.flujo(filtro, last_event_id, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ============================================================================
+# BÚSQUEDA
+# ============================================================================
+
+@app.get("/buscar", response_model=List[ResultadoBusqueda], tags=["Búsqueda"])
+def buscar_texto(
+    q: str,
+    tipo: Optional[str] = None,
+    limit: int = 20,
+    db: Session = Depends(get_db)
+):
+    """
+    Busca departamentos (alias, dirección, propietario), inquilinos (nombre, DNI, email, teléfono)
+    y contratos (datos de su departamento e inquilino) con el índice FTS5. Cada palabra se busca
+    como prefijo; los resultados vienen mezclados y ordenados por relevancia.
+    """
+    try:
+        return buscar(db, q, tipo, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def error_integridad(error: IntegrityError, mensaje_unicidad: str) -> HTTPException:
+    """
+    Traduce un IntegrityError de un commit. La violación de un índice único es el conflicto que
+    cada endpoint espera (mensaje_unicidad); una clave foránea rota (foreign_keys=ON) es una
+    referencia a una entidad que no existe, y cualquier otra restricción, un dato inválido.
+    """
+    texto = str(error.orig)
+    if "UNIQUE constraint failed" in texto:
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=mensaje_unicidad)
+    if "FOREIGN KEY constraint failed" in texto:
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Alguna de las entidades referenciadas no existe")
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Datos inválidos: {texto}")
+
+
 # ============================================================================
 # ENDPOINTS CRUD - DEPARTAMENTOS
 # ============================================================================
 
 @app.get("/departamentos", response_model=List[DepartamentoResponse], tags=["Departamentos"])
 def listar_departamentos(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[int] = None,
+    estado: Optional[EstadoDepartamento] = None,
+    contar_total: bool = False,
     db: Session = Depends(get_db)
 ):
     """
-    Lista todos los departamentos con paginación.
+    Lista los departamentos con paginación por cursor (X-Next-Cursor) y filtro por estado.
+    Con contar_total=true devuelve además el total en X-Total-Count.
     """
-    departamentos = db.query(Departamento).offset(skip).limit(limit).all()
-    return departamentos
+    condiciones = condiciones_departamentos(estado)
+    if contar_total:
+        contar(db, Departamento, condiciones, response, (estado,))
+    return paginar(db.query(Departamento).filter(*condiciones), Departamento, response, cursor, skip, limit)
 
 
 @app.get("/departamentos/{departamento_id}", response_model=DepartamentoResponse, tags=["Departamentos"])
@@ -235,15 +442,22 @@ def eliminar_departamento(departamento_id: int, db: Session = Depends(get_db)):
 
 @app.get("/inquilinos", response_model=List[InquilinoResponse], tags=["Inquilinos"])
 def listar_inquilinos(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[int] = None,
+    estado: Optional[EstadoInquilino] = None,
+    contar_total: bool = False,
     db: Session = Depends(get_db)
 ):
     """
-    Lista todos los inquilinos con paginación.
+    Lista los inquilinos con paginación por cursor (X-Next-Cursor) y filtro por estado.
+    Con contar_total=true devuelve además el total en X-Total-Count.
     """
-    inquilinos = db.query(Inquilino).offset(skip).limit(limit).all()
-    return inquilinos
+    condiciones = condiciones_inquilinos(estado)
+    if contar_total:
+        contar(db, Inquilino, condiciones, response, (estado,))
+    return paginar(db.query(Inquilino).filter(*condiciones), Inquilino, response, cursor, skip, limit)
 
 
 @app.get("/inquilinos/{inquilino_id}", response_model=InquilinoResponse, tags=["Inquilinos"])
@@ -331,6 +545,14 @@ def eliminar_inquilino(inquilino_id: int, db: Session = Depends(get_db)):
             detail=f"Inquilino con ID {inquilino_id} no encontrado"
         )
     
+    # Con foreign_keys=ON la FK es RESTRICT: no se puede borrar un inquilino con contratos
+    tiene_contratos = db.query(Contrato.id).filter(Contrato.inquilino_id == inquilino_id).first()
+    if tiene_contratos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"El inquilino {inquilino_id} tiene contratos asociados y no puede eliminarse"
+        )
+    
     db.delete(db_inquilino)
     db.commit()
     return None
@@ -340,31 +562,59 @@ def eliminar_inquilino(inquilino_id: int, db: Session = Depends(get_db)):
 # ENDPOINTS CRUD - CONTRATOS
 # ============================================================================
 
-@app.get("/contratos", response_model=List[ContratoResponse], tags=["Contratos"])
+@app.get("/contratos", response_model=List[ContratoConRelaciones], response_model_exclude_unset=True, tags=["Contratos"])
 def listar_contratos(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[int] = None,
+    estado: Optional[EstadoContrato] = None,
+    departamento_id: Optional[int] = None,
+    inquilino_id: Optional[int] = None,
+    include: Optional[str] = None,
+    contar_total: bool = False,
+    rapido: bool = Depends(JSON_RAPIDO_CONTRATOS),
     db: Session = Depends(get_db)
 ):
     """
-    Lista todos los contratos con paginación.
-    """
-    contratos = db.query(Contrato).offset(skip).limit(limit).all()
-    return contratos
+    Lista los contratos con paginación por cursor (X-Next-Cursor) y filtros por estado,
+    departamento e inquilino. Con contar_total=true devuelve además el total en X-Total-Count.
+    include elige qué se embebe: pagos, departamento, inquilino, pagos_recientes=N (por defecto: pagos).
+    """
+    relaciones, recientes = parsear_include(include, "pagos")
+    condiciones = condiciones_contratos(estado, departamento_id, inquilino_id)
+    if contar_total:
+        contar(db, Contrato, condiciones, response, (estado, departamento_id, inquilino_id))
+    query = db.query(Contrato).options(*opciones_carga_contrato(relaciones, recientes)).filter(*condiciones)
+    contratos = paginar(query, Contrato, response, cursor, skip, limit)
+    recientes_map = pagos_recientes_por_contrato(db, [c.id for c in contratos], recientes) if recientes else None
+    if rapido:
+        return respuesta_rapida.responder(
+            [serializar_contrato(c, relaciones, recientes_map, rapido=True) for c in contratos], response
+        )
+    return [serializar_contrato(c, relaciones, recientes_map) for c in contratos]
 
 
-@app.get("/contratos/{contrato_id}", response_model=ContratoResponseDetallado, tags=["Contratos"])
-def obtener_contrato(contrato_id: int, db: Session = Depends(get_db)):
+@app.get("/contratos/{contrato_id}", response_model=ContratoConRelaciones, response_model_exclude_unset=True, tags=["Contratos"])
+def obtener_contrato(contrato_id: int, include: Optional[str] = None, db: Session = Depends(get_db)):
     """
     Obtiene un contrato por su ID con información del departamento e inquilino.
-    """
-    contrato = db.query(Contrato).filter(Contrato.id == contrato_id).first()
+    include elige qué se embebe (por defecto: pagos, departamento, inquilino).
+    """
+    relaciones, recientes = parsear_include(include, "pagos,departamento,inquilino")
+    contrato = (
+        db.query(Contrato)
+        .options(*opciones_carga_contrato(relaciones, recientes))
+        .filter(Contrato.id == contrato_id)
+        .first()
+    )
     if not contrato:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Contrato con ID {contrato_id} no encontrado"
         )
-    return contrato
+    recientes_map = pagos_recientes_por_contrato(db, [contrato.id], recientes) if recientes else None
+    return serializar_contrato(contrato, relaciones, recientes_map)
 
 
 @app.post("/contratos", response_model=ContratoResponse, status_code=status.HTTP_201_CREATED, tags=["Contratos"])
@@ -410,7 +660,12 @@ def crear_contrato(contrato: ContratoCreate, db: Session = Depends(get_db)):
     
     db_contrato = Contrato(**contrato.dict())
     db.add(db_contrato)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError as e:
+        # El índice único parcial cubre la carrera entre dos requests simultáneos
+        db.rollback()
+        raise error_integridad(e, f"El departamento {contrato.departamento_id} ya tiene un contrato activo")
     db.refresh(db_contrato)
     return db_contrato
 
@@ -476,8 +731,13 @@ def actualizar_contrato(
     update_data = contrato.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_contrato, field, value)
+    depto_id_final = db_contrato.departamento_id
     
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise error_integridad(e, f"El departamento {depto_id_final} ya tiene un contrato activo")
     db.refresh(db_contrato)
     return db_contrato
 
@@ -504,18 +764,228 @@ def eliminar_contrato(contrato_id: int, db: Session = Depends(get_db)):
 # ============================================================================
 
 @app.get("/pagos", response_model=List[PagoResponse], tags=["Pagos"])
-def listar_pagos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    pagos = db.query(Pago).offset(skip).limit(limit).all()
+def listar_pagos(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[int] = None,
+    estado: Optional[EstadoPago] = None,
+    contrato_id: Optional[int] = None,
+    periodo_desde: Optional[str] = None,
+    periodo_hasta: Optional[str] = None,
+    departamento_id: Optional[int] = None,
+    inquilino_id: Optional[int] = None,
+    contar_total: bool = False,
+    rapido: bool = Depends(JSON_RAPIDO_PAGOS),
+    db: Session = Depends(get_db)
+):
+    """
+    Lista los pagos con paginación por cursor (X-Next-Cursor) y filtros por estado, contrato,
+    rango de periodos (YYYY-MM), departamento e inquilino, resueltos en SQL sobre los índices.
+    Con contar_total=true devuelve además el total en X-Total-Count.
+    """
+    condiciones = condiciones_pagos(estado, contrato_id, periodo_desde, periodo_hasta, departamento_id, inquilino_id)
+    if contar_total:
+        contar(db, Pago, condiciones, response,
+               (estado, contrato_id, periodo_desde, periodo_hasta, departamento_id, inquilino_id),
+               tablas=("pagos", "contratos"))
+    pagos = paginar(db.query(Pago).filter(*condiciones), Pago, response, cursor, skip, limit)
+    if rapido:
+        return respuesta_rapida.responder([respuesta_rapida.a_dict(p, PagoResponse) for p in pagos], response)
     return pagos
 
 @app.post("/pagos", response_model=PagoResponse, status_code=status.HTTP_201_CREATED, tags=["Pagos"])
 def crear_pago(pago: PagoCreate, db: Session = Depends(get_db)):
+    if not db.query(Contrato.id).filter(Contrato.id == pago.contrato_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Contrato con ID {pago.contrato_id} no encontrado"
+        )
     db_pago = Pago(**pago.dict())
     db.add(db_pago)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise error_integridad(e, f"Ya existe una cuota del periodo {pago.periodo} para el contrato {pago.contrato_id}")
     db.refresh(db_pago)
     return db_pago
 
+
+@app.post("/pagos/batch", response_model=ResultadoLoteResponse, tags=["Pagos"])
+def crear_pagos_lote(pagos: List[PagoCreate], db: Session = Depends(get_db)):
+    """
+    Alta de varios pagos en una sola transacción. Los ítems inválidos (contrato inexistente,
+    cuota repetida, periodo mal formado) no se cargan y se informan en 'resultados'.
+    """
+    try:
+        return crear_pagos(db, pagos)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except IntegrityError as e:
+        db.rollback()
+        raise error_integridad(e, "Otra operación cargó alguna de estas cuotas al mismo tiempo; reintentar el lote")
+
+
+@app.patch("/pagos/batch", response_model=ResultadoLoteResponse, tags=["Pagos"])
+def actualizar_pagos_lote(cambios: List[PagoUpdateLote], db: Session = Depends(get_db)):
+    """
+    Cambios parciales de varios pagos en una sola transacción, por ejemplo
+    [{"id": 1, "estado": "COBRADO", "fecha_pago": "2024-05-08"}, ...].
+    Si cambian los montos, la mora se recalcula en la próxima corrida del motor.
+    """
+    try:
+        return actualizar_pagos(db, cambios)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except IntegrityError as e:
+        db.rollback()
+        raise error_integridad(e, "Otra operación modificó alguna de estas cuotas al mismo tiempo; reintentar el lote")
+
+
+@app.put("/pagos/{pago_id}", response_model=PagoResponse, tags=["Pagos"])
+def actualizar_pago(pago_id: int, pago: PagoUpdate, db: Session = Depends(get_db)):
+    """
+    Actualiza un pago existente (mismas validaciones que PATCH /pagos/batch).
+    """
+    try:
+        resultado = actualizar_pagos(db, [PagoUpdateLote(id=pago_id, **pago.dict(exclude_unset=True))])["resultados"][0]
+    except IntegrityError as e:
+        db.rollback()
+        raise error_integridad(e, "Ya existe una cuota con ese periodo y contrato")
+    if not resultado["ok"]:
+        no_encontrado = resultado["codigo"] in (PAGO_INEXISTENTE, CONTRATO_INEXISTENTE)
+        codigo = status.HTTP_404_NOT_FOUND if no_encontrado else status.HTTP_400_BAD_REQUEST
+        raise HTTPException(status_code=codigo, detail=resultado["error"])
+    return db.query(Pago).filter(Pago.id == pago_id).first()
+
+
+# ============================================================================
+# EXPORTACIÓN
+# ============================================================================
+
+def _respuesta_exportacion(entidad: str, formato: str, condiciones):
+    try:
+        validar_formato(formato)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return StreamingResponse(
+        exportar(entidad, formato, condiciones),
+        media_type=FORMATOS[formato],
+        headers={"Content-Disposition": f'attachment; filename="{entidad}.{formato}"'},
+    )
+
+
+@app.get("/export/pagos", tags=["Exportación"])
+def exportar_pagos(
+    formato: str = "csv",
+    estado: Optional[EstadoPago] = None,
+    contrato_id: Optional[int] = None,
+    periodo_desde: Optional[str] = None,
+    periodo_hasta: Optional[str] = None,
+    departamento_id: Optional[int] = None,
+    inquilino_id: Optional[int] = None,
+):
+    """
+    Todos los pagos que cumplen los filtros (los mismos de GET /pagos), en CSV o NDJSON,
+    transmitidos a medida que se leen de la base.
+    """
+    condiciones = condiciones_pagos(estado, contrato_id, periodo_desde, periodo_hasta, departamento_id, inquilino_id)
+    return _respuesta_exportacion("pagos", formato, condiciones)
+
+
+@app.get("/export/contratos", tags=["Exportación"])
+def exportar_contratos(
+    formato: str = "csv",
+    estado: Optional[EstadoContrato] = None,
+    departamento_id: Optional[int] = None,
+    inquilino_id: Optional[int] = None,
+):
+    """
+    Todos los contratos que cumplen los filtros (los mismos de GET /contratos), en CSV o NDJSON.
+    """
+    return _respuesta_exportacion("contratos", formato, condiciones_contratos(estado, departamento_id, inquilino_id))
+
+
+# ============================================================================
+# ENDPOINTS - INDEXACIÓN (IPC)
+# ============================================================================
+
+@app.get("/indices-ipc", response_model=List[IndiceIPCResponse], tags=["Indexación"])
+def listar_indices_ipc(db: Session = Depends(get_db)):
+    """
+    Serie mensual de IPC (variación % de cada mes) usada para ajustar los alquileres.
+    """
+    return db.query(IndiceIPC).order_by(IndiceIPC.periodo).all()
+
+
+@app.put("/indices-ipc", response_model=List[IndiceIPCResponse], tags=["Indexación"])
+def cargar_indices_ipc(indices: List[IndiceIPCBase], db: Session = Depends(get_db)):
+    """
+    Carga o corrige valores de IPC (upsert por periodo). Las cuotas ya generadas no se modifican;
+    las que se generen a partir de ahora usan la serie actualizada.
+    """
+    if indices:
+        sentencia = insert(IndiceIPC.__table__)
+        db.execute(
+            sentencia.on_conflict_do_update(index_elements=["periodo"], set_={"valor": sentencia.excluded.valor}),
+            [indice.dict() for indice in indices]
+        )
+        db.commit()
+    return db.query(IndiceIPC).filter(IndiceIPC.periodo.in_([i.periodo for i in indices])).order_by(IndiceIPC.periodo).all()
+
+
+@app.get("/contratos/{contrato_id}/monto", response_model=MontoContratoResponse, tags=["Indexación"])
+def obtener_monto_contrato(contrato_id: int, periodo: str, db: Session = Depends(get_db)):
+    """
+    Alquiler ajustado de un contrato para un periodo (YYYY-MM) según sus reglas de actualización.
+    Si falta el IPC de algún mes del ajuste, monto es null e ipc_faltante lista los periodos a cargar.
+    """
+    try:
+        parsear_periodo(periodo)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    contrato = db.query(Contrato).filter(Contrato.id == contrato_id).first()
+    if not contrato:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Contrato con ID {contrato_id} no encontrado"
+        )
+    serie = obtener_serie(db)
+    reglas = (contrato.proxima_actualizacion, contrato.porcentaje_actualizacion, contrato.meses_actualizacion)
+    respuesta = {"contrato_id": contrato.id, "periodo": periodo, "monto_inicial": contrato.monto_inicial}
+    try:
+        factor, respuesta["ajustes_aplicados"] = factor_ajuste(serie, periodo, *reglas)
+        respuesta["monto"] = redondear_monto(contrato.monto_inicial, factor)
+    except IPCIncompleto as e:
+        # Sin el IPC de todos los meses del ajuste no hay monto (no se lo calcula como si fuera 0%)
+        _, respuesta["ajustes_aplicados"] = factor_ajuste(serie, periodo, *reglas, proyectar=True)
+        respuesta.update(monto=None, ipc_incompleto=True, ipc_faltante=e.faltantes)
+    return respuesta
+
+
+@app.post("/simulaciones", response_model=SimulacionResponse, tags=["Indexación"])
+def simular_escenarios(simulacion: SimulacionRequest, db: Session = Depends(get_db)):
+    """
+    Proyecta el ingreso mensual de los contratos activos bajo varios escenarios de ajuste
+    (camino de IPC, porcentaje fijo y/o frecuencia), por contrato y para toda la cartera.
+    Un escenario sin ipc_mensual ni porcentaje_ajuste usa las reglas propias de cada contrato.
+    La respuesta se arma directamente (sin revalidar el modelo) porque el detalle por contrato
+    puede tener cientos de miles de valores.
+    """
+    try:
+        resultado = simular(
+            db,
+            [escenario.dict() for escenario in simulacion.escenarios],
+            desde=simulacion.desde,
+            meses=simulacion.meses,
+            contrato_ids=simulacion.contrato_ids,
+            detalle_contratos=simulacion.detalle_contratos,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return JSONResponse(resultado)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001, reload=True)
@@ -0,0 +1,213 @@
+"""
+Métricas de la aplicación en formato de texto de Prometheus (GET /metrics).
+
+- HTTP: solicitudes por ruta/método/estado, histograma de latencia por ruta y solicitudes en curso.
+  La ruta es la plantilla de FastAPI (/contratos/{contrato_id}), no la URL, para acotar las series.
+- Jobs: ejecuciones por estado, duración y filas revisadas/afectadas de cada corrida.
+- Base de datos: estado del pool de conexiones y latencia del último SELECT 1 de /health.
+
+Las métricas son por proceso (cada worker de uvicorn expone las suyas).
+"""
+import threading
+import time
+from bisect import bisect_left
+
+BUCKETS_HTTP = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_JOBS = (0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0)
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiquetas(nombres, valores):
+    if not nombres:
+        return ""
+    return "{" + ",".join(f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)) + "}"
+
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores = {}
+        self._lock = threading.Lock()
+        REGISTRO.append(self)
+
+    def _encabezado(self):
+        return [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"]
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def inc(self, *valores_etiquetas, cantidad: float = 1):
+        with self._lock:
+            self._valores[valores_etiquetas] = self._valores.get(valores_etiquetas, 0) + cantidad
+
+    def exponer(self):
+        lineas = self._encabezado()
+        with self._lock:
+            for valores, total in sorted(self._valores.items()):
+                lineas.append(f"{self.nombre}{_etiquetas(self.etiquetas, valores)} {total}")
+        return lineas
+
+
+class Medidor(_Metrica):
+    tipo = "gauge"
+
+    def __init__(self, nombre, ayuda, etiquetas=(), funcion=None):
+        super().__init__(nombre, ayuda, etiquetas)
+        # funcion: callable que devuelve {valores_etiquetas: valor}, evaluado al exponer
+        self.funcion = funcion
+
+    def set(self, valor, *valores_etiquetas):
+        with self._lock:
+            self._valores[valores_etiquetas] = valor
+
+    def inc(self, *valores_etiquetas, cantidad: float = 1):
+        with self._lock:
+            self._valores[valores_etiquetas] = self._valores.get(valores_etiquetas, 0) + cantidad
+
+    def dec(self, *valores_etiquetas, cantidad: float = 1):
+        self.inc(*valores_etiquetas, cantidad=-cantidad)
+
+    def exponer(self):
+        lineas = self._encabezado()
+        if self.funcion is not None:
+            valores = self.funcion()
+        else:
+            with self._lock:
+                valores = dict(self._valores)
+        for etiquetas, valor in sorted(valores.items()):
+            lineas.append(f"{self.nombre}{_etiquetas(self.etiquetas, etiquetas)} {valor}")
+        return lineas
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nombre, ayuda, etiquetas=(), buckets=BUCKETS_HTTP):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = tuple(buckets)
+
+    def observar(self, valor: float, *valores_etiquetas):
+        posicion = bisect_left(self.buckets, valor)
+        with self._lock:
+            conteos = self._valores.get(valores_etiquetas)
+            if conteos is None:
+                # [conteo por bucket..., +Inf, suma]
+                conteos = self._valores[valores_etiquetas] = [0] * (len(self.buckets) + 1) + [0.0]
+            conteos[posicion] += 1
+            conteos[-1] += valor
+
+    def exponer(self):
+        lineas = self._encabezado()
+        with self._lock:
+            datos = {k: list(v) for k, v in self._valores.items()}
+        for valores, conteos in sorted(datos.items()):
+            acumulado = 0
+            for limite, conteo in zip((*self.buckets, "+Inf"), conteos[:-1]):
+                acumulado += conteo
+                etiquetas = _etiquetas((*self.etiquetas, "le"), (*valores, limite))
+                lineas.append(f"{self.nombre}_bucket{etiquetas} {acumulado}")
+            lineas.append(f"{self.nombre}_sum{_etiquetas(self.etiquetas, valores)} {conteos[-1]}")
+            lineas.append(f"{self.nombre}_count{_etiquetas(self.etiquetas, valores)} {acumulado}")
+        return lineas
+
+
+REGISTRO = []
+
+
+def exponer() -> str:
+    lineas = []
+    for metrica in REGISTRO:
+        lineas.extend(metrica.exponer())
+    return "\n".join(lineas) + "\n"
+
+
+# ============================================================================
+# MÉTRICAS
+# ============================================================================
+
+http_solicitudes = Contador("oikos_http_solicitudes_total", "Solicitudes HTTP atendidas", ("metodo", "ruta", "estado"))
+http_duracion = Histograma("oikos_http_duracion_segundos", "Latencia de las solicitudes HTTP", ("metodo", "ruta"))
+http_en_curso = Medidor("oikos_http_en_curso", "Solicitudes HTTP en curso")
+
+job_ejecuciones = Contador("oikos_job_ejecuciones_total", "Corridas de jobs por resultado", ("job", "estado"))
+job_duracion = Histograma("oikos_job_duracion_segundos", "Duración de las corridas de jobs", ("job",), buckets=BUCKETS_JOBS)
+job_filas_revisadas = Contador("oikos_job_filas_revisadas_total", "Filas evaluadas por los jobs", ("job",))
+job_filas_afectadas = Contador("oikos_job_filas_afectadas_total", "Filas insertadas o actualizadas por los jobs", ("job",))
+job_filas_omitidas = Contador("oikos_job_filas_omitidas_total", "Filas que los jobs dejaron sin procesar (p. ej. cuotas sin IPC)", ("job",))
+
+db_latencia_ping = Medidor("oikos_db_ping_segundos", "Latencia del último SELECT 1 de /health")
+
+
+def registrar_job(nombre: str, estado: str, duracion_segundos: float, afectadas=None, revisadas=None, omitidas=None):
+    job_ejecuciones.inc(nombre, estado)
+    job_duracion.observar(duracion_segundos, nombre)
+    if afectadas is not None:
+        job_filas_afectadas.inc(nombre, cantidad=afectadas)
+    if revisadas is not None:
+        job_filas_revisadas.inc(nombre, cantidad=revisadas)
+    if omitidas:
+        job_filas_omitidas.inc(nombre, cantidad=omitidas)
+
+
+def registrar_pool(motor):
+    """
+    Publica el estado del pool de conexiones del motor (solo pools con tamaño, como QueuePool).
+    """
+    pool = motor.pool
+
+    def _leer(metodo, ajuste=lambda v: v):
+        def _valor():
+            funcion = getattr(pool, metodo, None)
+            return {(): ajuste(funcion())} if callable(funcion) else {}
+        return _valor
+
+    Medidor("oikos_db_pool_tamano", "Conexiones permanentes del pool", funcion=_leer("size"))
+    Medidor("oikos_db_pool_en_uso", "Conexiones del pool en uso", funcion=_leer("checkedout"))
+    Medidor("oikos_db_pool_libres", "Conexiones del pool disponibles", funcion=_leer("checkedin"))
+    Medidor("oikos_db_pool_desborde", "Conexiones abiertas por encima de pool_size", funcion=_leer("overflow", lambda v: max(v, 0)))
+
+
+# ============================================================================
+# MIDDLEWARE
+# ============================================================================
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI que mide cada solicitud HTTP. Es ASGI puro (no BaseHTTPMiddleware) para no
+    agregar costo por solicitud ni cortar las respuestas en streaming.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        estado = [500]
+
+        async def _send(mensaje):
+            if mensaje["type"] == "http.response.start":
+                estado[0] = mensaje["status"]
+            await send(mensaje)
+
+        http_en_curso.inc()
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            http_en_curso.dec()
+            ruta = scope.get("route")
+            plantilla = getattr(ruta, "path", "<sin_ruta>")
+            metodo = scope["method"]
+            http_duracion.observar(time.perf_counter() - inicio, metodo, plantilla)
+            http_solicitudes.inc(metodo, plantilla, estado[0])
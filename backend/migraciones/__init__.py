@@ -0,0 +1,149 @@
+"""
+Migraciones versionadas del esquema de la base de datos.
+
+Cada migración es un módulo mNNNN_descripcion.py de este paquete con:
+- DESCRIPCION: texto corto que queda registrado en schema_version.
+- aplicar(conn): recibe una conexión sqlite3 y ejecuta los cambios.
+- TRANSACCIONAL (opcional, True por defecto): si es False la migración maneja sus propios
+  commits (por ejemplo, para actualizar tablas grandes por lotes sin bloquear la app).
+
+La versión aplicada se guarda en la tabla schema_version. Al arrancar alcanza con un SELECT
+para saber si la base ya está al día.
+"""
+import importlib
+import pkgutil
+import re
+from datetime import datetime
+
+_PATRON_MODULO = re.compile(r"^m(\d{4})_\w+$")
+
+
+def _cargar_migraciones():
+    migraciones = []
+    for info in pkgutil.iter_modules(__path__):
+        coincidencia = _PATRON_MODULO.match(info.name)
+        if coincidencia:
+            modulo = importlib.import_module(f"{__name__}.{info.name}")
+            migraciones.append((int(coincidencia.group(1)), modulo))
+    migraciones.sort(key=lambda m: m[0])
+    versiones = [version for version, _ in migraciones]
+    if versiones != list(range(1, len(versiones) + 1)):
+        raise RuntimeError(f"Numeración de migraciones inválida: {versiones}")
+    return migraciones
+
+
+# ============================================================================
+# HELPERS PARA LAS MIGRACIONES
+# ============================================================================
+
+def columnas(conn, tabla):
+    return [fila[1] for fila in conn.execute(f"PRAGMA table_info({tabla})")]
+
+
+def agregar_columna(conn, tabla, columna, definicion):
+    """
+    ALTER TABLE ... ADD COLUMN solo si la columna no existe (bases creadas con scripts viejos).
+    """
+    if columna not in columnas(conn, tabla):
+        conn.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {definicion}")
+
+
+def actualizar_en_lotes(conn, tabla, set_sql, where_sql, parametros=(), tamano_lote=5000):
+    """
+    Ejecuta 'UPDATE tabla SET set_sql WHERE where_sql' por rangos de id, con un commit por lote,
+    para no retener el lock de escritura durante toda la actualización de una tabla grande.
+    Devuelve la cantidad de filas modificadas.
+    """
+    id_min, id_max = conn.execute(f"SELECT MIN(id), MAX(id) FROM {tabla}").fetchone()
+    if id_min is None:
+        return 0
+    total = 0
+    for inicio in range(id_min, id_max + 1, tamano_lote):
+        conn.execute("BEGIN IMMEDIATE")
+        cursor = conn.execute(
+            f"UPDATE {tabla} SET {set_sql} WHERE ({where_sql}) AND id BETWEEN ? AND ?",
+            (*parametros, inicio, inicio + tamano_lote - 1),
+        )
+        total += cursor.rowcount
+        conn.execute("COMMIT")
+    return total
+
+
+# ============================================================================
+# RUNNER
+# ============================================================================
+
+# Se cargan después de los helpers porque los módulos de migración los importan
+MIGRACIONES = _cargar_migraciones()
+VERSION_HEAD = MIGRACIONES[-1][0] if MIGRACIONES else 0
+
+
+def _crear_tabla_version(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER NOT NULL PRIMARY KEY,
+            descripcion VARCHAR(200) NOT NULL,
+            aplicada_en DATETIME NOT NULL
+        )
+    """)
+
+
+def version_actual(conn) -> int:
+    try:
+        return conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0] or 0
+    except Exception:
+        # La tabla todavía no existe: base nueva o creada antes de las migraciones
+        return 0
+
+
+def _registrar_version(conn, version, descripcion):
+    conn.execute(
+        "INSERT INTO schema_version (version, descripcion, aplicada_en) VALUES (?, ?, ?)",
+        (version, descripcion, datetime.now().isoformat(sep=" ")),
+    )
+
+
+def aplicar_migraciones(motor, verbose: bool = True) -> int:
+    """
+    Lleva la base a VERSION_HEAD. Devuelve la cantidad de migraciones aplicadas.
+    Cada migración transaccional corre junto con su registro en schema_version dentro de un
+    BEGIN IMMEDIATE, así dos workers arrancando a la vez no aplican la misma migración dos veces.
+    """
+    conexion_pool = motor.raw_connection()
+    conn = conexion_pool.driver_connection
+    aislamiento_original = conn.isolation_level
+    conn.isolation_level = None  # control manual de BEGIN/COMMIT (el DDL también queda en la transacción)
+    aplicadas = 0
+    try:
+        if version_actual(conn) >= VERSION_HEAD:
+            return 0
+
+        _crear_tabla_version(conn)
+        for version, modulo in MIGRACIONES:
+            descripcion = getattr(modulo, "DESCRIPCION", modulo.__name__)
+            transaccional = getattr(modulo, "TRANSACCIONAL", True)
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if version_actual(conn) >= version:
+                    conn.execute("COMMIT")
+                    continue
+                if verbose:
+                    print(f"🛠️ Migración {version:04d}: {descripcion}")
+                if transaccional:
+                    modulo.aplicar(conn)
+                else:
+                    conn.execute("COMMIT")
+                    modulo.aplicar(conn)
+                    conn.execute("BEGIN IMMEDIATE")
+                _registrar_version(conn, version, descripcion)
+                conn.execute("COMMIT")
+                aplicadas += 1
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+        return aplicadas
+    finally:
+        conn.isolation_level = aislamiento_original
+        conexion_pool.close()
@@ -0,0 +1,11 @@
+"""
+Aplica las migraciones pendientes: python -m migraciones (desde backend/).
+"""
+from database import engine
+from migraciones import aplicar_migraciones, version_actual, VERSION_HEAD
+
+if __name__ == "__main__":
+    aplicadas = aplicar_migraciones(engine)
+    with engine.connect() as conn:
+        version = version_actual(conn.connection.driver_connection)
+    print(f"✅ Migraciones aplicadas: {aplicadas}. Versión del esquema: {version} (head: {VERSION_HEAD})")
@@ -0,0 +1,74 @@
+"""
+Esquema original: departamentos, inquilinos, contratos y pagos.
+Usa IF NOT EXISTS para adoptar bases creadas antes de las migraciones con create_all.
+"""
+DESCRIPCION = "Esquema inicial (departamentos, inquilinos, contratos, pagos)"
+
+
+def aplicar(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS departamentos (
+            id INTEGER NOT NULL,
+            alias VARCHAR(100) NOT NULL,
+            direccion VARCHAR(255) NOT NULL,
+            propietario_nombre VARCHAR(100),
+            tipo VARCHAR(50) NOT NULL,
+            servicios_incluidos TEXT,
+            seguro_poliza VARCHAR(100),
+            seguro_vencimiento DATE,
+            estado VARCHAR(9),
+            notas_inventario TEXT,
+            PRIMARY KEY (id)
+        )
+    """)
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_departamentos_alias ON departamentos (alias)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_departamentos_id ON departamentos (id)")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS inquilinos (
+            id INTEGER NOT NULL,
+            nombre_apellido VARCHAR(200) NOT NULL,
+            dni VARCHAR(20),
+            telefono VARCHAR(50),
+            email VARCHAR(255),
+            canal_comunicacion VARCHAR(50),
+            estado VARCHAR(8),
+            PRIMARY KEY (id)
+        )
+    """)
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_inquilinos_dni ON inquilinos (dni)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_inquilinos_id ON inquilinos (id)")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS contratos (
+            id INTEGER NOT NULL,
+            departamento_id INTEGER,
+            inquilino_id INTEGER,
+            fecha_inicio DATE NOT NULL,
+            fecha_fin DATE NOT NULL,
+            monto_inicial NUMERIC(10, 2) NOT NULL,
+            deposito_garantia NUMERIC(10, 2),
+            contrato_firmado_url VARCHAR(255),
+            estado VARCHAR(10),
+            PRIMARY KEY (id),
+            FOREIGN KEY(departamento_id) REFERENCES departamentos (id) ON DELETE CASCADE,
+            FOREIGN KEY(inquilino_id) REFERENCES inquilinos (id) ON DELETE RESTRICT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_contratos_id ON contratos (id)")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS pagos (
+            id INTEGER NOT NULL,
+            contrato_id INTEGER,
+            periodo VARCHAR(7) NOT NULL,
+            monto_alquiler NUMERIC(10, 2) NOT NULL,
+            monto_expensas NUMERIC(10, 2),
+            monto_servicios NUMERIC(10, 2),
+            fecha_pago DATE,
+            estado VARCHAR(9),
+            PRIMARY KEY (id),
+            FOREIGN KEY(contrato_id) REFERENCES contratos (id) ON DELETE CASCADE
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_pagos_id ON pagos (id)")
@@ -0,0 +1,11 @@
+"""
+Columnas de actualización de alquiler en contratos (antes update_db_schema.py).
+"""
+from migraciones import agregar_columna
+
+DESCRIPCION = "Contratos: proxima_actualizacion y porcentaje_actualizacion"
+
+
+def aplicar(conn):
+    agregar_columna(conn, "contratos", "proxima_actualizacion", "DATE")
+    agregar_columna(conn, "contratos", "porcentaje_actualizacion", "NUMERIC(5, 2)")
@@ -0,0 +1,11 @@
+"""
+Columnas del motor de mora en pagos (antes migrate_add_mora.py).
+"""
+from migraciones import agregar_columna
+
+DESCRIPCION = "Pagos: monto_mora y mora_calculada_al"
+
+
+def aplicar(conn):
+    agregar_columna(conn, "pagos", "monto_mora", "NUMERIC(10, 2) DEFAULT 0")
+    agregar_columna(conn, "pagos", "mora_calculada_al", "DATE")
@@ -0,0 +1,12 @@
+"""
+Normaliza el estado 'PAGADO' (cargado por scripts viejos) a 'COBRADO' (antes fix_db_enum.py).
+Corre por lotes para no bloquear la app en tablas de pagos grandes.
+"""
+from migraciones import actualizar_en_lotes
+
+DESCRIPCION = "Pagos: estado PAGADO -> COBRADO"
+TRANSACCIONAL = False
+
+
+def aplicar(conn):
+    actualizar_en_lotes(conn, "pagos", "estado = 'COBRADO'", "estado = 'PAGADO'")
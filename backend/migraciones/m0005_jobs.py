@@ -0,0 +1,32 @@
+"""
+Tablas del planificador de jobs: historial de corridas y bloqueos entre workers.
+"""
+DESCRIPCION = "Jobs: ejecuciones_jobs y bloqueos_jobs"
+
+
+def aplicar(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ejecuciones_jobs (
+            id INTEGER NOT NULL,
+            nombre VARCHAR(50) NOT NULL,
+            propietario VARCHAR(100),
+            inicio DATETIME NOT NULL,
+            fin DATETIME,
+            duracion_ms INTEGER,
+            filas_afectadas INTEGER,
+            estado VARCHAR(8),
+            error TEXT,
+            PRIMARY KEY (id)
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_ejecuciones_jobs_id ON ejecuciones_jobs (id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_ejecuciones_jobs_nombre ON ejecuciones_jobs (nombre)")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS bloqueos_jobs (
+            nombre VARCHAR(50) NOT NULL,
+            propietario VARCHAR(100) NOT NULL,
+            expira DATETIME NOT NULL,
+            PRIMARY KEY (nombre)
+        )
+    """)
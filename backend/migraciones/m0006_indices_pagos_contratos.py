@@ -0,0 +1,31 @@
+"""
+Índices de las consultas frecuentes sobre pagos y contratos (antes migrate_add_indices.py).
+Los índices únicos fallan si ya hay duplicados: se informan para resolverlos a mano.
+"""
+DESCRIPCION = "Índices: pagos(contrato_id, periodo), pagos(estado, periodo), contrato activo único"
+
+
+def _verificar_sin_duplicados(conn, nombre, sql):
+    duplicados = conn.execute(sql).fetchall()
+    if duplicados:
+        raise RuntimeError(
+            f"No se puede crear '{nombre}': hay {len(duplicados)} duplicados. Ejemplos: {duplicados[:5]}"
+        )
+
+
+def aplicar(conn):
+    _verificar_sin_duplicados(
+        conn, "uq_pagos_contrato_periodo",
+        "SELECT contrato_id, periodo, COUNT(*) FROM pagos GROUP BY contrato_id, periodo HAVING COUNT(*) > 1",
+    )
+    _verificar_sin_duplicados(
+        conn, "uq_contratos_departamento_activo",
+        "SELECT departamento_id, COUNT(*) FROM contratos WHERE estado = 'ACTIVO' GROUP BY departamento_id HAVING COUNT(*) > 1",
+    )
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_pagos_contrato_periodo ON pagos (contrato_id, periodo)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_pagos_estado_periodo ON pagos (estado, periodo)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_contratos_departamento_estado ON contratos (departamento_id, estado)")
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_contratos_departamento_activo "
+        "ON contratos (departamento_id) WHERE estado = 'ACTIVO'"
+    )
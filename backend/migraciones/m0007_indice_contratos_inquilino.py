@@ -0,0 +1,8 @@
+"""
+Índice para filtrar contratos (y sus pagos) por inquilino en los listados.
+"""
+DESCRIPCION = "Índice: contratos(inquilino_id)"
+
+
+def aplicar(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_contratos_inquilino ON contratos (inquilino_id)")
@@ -0,0 +1,25 @@
+"""
+Serie mensual de IPC para el motor de indexación y frecuencia de ajuste por contrato.
+Se precargan los valores reales de INDEC que usaban las calculadoras en Excel (dic-2023 a nov-2024).
+"""
+from migraciones import agregar_columna
+
+DESCRIPCION = "Indexación: tabla indices_ipc y contratos.meses_actualizacion"
+
+IPC_INICIAL = [
+    ("2023-12", 25.5), ("2024-01", 20.6), ("2024-02", 13.2), ("2024-03", 11.0),
+    ("2024-04", 8.8), ("2024-05", 4.2), ("2024-06", 4.6), ("2024-07", 4.0),
+    ("2024-08", 4.2), ("2024-09", 3.5), ("2024-10", 2.7), ("2024-11", 2.4),
+]
+
+
+def aplicar(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS indices_ipc (
+            periodo VARCHAR(7) NOT NULL,
+            valor NUMERIC(6, 2) NOT NULL,
+            PRIMARY KEY (periodo)
+        )
+    """)
+    conn.executemany("INSERT OR IGNORE INTO indices_ipc (periodo, valor) VALUES (?, ?)", IPC_INICIAL)
+    agregar_columna(conn, "contratos", "meses_actualizacion", "INTEGER DEFAULT 6")
@@ -0,0 +1,16 @@
+"""
+Huellas de las filas importadas de la planilla maestra: permiten re-importar solo lo que cambió.
+"""
+DESCRIPCION = "Importación: tabla huellas_importacion"
+
+
+def aplicar(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS huellas_importacion (
+            hoja VARCHAR(20) NOT NULL,
+            clave VARCHAR(255) NOT NULL,
+            huella VARCHAR(32) NOT NULL,
+            entidad_id INTEGER NOT NULL,
+            PRIMARY KEY (hoja, clave)
+        )
+    """)
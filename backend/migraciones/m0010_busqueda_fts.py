@@ -0,0 +1,128 @@
+"""
+Búsqueda de texto completo (FTS5) sobre departamentos, inquilinos y contratos.
+
+Una sola tabla virtual 'busqueda' con una fila por entidad. El rowid codifica la entidad
+(id * 4 + tipo) para que los triggers actualicen su fila sin buscarla. Los contratos indexan
+los datos de su departamento y de su inquilino, así que se reindexan cuando esos cambian.
+DNI y teléfono se indexan también solo con dígitos ("20.123.456" -> "20123456"); el teléfono,
+además, con sus últimos 10 dígitos (sin el código de país).
+"""
+DESCRIPCION = "Búsqueda: tabla FTS5 busqueda y triggers de sincronización"
+
+TIPO_DEPARTAMENTO, TIPO_INQUILINO, TIPO_CONTRATO = 1, 2, 3
+
+
+def _digitos(columna: str) -> str:
+    expresion = columna
+    for caracter in (".", "-", " ", "+", "(", ")", "/"):
+        expresion = f"replace({expresion}, '{caracter}', '')"
+    return expresion
+
+
+def _con_digitos(columna: str, ultimos: int = None) -> str:
+    expresion = f"coalesce({columna}, '') || ' ' || coalesce({_digitos(columna)}, '')"
+    if ultimos:
+        # Teléfonos: también sin característica de país ("+54 9 351 ..." se encuentra por "351...")
+        expresion += f" || ' ' || coalesce(substr({_digitos(columna)}, -{ultimos}), '')"
+    return expresion
+
+
+def _select_departamento(alias: str) -> str:
+    return f"""
+        SELECT {alias}.id * 4 + {TIPO_DEPARTAMENTO}, 'departamento', {alias}.id,
+               {alias}.alias, {alias}.direccion, {alias}.propietario_nombre, NULL, NULL, NULL, NULL
+    """
+
+
+def _select_inquilino(alias: str) -> str:
+    return f"""
+        SELECT {alias}.id * 4 + {TIPO_INQUILINO}, 'inquilino', {alias}.id,
+               NULL, NULL, NULL, {alias}.nombre_apellido, {_con_digitos(f"{alias}.dni")},
+               {alias}.email, {_con_digitos(f"{alias}.telefono", 10)}
+    """
+
+
+_SELECT_CONTRATOS = f"""
+    SELECT c.id * 4 + {TIPO_CONTRATO}, 'contrato', c.id,
+           d.alias, d.direccion, d.propietario_nombre, i.nombre_apellido, {_con_digitos("i.dni")},
+           i.email, {_con_digitos("i.telefono", 10)}
+    FROM contratos c
+    LEFT JOIN departamentos d ON d.id = c.departamento_id
+    LEFT JOIN inquilinos i ON i.id = c.inquilino_id
+"""
+
+_COLUMNAS = "rowid, tipo, entidad_id, alias, direccion, propietario_nombre, nombre_apellido, dni, email, telefono"
+
+
+def _reindexar_contratos(condicion: str) -> str:
+    return f"""
+        DELETE FROM busqueda WHERE rowid IN (SELECT id * 4 + {TIPO_CONTRATO} FROM contratos c WHERE {condicion});
+        INSERT INTO busqueda ({_COLUMNAS}) {_SELECT_CONTRATOS} WHERE {condicion};
+    """
+
+
+def aplicar(conn):
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS busqueda USING fts5(
+            tipo UNINDEXED,
+            entidad_id UNINDEXED,
+            alias, direccion, propietario_nombre, nombre_apellido, dni, email, telefono,
+            tokenize = "unicode61 remove_diacritics 2",
+            prefix = '2 3'
+        )
+    """)
+
+    triggers = {
+        # Departamentos
+        "busqueda_departamentos_ai": f"""
+            AFTER INSERT ON departamentos BEGIN
+                INSERT INTO busqueda ({_COLUMNAS}) {_select_departamento("new")};
+            END""",
+        "busqueda_departamentos_au": f"""
+            AFTER UPDATE OF alias, direccion, propietario_nombre ON departamentos BEGIN
+                DELETE FROM busqueda WHERE rowid = old.id * 4 + {TIPO_DEPARTAMENTO};
+                INSERT INTO busqueda ({_COLUMNAS}) {_select_departamento("new")};
+                {_reindexar_contratos("c.departamento_id = new.id")}
+            END""",
+        "busqueda_departamentos_ad": f"""
+            AFTER DELETE ON departamentos BEGIN
+                DELETE FROM busqueda WHERE rowid = old.id * 4 + {TIPO_DEPARTAMENTO};
+            END""",
+        # Inquilinos
+        "busqueda_inquilinos_ai": f"""
+            AFTER INSERT ON inquilinos BEGIN
+                INSERT INTO busqueda ({_COLUMNAS}) {_select_inquilino("new")};
+            END""",
+        "busqueda_inquilinos_au": f"""
+            AFTER UPDATE OF nombre_apellido, dni, email, telefono ON inquilinos BEGIN
+                DELETE FROM busqueda WHERE rowid = old.id * 4 + {TIPO_INQUILINO};
+                INSERT INTO busqueda ({_COLUMNAS}) {_select_inquilino("new")};
+                {_reindexar_contratos("c.inquilino_id = new.id")}
+            END""",
+        "busqueda_inquilinos_ad": f"""
+            AFTER DELETE ON inquilinos BEGIN
+                DELETE FROM busqueda WHERE rowid = old.id * 4 + {TIPO_INQUILINO};
+            END""",
+        # Contratos
+        "busqueda_contratos_ai": f"""
+            AFTER INSERT ON contratos BEGIN
+                INSERT INTO busqueda ({_COLUMNAS}) {_SELECT_CONTRATOS} WHERE c.id = new.id;
+            END""",
+        "busqueda_contratos_au": f"""
+            AFTER UPDATE OF departamento_id, inquilino_id ON contratos BEGIN
+                {_reindexar_contratos("c.id = new.id")}
+            END""",
+        "busqueda_contratos_ad": f"""
+            AFTER DELETE ON contratos BEGIN
+                DELETE FROM busqueda WHERE rowid = old.id * 4 + {TIPO_CONTRATO};
+            END""",
+    }
+    for nombre, cuerpo in triggers.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {nombre} {cuerpo}")
+
+    # Carga inicial de lo que ya existe
+    conn.execute("DELETE FROM busqueda")
+    conn.execute(f"INSERT INTO busqueda ({_COLUMNAS}) {_select_departamento('d')} FROM departamentos d")
+    conn.execute(f"INSERT INTO busqueda ({_COLUMNAS}) {_select_inquilino('i')} FROM inquilinos i")
+    conn.execute(f"INSERT INTO busqueda ({_COLUMNAS}) {_SELECT_CONTRATOS}")
+    conn.execute("INSERT INTO busqueda (busqueda) VALUES ('optimize')")
@@ -0,0 +1,11 @@
+"""
+Corridas de jobs que terminan bien pero dejan trabajo sin hacer (p. ej. cuotas sin IPC cargado).
+"""
+from migraciones import agregar_columna
+
+DESCRIPCION = "Jobs: filas_omitidas y advertencia en ejecuciones_jobs"
+
+
+def aplicar(conn):
+    agregar_columna(conn, "ejecuciones_jobs", "filas_omitidas", "INTEGER")
+    agregar_columna(conn, "ejecuciones_jobs", "advertencia", "TEXT")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, Text, Numeric, ForeignKey, Enum, CheckConstraint, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Date, DateTime, Text, Numeric, ForeignKey, Enum, CheckConstraint, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -23,6 +23,11 @@ class EstadoPago(str, enum.Enum):
     PENDIENTE = "PENDIENTE"
     PARCIAL = "PARCIAL"
 
+class EstadoEjecucion(str, enum.Enum):
+    EN_CURSO = "EN_CURSO"
+    OK = "OK"
+    ERROR = "ERROR"
+
 class Departamento(Base):
     __tablename__ = "departamentos"
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
@@ -60,10 +65,17 @@ class Contrato(Base):
     contrato_firmado_url = Column(String(255), nullable=True)
     proxima_actualizacion = Column(Date, nullable=True)
     porcentaje_actualizacion = Column(Numeric(5, 2), nullable=True)
+    meses_actualizacion = Column(Integer, default=6)
     estado = Column(Enum(EstadoContrato), default=EstadoContrato.ACTIVO)
     departamento = relationship("Departamento", back_populates="contratos")
     inquilino = relationship("Inquilino", back_populates="contratos")
     pagos = relationship("Pago", back_populates="contrato", cascade="all, delete-orphan")
+    __table_args__ = (
+        Index("ix_contratos_departamento_estado", "departamento_id", "estado"),
+        Index("ix_contratos_inquilino", "inquilino_id"),
+        # Un solo contrato ACTIVO por departamento (índice parcial)
+        Index("uq_contratos_departamento_activo", "departamento_id", unique=True, sqlite_where=text("estado = 'ACTIVO'")),
+    )
 
 class Pago(Base):
     __tablename__ = "pagos"
@@ -76,4 +88,42 @@ class Pago(Base):
     fecha_pago = Column(Date, nullable=True)
     estado = Column(Enum(EstadoPago), default=EstadoPago.PENDIENTE)
     monto_mora = Column(Numeric(10, 2), default=0)
+    mora_calculada_al = Column(Date, nullable=True)
     contrato = relationship("Contrato", back_populates="pagos")
+    __table_args__ = (
+        # Una cuota por contrato y periodo (hace idempotente la generación de cuotas)
+        Index("uq_pagos_contrato_periodo", "contrato_id", "periodo", unique=True),
+        Index("ix_pagos_estado_periodo", "estado", "periodo"),
+    )
+
+class EjecucionJob(Base):
+    __tablename__ = "ejecuciones_jobs"
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    nombre = Column(String(50), nullable=False, index=True)
+    propietario = Column(String(100), nullable=True)
+    inicio = Column(DateTime, nullable=False)
+    fin = Column(DateTime, nullable=True)
+    duracion_ms = Column(Integer, nullable=True)
+    filas_afectadas = Column(Integer, nullable=True)
+    filas_omitidas = Column(Integer, nullable=True)
+    estado = Column(Enum(EstadoEjecucion), default=EstadoEjecucion.EN_CURSO)
+    error = Column(Text, nullable=True)
+    advertencia = Column(Text, nullable=True)  # trabajo que la corrida no pudo hacer (sin ser un error)
+
+class BloqueoJob(Base):
+    __tablename__ = "bloqueos_jobs"
+    nombre = Column(String(50), primary_key=True)
+    propietario = Column(String(100), nullable=False)
+    expira = Column(DateTime, nullable=False)
+
+class IndiceIPC(Base):
+    __tablename__ = "indices_ipc"
+    periodo = Column(String(7), primary_key=True)
+    valor = Column(Numeric(6, 2), nullable=False)
+
+class HuellaImportacion(Base):
+    __tablename__ = "huellas_importacion"
+    hoja = Column(String(20), primary_key=True)
+    clave = Column(String(255), primary_key=True)
+    huella = Column(String(32), nullable=False)
+    entidad_id = Column(Integer, nullable=False)
@@ -1,4 +1,4 @@
-
+from sqlalchemy import select, update, func, case, literal, and_, or_
 from sqlalchemy.orm import Session
 from models import Pago, EstadoPago
 from datetime import date, datetime
@@ -8,62 +8,71 @@ from decimal import Decimal
 DIA_VENCIMIENTO = 10
 # Tasa diaria de mora (ejemplo: 0.5% por día de retraso)
 # Se aplica sobre el monto base (Alquiler + Expensas + Servicios)
-TASA_DIARIA_MORA = Decimal('0.005') 
+TASA_DIARIA_MORA = Decimal('0.005')
+
 
-def calcular_mora_pagos(db: Session, dry_run: bool = False):
+def _expresion_mora(hoy: date):
+    """
+    Expresión SQL con el recargo de un pago al día 'hoy'.
+    El vencimiento es el día DIA_VENCIMIENTO del periodo ("YYYY-MM"); antes de esa fecha la mora es 0.
     """
-    Recorre todos los pagos PENDIENTES.
+    vencimiento = func.date(Pago.periodo + f"-{DIA_VENCIMIENTO:02d}")
+    dias_retraso = func.julianday(literal(hoy)) - func.julianday(vencimiento)
+    monto_base = (
+        func.coalesce(Pago.monto_alquiler, 0)
+        + func.coalesce(Pago.monto_expensas, 0)
+        + func.coalesce(Pago.monto_servicios, 0)
+    )
+    return vencimiento, case(
+        (dias_retraso > 0, func.round(monto_base * float(TASA_DIARIA_MORA) * dias_retraso, 2)),
+        else_=0,
+    )
+
+
+def calcular_mora_pagos(db: Session, dry_run: bool = False, hoy: date = None, tamano_lote: int = None):
+    """
+    Recalcula la mora de todos los pagos PENDIENTES dentro de la base de datos.
     Si la fecha actual es mayor al día 10 del periodo correspondiente, aplica mora automatica.
+
+    El cálculo es un único UPDATE (o varios, por rangos de ID, si se indica tamano_lote) que solo
+    toca las filas cuyo monto_mora cambia, y guarda en mora_calculada_al la fecha del cálculo:
+    una segunda corrida el mismo día no modifica nada.
+    Devuelve la cantidad de pagos actualizados (o que se actualizarían, con dry_run).
     """
-    pagos_pendientes = db.query(Pago).filter(Pago.estado == EstadoPago.PENDIENTE).all()
-    today = date.today()
-    
-    count_actualizados = 0
-    total_mora_calculada = Decimal('0')
-    
-    print(f"🔄 [Motor Mora] Analizando {len(pagos_pendientes)} pagos pendientes...")
-    
-    for pago in pagos_pendientes:
-        # 1. Determinar fecha de vencimiento
-        # El periodo viene como "YYYY-MM". El vencimiento es el dia 10 de ese mes.
-        try:
-            year, month = map(int, pago.periodo.split('-'))
-            fecha_vencimiento = date(year, month, DIA_VENCIMIENTO)
-        except ValueError:
-            print(f"  ⚠️ Error parseando periodo '{pago.periodo}' para pago ID {pago.id}")
-            continue
-            
-        # 2. Calcular días de retraso
-        if today > fecha_vencimiento:
-            dias_retraso = (today - fecha_vencimiento).days
-            
-            # 3. Calcular monto mora
-            monto_base = pago.monto_alquiler + pago.monto_expensas + pago.monto_servicios
-            monto_mora_nuevo = monto_base * TASA_DIARIA_MORA * Decimal(dias_retraso)
-            
-            # Redondear a 2 decimales
-            monto_mora_nuevo = monto_mora_nuevo.quantize(Decimal('0.01'))
-            
-            if monto_mora_nuevo > 0:
-                if not dry_run:
-                    # Actualizar si cambió
-                    if pago.monto_mora != monto_mora_nuevo:
-                        pago.monto_mora = monto_mora_nuevo
-                        count_actualizados += 1
-                        print(f"  💸 Pago ID {pago.id} ({pago.periodo}): {dias_retraso} días de atraso. Mora: ${monto_mora_nuevo}")
-                
-                total_mora_calculada += monto_mora_nuevo
-        else:
-            # Aún no vence, asegurar que mora sea 0
-            if pago.monto_mora > 0 and not dry_run:
-                pago.monto_mora = 0
-                count_actualizados += 1
-                # print(f"  ℹ️ Pago ID {pago.id}: Aún en fecha. Mora reseteada.")
+    hoy = hoy or date.today()
+    vencimiento, monto_mora_nuevo = _expresion_mora(hoy)
 
-    if not dry_run:
-        db.commit()
-        print(f"✅ Se actualizaron {count_actualizados} pagos con recargos.")
-    else:
+    condicion = and_(
+        Pago.estado == EstadoPago.PENDIENTE,
+        vencimiento.is_not(None),
+        or_(Pago.mora_calculada_al.is_(None), Pago.mora_calculada_al < hoy),
+        func.coalesce(Pago.monto_mora, 0) != monto_mora_nuevo,
+    )
+
+    if dry_run:
+        count_actualizados = db.execute(select(func.count()).select_from(Pago).where(condicion)).scalar()
         print(f"ℹ️ (Dry Run) Se hubieran actualizado {count_actualizados} pagos.")
-        
+        return count_actualizados
+
+    if tamano_lote:
+        id_min, id_max = db.execute(
+            select(func.min(Pago.id), func.max(Pago.id)).where(Pago.estado == EstadoPago.PENDIENTE)
+        ).one()
+        rangos = [(inicio, inicio + tamano_lote - 1) for inicio in range(id_min, id_max + 1, tamano_lote)] if id_min else []
+    else:
+        rangos = [None]
+
+    count_actualizados = 0
+    for rango in rangos:
+        filtro = condicion if rango is None else and_(condicion, Pago.id.between(*rango))
+        resultado = db.execute(
+            update(Pago)
+            .where(filtro)
+            .values(monto_mora=monto_mora_nuevo, mora_calculada_al=hoy)
+            .execution_options(synchronize_session=False)
+        )
+        count_actualizados += resultado.rowcount
+        db.commit()
+
+    print(f"✅ [Motor Mora] Se actualizaron {count_actualizados} pagos con recargos (al {hoy.isoformat()}).")
     return count_actualizados
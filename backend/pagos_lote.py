@@ -0,0 +1,201 @@
+"""
+Altas y modificaciones de pagos en lote (POST/PATCH /pagos/batch).
+
+Cada lote se valida en una sola pasada, con una query por tipo de dato a verificar
+(contratos existentes, pagos existentes, cuotas ya cargadas) en lugar de una por ítem.
+Los ítems válidos se escriben en una única transacción con un INSERT / UPDATE masivo
+(executemany); los inválidos no se escriben y se informan con su error. El resultado
+tiene una entrada por ítem, en el mismo orden en que llegaron.
+"""
+from collections import Counter
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from automation_pagos import parsear_periodo
+from models import Contrato, Pago
+
+MAX_LOTE = 5000
+# Si cambia alguno de estos montos, la mora guardada deja de valer y el motor tiene que recalcularla
+CAMPOS_MONTO_BASE = ("monto_alquiler", "monto_expensas", "monto_servicios")
+# Columnas NOT NULL: en un cambio parcial pueden omitirse, pero no mandarse en null
+CAMPOS_OBLIGATORIOS = ("contrato_id", "periodo", *CAMPOS_MONTO_BASE, "monto_mora", "estado")
+
+# Códigos de error por ítem: estables, para que los clientes (y PUT /pagos/{id}) no dependan del texto
+PERIODO_INVALIDO = "periodo_invalido"
+CONTRATO_INEXISTENTE = "contrato_inexistente"
+CUOTA_DUPLICADA = "cuota_duplicada"
+PAGO_INEXISTENTE = "pago_inexistente"
+PAGO_REPETIDO = "pago_repetido"
+SIN_CAMBIOS = "sin_cambios"
+CAMPO_NULO = "campo_nulo"
+
+
+def _normalizar_periodo(periodo: str) -> str:
+    year, month = parsear_periodo(periodo)
+    return f"{year:04d}-{month:02d}"
+
+
+def _validar_tamano(items):
+    if not items:
+        raise ValueError("El lote está vacío")
+    if len(items) > MAX_LOTE:
+        raise ValueError(f"El lote tiene {len(items)} ítems; el máximo es {MAX_LOTE}")
+
+
+def _contratos_existentes(db: Session, ids) -> set:
+    if not ids:
+        return set()
+    return set(db.execute(select(Contrato.id).where(Contrato.id.in_(ids))).scalars())
+
+
+def _cuotas_existentes(db: Session, claves) -> dict:
+    """(contrato_id, periodo) -> id del pago ya cargado."""
+    if not claves:
+        return {}
+    # contrato_id IN (...) AND periodo IN (...) usa el índice único; (a, b) IN (...) en SQLite no
+    filas = db.execute(
+        select(Pago.contrato_id, Pago.periodo, Pago.id).where(
+            Pago.contrato_id.in_({c for c, _ in claves}),
+            Pago.periodo.in_({p for _, p in claves}),
+        )
+    )
+    return {(c, p): pago_id for c, p, pago_id in filas if (c, p) in claves}
+
+
+def _rechazar(resultado, codigo: str, mensaje: str):
+    resultado["codigo"] = codigo
+    resultado["error"] = mensaje
+
+
+def _resumen(resultados):
+    correctos = sum(1 for r in resultados if r["ok"])
+    return {
+        "procesados": len(resultados),
+        "correctos": correctos,
+        "errores": len(resultados) - correctos,
+        "resultados": resultados,
+    }
+
+
+def crear_pagos(db: Session, pagos: list) -> dict:
+    """
+    Da de alta una lista de PagoCreate. Rechaza los ítems con periodo inválido, contrato
+    inexistente o cuota ya cargada (en la base o repetida dentro del mismo lote).
+    Lanza ValueError si el lote está vacío o supera MAX_LOTE.
+    """
+    _validar_tamano(pagos)
+    resultados = [{"indice": i, "ok": False, "id": None, "codigo": None, "error": None} for i in range(len(pagos))]
+
+    filas = {}
+    for i, pago in enumerate(pagos):
+        datos = pago.dict()
+        try:
+            datos["periodo"] = _normalizar_periodo(datos["periodo"])
+        except ValueError as e:
+            _rechazar(resultados[i], PERIODO_INVALIDO, str(e))
+            continue
+        filas[i] = datos
+
+    contratos = _contratos_existentes(db, {d["contrato_id"] for d in filas.values()})
+    cargadas = _cuotas_existentes(db, {(d["contrato_id"], d["periodo"]) for d in filas.values()})
+
+    vistas = set()
+    validos = []
+    for i, datos in filas.items():
+        clave = (datos["contrato_id"], datos["periodo"])
+        if datos["contrato_id"] not in contratos:
+            _rechazar(resultados[i], CONTRATO_INEXISTENTE, f"Contrato con ID {datos['contrato_id']} no encontrado")
+        elif clave in cargadas or clave in vistas:
+            _rechazar(resultados[i], CUOTA_DUPLICADA,
+                      f"Ya existe una cuota del periodo {datos['periodo']} para el contrato {datos['contrato_id']}")
+        else:
+            vistas.add(clave)
+            validos.append(i)
+
+    if validos:
+        # INSERT sin RETURNING: en SQLite RETURNING con orden garantizado se ejecuta fila por fila.
+        # Los ids se recuperan después por la clave única (contrato_id, periodo).
+        db.execute(insert(Pago), [filas[i] for i in validos])
+        ids = _cuotas_existentes(db, vistas)
+        db.commit()
+        for i in validos:
+            resultados[i].update(ok=True, id=ids[(filas[i]["contrato_id"], filas[i]["periodo"])])
+    return _resumen(resultados)
+
+
+def actualizar_pagos(db: Session, cambios: list) -> dict:
+    """
+    Modifica una lista de cambios parciales (PagoUpdate con id), por ejemplo para marcar
+    varias cuotas COBRADO con su fecha_pago. Rechaza ids repetidos o inexistentes, nulls en
+    campos obligatorios, periodos inválidos, contratos inexistentes y cambios que dupliquen una
+    cuota (contrato, periodo).
+    Si cambia algún monto base se borra mora_calculada_al para que el motor de mora la recalcule.
+    Lanza ValueError si el lote está vacío o supera MAX_LOTE.
+    """
+    _validar_tamano(cambios)
+    resultados = [{"indice": i, "ok": False, "id": c.id, "codigo": None, "error": None} for i, c in enumerate(cambios)]
+
+    ids = [c.id for c in cambios]
+    actuales = {
+        fila.id: fila
+        for fila in db.execute(select(Pago.id, Pago.contrato_id, Pago.periodo).where(Pago.id.in_(set(ids))))
+    }
+
+    repetidos = {pago_id for pago_id, veces in Counter(ids).items() if veces > 1}
+    filas = {}
+    for i, cambio in enumerate(cambios):
+        datos = cambio.dict(exclude_unset=True)
+        if cambio.id in repetidos:
+            _rechazar(resultados[i], PAGO_REPETIDO, f"El pago {cambio.id} aparece más de una vez en el lote")
+            continue
+        if cambio.id not in actuales:
+            _rechazar(resultados[i], PAGO_INEXISTENTE, f"Pago con ID {cambio.id} no encontrado")
+            continue
+        if set(datos) == {"id"}:
+            _rechazar(resultados[i], SIN_CAMBIOS, "No hay campos para actualizar")
+            continue
+        nulos = [campo for campo in CAMPOS_OBLIGATORIOS if campo in datos and datos[campo] is None]
+        if nulos:
+            _rechazar(resultados[i], CAMPO_NULO, f"Estos campos no pueden ser null: {', '.join(nulos)}")
+            continue
+        if "periodo" in datos:
+            try:
+                datos["periodo"] = _normalizar_periodo(datos["periodo"])
+            except ValueError as e:
+                _rechazar(resultados[i], PERIODO_INVALIDO, str(e))
+                continue
+        if any(campo in datos for campo in CAMPOS_MONTO_BASE):
+            datos["mora_calculada_al"] = None
+        filas[i] = datos
+
+    # Solo los cambios de contrato o periodo pueden chocar con otra cuota
+    def clave_final(datos):
+        actual = actuales[datos["id"]]
+        return (datos.get("contrato_id", actual.contrato_id), datos.get("periodo", actual.periodo))
+
+    movidos = {i: clave_final(d) for i, d in filas.items() if "contrato_id" in d or "periodo" in d}
+    contratos = _contratos_existentes(db, {d["contrato_id"] for d in filas.values() if "contrato_id" in d})
+    cargadas = _cuotas_existentes(db, set(movidos.values()))
+
+    vistas = set()
+    validos = []
+    for i, datos in filas.items():
+        if "contrato_id" in datos and datos["contrato_id"] not in contratos:
+            _rechazar(resultados[i], CONTRATO_INEXISTENTE, f"Contrato con ID {datos['contrato_id']} no encontrado")
+            continue
+        if i in movidos:
+            clave = movidos[i]
+            ocupante = cargadas.get(clave)
+            if clave in vistas or (ocupante is not None and ocupante != datos["id"]):
+                _rechazar(resultados[i], CUOTA_DUPLICADA, f"Ya existe una cuota del periodo {clave[1]} para el contrato {clave[0]}")
+                continue
+            vistas.add(clave)
+        validos.append(i)
+
+    if validos:
+        db.execute(update(Pago), [filas[i] for i in validos])
+        db.commit()
+        for i in validos:
+            resultados[i]["ok"] = True
+    return _resumen(resultados)
@@ -0,0 +1,139 @@
+"""
+Perfilador de consultas SQL por solicitud (y por corrida de job).
+
+Escucha before/after_cursor_execute del engine y acumula, en el perfil activo del contexto:
+cantidad de consultas, tiempo total en la base y cuántas veces se repitió cada sentencia.
+
+- Consultas lentas (más de OIKOS_SQL_LENTA_MS, default 200): se registran con sus parámetros
+  y el EXPLAIN QUERY PLAN en el logger "oikos.sql" (a archivo si se define OIKOS_SQL_LOG).
+- Probable N+1: al cerrar el perfil, una misma sentencia repetida OIKOS_SQL_UMBRAL_N1 veces o
+  más (default 10) se reporta como advertencia en el mismo logger.
+- Con OIKOS_DEBUG_SQL=1 las respuestas llevan los headers X-DB-Queries y X-DB-Time (ms).
+"""
+import logging
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+UMBRAL_LENTA_MS = float(os.getenv("OIKOS_SQL_LENTA_MS", "200"))
+UMBRAL_N_MAS_UNO = int(os.getenv("OIKOS_SQL_UMBRAL_N1", "10"))
+DEBUG_SQL = os.getenv("OIKOS_DEBUG_SQL", "0") == "1"
+
+logger = logging.getLogger("oikos.sql")
+if os.getenv("OIKOS_SQL_LOG"):
+    _handler = logging.FileHandler(os.getenv("OIKOS_SQL_LOG"), encoding="utf-8")
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+_SENTENCIAS_EXPLICABLES = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")
+
+
+class PerfilConsultas:
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self.consultas = 0
+        self.tiempo = 0.0
+        self.sentencias = Counter()
+
+    def registrar(self, sentencia: str, duracion: float):
+        self.consultas += 1
+        self.tiempo += duracion
+        self.sentencias[sentencia] += 1
+
+    def repetidas(self, umbral: int = UMBRAL_N_MAS_UNO):
+        return [(s, n) for s, n in self.sentencias.most_common() if n >= umbral]
+
+
+_perfil_actual = ContextVar("perfil_sql", default=None)
+
+
+def perfil_actual():
+    return _perfil_actual.get()
+
+
+@contextmanager
+def perfilar(nombre: str):
+    """
+    Activa un perfil para el bloque (el contexto se propaga a los hilos de FastAPI y to_thread).
+    """
+    perfil = PerfilConsultas(nombre)
+    token = _perfil_actual.set(perfil)
+    try:
+        yield perfil
+    finally:
+        _perfil_actual.reset(token)
+        for sentencia, veces in perfil.repetidas():
+            logger.warning("Probable N+1 en %s: %d ejecuciones de %s", perfil.nombre, veces, " ".join(sentencia.split()))
+
+
+def _explicar(cursor, sentencia, parametros):
+    """
+    EXPLAIN QUERY PLAN de la sentencia sobre la conexión DBAPI (no pasa por los eventos del engine).
+    """
+    if not sentencia.lstrip().upper().startswith(_SENTENCIAS_EXPLICABLES):
+        return None
+    if isinstance(parametros, (list, tuple)) and parametros and isinstance(parametros[0], (list, tuple, dict)):
+        parametros = parametros[0]  # executemany: alcanza con el plan del primer juego de parámetros
+    try:
+        filas = cursor.connection.execute(f"EXPLAIN QUERY PLAN {sentencia}", parametros or ()).fetchall()
+    except Exception as e:
+        return f"(sin plan: {e})"
+    return " | ".join(str(fila[-1]) for fila in filas) or "-"
+
+
+def instrumentar(motor):
+    """
+    Registra los listeners del perfilador en el engine.
+    """
+    explicar = motor.dialect.name == "sqlite"
+
+    @event.listens_for(motor, "before_cursor_execute")
+    def _antes(conn, cursor, sentencia, parametros, contexto, executemany):
+        conn.info.setdefault("perfil_inicio", []).append(time.perf_counter())
+
+    @event.listens_for(motor, "after_cursor_execute")
+    def _despues(conn, cursor, sentencia, parametros, contexto, executemany):
+        duracion = time.perf_counter() - conn.info["perfil_inicio"].pop()
+        perfil = _perfil_actual.get()
+        if perfil is not None:
+            perfil.registrar(sentencia, duracion)
+        if duracion * 1000 >= UMBRAL_LENTA_MS:
+            plan = _explicar(cursor, sentencia, parametros) if explicar else None
+            if executemany and len(parametros) > 1:
+                parametros = f"{parametros[0]!r} (+{len(parametros) - 1} juegos más)"
+            logger.warning(
+                "Consulta lenta (%.1f ms)%s: %s | parámetros=%s | plan: %s",
+                duracion * 1000, f" en {perfil.nombre}" if perfil else "",
+                " ".join(sentencia.split()), parametros, plan,
+            )
+
+
+class MiddlewarePerfilador:
+    """
+    Middleware ASGI: un perfil por solicitud HTTP y, con OIKOS_DEBUG_SQL=1, headers
+    X-DB-Queries / X-DB-Time en la respuesta.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with perfilar(f"{scope['method']} {scope['path']}") as perfil:
+            async def _send(mensaje):
+                if DEBUG_SQL and mensaje["type"] == "http.response.start":
+                    headers = list(mensaje.get("headers", []))
+                    headers.append((b"x-db-queries", str(perfil.consultas).encode()))
+                    headers.append((b"x-db-time", f"{perfil.tiempo * 1000:.3f}".encode()))
+                    mensaje["headers"] = headers
+                await send(mensaje)
+
+            await self.app(scope, receive, _send)
@@ -0,0 +1,304 @@
+"""
+Planificador de tareas en segundo plano (jobs) para OIKOS.
+Ejecuta la generación de cuotas y el motor de mora fuera del arranque del servidor,
+con una programación tipo cron, registro de cada corrida y un bloqueo en la base de datos
+para que un solo worker de uvicorn ejecute cada job.
+"""
+import asyncio
+import contextlib
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import metricas
+import perfilador
+from database import SessionLocal
+from models import EjecucionJob, BloqueoJob, EstadoEjecucion
+
+# Cada cuántos segundos se revisa si hay jobs vencidos
+INTERVALO_REVISION_SEGUNDOS = int(os.getenv("OIKOS_PLANIFICADOR_INTERVALO", "30"))
+# Tiempo tras el cual un bloqueo se considera abandonado (worker caído a mitad de un job)
+DURACION_BLOQUEO = timedelta(minutes=30)
+# Espera antes de reintentar un job que terminó con error
+REINTENTO_TRAS_ERROR = timedelta(minutes=15)
+# Identificador de este proceso en la tabla de bloqueos
+PROPIETARIO = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Job:
+    """
+    Un job programado. Si dia_mes es None corre todos los días a hora:minuto;
+    si no, corre una vez por mes en ese día.
+    """
+
+    def __init__(self, nombre, funcion, hora, minuto, dia_mes=None):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.hora = hora
+        self.minuto = minuto
+        self.dia_mes = dia_mes
+        self.en_curso = False
+        self.ultima_ok = None  # inicio de la última corrida exitosa conocida
+        self.ultimo_error = None  # momento del último fallo, para espaciar los reintentos
+
+    @property
+    def programacion(self):
+        if self.dia_mes is None:
+            return f"Diario {self.hora:02d}:{self.minuto:02d}"
+        return f"Mensual día {self.dia_mes} {self.hora:02d}:{self.minuto:02d}"
+
+    def ultima_programada(self, ahora: datetime) -> datetime:
+        """
+        Último horario programado menor o igual a 'ahora'.
+        """
+        if self.dia_mes is None:
+            candidato = ahora.replace(hour=self.hora, minute=self.minuto, second=0, microsecond=0)
+            return candidato if candidato <= ahora else candidato - timedelta(days=1)
+        candidato = ahora.replace(day=self.dia_mes, hour=self.hora, minute=self.minuto, second=0, microsecond=0)
+        if candidato <= ahora:
+            return candidato
+        mes_anterior = ahora.replace(day=1) - timedelta(days=1)
+        return candidato.replace(year=mes_anterior.year, month=mes_anterior.month)
+
+    def proxima_programada(self, ahora: datetime) -> datetime:
+        """
+        Próximo horario programado estrictamente posterior a 'ahora'.
+        """
+        if self.dia_mes is None:
+            return self.ultima_programada(ahora) + timedelta(days=1)
+        ultima = self.ultima_programada(ahora)
+        siguiente_mes = ultima.replace(day=28) + timedelta(days=4)
+        return ultima.replace(year=siguiente_mes.year, month=siguiente_mes.month)
+
+    def esta_vencido(self, ahora: datetime) -> bool:
+        """
+        True si no hubo una corrida exitosa desde el último horario programado.
+        Al arrancar el servidor esto recupera las corridas perdidas mientras estuvo apagado.
+        """
+        return self.ultima_ok is None or self.ultima_ok < self.ultima_programada(ahora)
+
+
+# Cada job recibe la sesión y la Corrida, donde deja filas afectadas, revisadas y omitidas
+
+def generar_cuotas(db: Session, corrida, periodo: str = None, hasta: str = None):
+    """
+    Job de cuotas (también lo usa POST /pagos/generar-cuotas con su periodo/rango).
+    Las cuotas sin IPC cargado quedan como omitidas, con los periodos que faltan en la advertencia;
+    se generan en una corrida posterior. Devuelve (generados, existentes, sin_ipc).
+    """
+    from automation_pagos import generar_cuotas_mensuales
+    sin_ipc = {}
+    generados, existentes = generar_cuotas_mensuales(db, periodo, hasta, sin_ipc=sin_ipc)
+    corrida.afectadas = generados
+    corrida.revisadas = generados + existentes + sin_ipc["cuotas"]
+    if sin_ipc["cuotas"]:
+        corrida.omitidas = sin_ipc["cuotas"]
+        corrida.advertencia = (
+            f"{sin_ipc['cuotas']} cuotas sin generar por falta de IPC de: {', '.join(sin_ipc['ipc_faltante'])}"
+        )
+    return generados, existentes, sin_ipc
+
+
+def calcular_mora(db: Session, corrida):
+    from motor_intereses import calcular_mora_pagos
+    from models import Pago, EstadoPago
+    corrida.revisadas = db.execute(
+        select(func.count()).select_from(Pago).where(Pago.estado == EstadoPago.PENDIENTE)
+    ).scalar()
+    corrida.afectadas = calcular_mora_pagos(db)
+    return corrida.afectadas
+
+
+JOBS = {
+    job.nombre: job
+    for job in [
+        Job("generar_cuotas_mensuales", generar_cuotas, hora=0, minuto=1, dia_mes=1),
+        Job("calcular_mora_pagos", calcular_mora, hora=0, minuto=5),
+    ]
+}
+
+
+def _ultima_ejecucion(db: Session, nombre: str, solo_ok: bool = False):
+    consulta = select(EjecucionJob).where(EjecucionJob.nombre == nombre)
+    if solo_ok:
+        consulta = consulta.where(EjecucionJob.estado == EstadoEjecucion.OK)
+    return db.execute(consulta.order_by(EjecucionJob.id.desc()).limit(1)).scalar()
+
+
+def _tomar_bloqueo(db: Session, nombre: str) -> bool:
+    """
+    Intenta tomar el bloqueo del job. Funciona entre procesos porque vive en la base de datos:
+    primero reclama un bloqueo vencido y, si no existe, lo inserta (la PK evita duplicados).
+    """
+    ahora = datetime.now()
+    reclamado = db.execute(
+        update(BloqueoJob)
+        .where(BloqueoJob.nombre == nombre, BloqueoJob.expira < ahora)
+        .values(propietario=PROPIETARIO, expira=ahora + DURACION_BLOQUEO)
+    )
+    if reclamado.rowcount:
+        db.commit()
+        return True
+    try:
+        db.add(BloqueoJob(nombre=nombre, propietario=PROPIETARIO, expira=ahora + DURACION_BLOQUEO))
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+        return False
+
+
+def _liberar_bloqueo(db: Session, nombre: str):
+    db.execute(delete(BloqueoJob).where(BloqueoJob.nombre == nombre, BloqueoJob.propietario == PROPIETARIO))
+    db.commit()
+
+
+class Corrida:
+    """
+    Resultado de una corrida que se completa dentro de medir_corrida().
+    """
+
+    def __init__(self):
+        self.afectadas = None
+        self.revisadas = None
+        self.omitidas = None
+        self.advertencia = None
+        self.duracion = None
+
+
+@contextlib.contextmanager
+def medir_corrida(nombre: str):
+    """
+    Perfil y métricas de una corrida de job, tanto programada (ejecutar_job) como forzada desde
+    la API. El bloque carga afectadas/revisadas/omitidas en la Corrida; si lanza una excepción se registra
+    como error y la excepción sigue su curso.
+    """
+    corrida = Corrida()
+    estado = EstadoEjecucion.ERROR
+    t0 = time.perf_counter()
+    try:
+        with perfilador.perfilar(f"job {nombre}"):
+            yield corrida
+        estado = EstadoEjecucion.OK
+    finally:
+        corrida.duracion = time.perf_counter() - t0
+        metricas.registrar_job(nombre, estado.value, corrida.duracion, corrida.afectadas, corrida.revisadas,
+                               corrida.omitidas)
+
+
+def ejecutar_job(job: Job, forzar: bool = False):
+    """
+    Ejecuta un job (de forma sincrónica) registrando la corrida en ejecuciones_jobs.
+    Devuelve la EjecucionJob registrada, o None si otro worker lo tenía tomado o ya lo había corrido.
+    """
+    db = SessionLocal()
+    try:
+        if not _tomar_bloqueo(db, job.nombre):
+            return None
+        try:
+            # Otro worker pudo haberlo corrido mientras esperábamos el bloqueo
+            ultima = _ultima_ejecucion(db, job.nombre, solo_ok=True)
+            job.ultima_ok = ultima.inicio if ultima else None
+            if not forzar and not job.esta_vencido(datetime.now()):
+                return None
+
+            job.en_curso = True
+            ejecucion = EjecucionJob(nombre=job.nombre, propietario=PROPIETARIO, inicio=datetime.now(), estado=EstadoEjecucion.EN_CURSO)
+            db.add(ejecucion)
+            db.commit()
+
+            corrida = None
+            try:
+                with medir_corrida(job.nombre) as corrida:
+                    job.funcion(db, corrida)
+                ejecucion.filas_afectadas = corrida.afectadas
+                ejecucion.filas_omitidas = corrida.omitidas
+                ejecucion.advertencia = corrida.advertencia
+                ejecucion.estado = EstadoEjecucion.OK
+                if corrida.advertencia:
+                    print(f"⚠️ Job '{job.nombre}': {corrida.advertencia}")
+            except Exception as e:
+                db.rollback()
+                ejecucion.estado = EstadoEjecucion.ERROR
+                ejecucion.error = str(e)
+                print(f"⚠️ Error en job '{job.nombre}': {e}")
+            ejecucion.fin = datetime.now()
+            ejecucion.duracion_ms = int(corrida.duracion * 1000)
+            db.commit()
+
+            if ejecucion.estado == EstadoEjecucion.OK:
+                job.ultima_ok = ejecucion.inicio
+            else:
+                job.ultimo_error = ejecucion.fin
+            db.refresh(ejecucion)
+            db.expunge(ejecucion)
+            return ejecucion
+        finally:
+            job.en_curso = False
+            _liberar_bloqueo(db, job.nombre)
+    finally:
+        db.close()
+
+
+async def _bucle():
+    while True:
+        ahora = datetime.now()
+        for job in JOBS.values():
+            reintento_pendiente = job.ultimo_error and ahora - job.ultimo_error < REINTENTO_TRAS_ERROR
+            if not job.en_curso and not reintento_pendiente and job.esta_vencido(ahora):
+                try:
+                    await asyncio.to_thread(ejecutar_job, job)
+                except Exception as e:
+                    print(f"⚠️ Planificador: no se pudo ejecutar '{job.nombre}': {e}")
+        await asyncio.sleep(INTERVALO_REVISION_SEGUNDOS)
+
+
+_tarea = None
+
+
+def iniciar() -> bool:
+    """
+    Arranca el bucle del planificador como tarea de fondo del event loop actual.
+    Se puede desactivar con OIKOS_PLANIFICADOR=0 (por ejemplo, en benchmarks o scripts).
+    Devuelve True si el planificador quedó corriendo.
+    """
+    global _tarea
+    if os.getenv("OIKOS_PLANIFICADOR", "1") == "0":
+        return False
+    if _tarea is None:
+        _tarea = asyncio.get_running_loop().create_task(_bucle())
+    return True
+
+
+async def detener():
+    global _tarea
+    if _tarea is None:
+        return
+    _tarea.cancel()
+    try:
+        await _tarea
+    except asyncio.CancelledError:
+        pass
+    _tarea = None
+
+
+def estado_jobs(db: Session):
+    """
+    Estado de cada job: programación, próxima corrida y la última ejecución registrada.
+    """
+    ahora = datetime.now()
+    resultado = []
+    for job in JOBS.values():
+        resultado.append({
+            "nombre": job.nombre,
+            "programacion": job.programacion,
+            "proxima_ejecucion": job.proxima_programada(ahora),
+            "en_curso": job.en_curso,
+            "ultima_ejecucion": _ultima_ejecucion(db, job.nombre),
+        })
+    return resultado
@@ -0,0 +1,191 @@
+"""
+Pronóstico de cobranza mes a mes sobre la cartera de contratos activos.
+
+Para cada contrato activo y cada mes del horizonte:
+- alquiler: el monto ajustado (indexacion.py) mientras el contrato está vigente. Los meses
+  todavía sin IPC cargado se proyectan sin variación (proyectar=True).
+- renovaciones: al vencer el contrato se asume una vacancia de meses_vacancia meses y luego
+  un nuevo alquiler por el último monto. Un departamento en REFACCION no se vuelve a alquilar.
+- mora_esperada: alquiler x ratio histórico de mora del contrato (monto_mora / monto_alquiler
+  de sus pagos); sin historial se usa el ratio de toda la cartera.
+
+Los resultados se agregan por departamento y por propietario. La proyección de cada contrato se
+cachea junto con una firma de sus datos (contrato, estado del departamento, serie IPC, ratio de
+mora y parámetros): en cada corrida solo se vuelven a proyectar los contratos cuya firma cambió.
+"""
+import os
+import threading
+from datetime import date
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+import cache
+from automation_pagos import parsear_periodo
+from indexacion import obtener_serie, indice_mes, indice_periodo, monto_vigente
+from models import Departamento, Contrato, Pago, EstadoDepartamento, EstadoContrato
+
+MAX_MESES = 60
+
+# contrato_id -> (firma, proyección)
+_proyecciones = {}
+_lock = threading.Lock()
+
+TABLAS_MORA = ("pagos",)
+_cache_ratios = cache.CacheTTL(float(os.getenv("OIKOS_RATIOS_MORA_TTL", "300")))
+
+
+def _periodo_de_indice(indice: int) -> str:
+    year, month = divmod(indice, 12)
+    return f"{year}-{month + 1:02d}"
+
+
+def _ratios_mora(db: Session):
+    """
+    Ratio monto_mora / monto_alquiler por contrato y de toda la cartera, en una sola consulta.
+    Se cachea hasta que cambia la tabla pagos o vence el TTL.
+    """
+    resultado = _cache_ratios.obtener("ratios", TABLAS_MORA)
+    if resultado is None:
+        versiones_calculo = cache.versiones(*TABLAS_MORA)
+        resultado = _calcular_ratios_mora(db)
+        _cache_ratios.guardar("ratios", resultado, TABLAS_MORA, versiones_calculo)
+    return resultado
+
+
+def _calcular_ratios_mora(db: Session):
+    filas = db.execute(
+        select(Pago.contrato_id, func.sum(func.coalesce(Pago.monto_mora, 0)), func.sum(Pago.monto_alquiler))
+        .group_by(Pago.contrato_id)
+    ).all()
+    mora_total = sum(float(mora or 0) for _, mora, _ in filas)
+    alquiler_total = sum(float(alquiler or 0) for _, _, alquiler in filas)
+    cartera = mora_total / alquiler_total if alquiler_total else 0.0
+    ratios = {
+        contrato_id: float(mora or 0) / float(alquiler)
+        for contrato_id, mora, alquiler in filas
+        if alquiler
+    }
+    return ratios, cartera
+
+
+def _proyectar_contrato(contrato, estado_departamento, serie, periodos, meses_vacancia, ratio_mora):
+    fin = indice_mes(contrato.fecha_fin.year, contrato.fecha_fin.month)
+    inicio = indice_mes(contrato.fecha_inicio.year, contrato.fecha_inicio.month)
+    reglas = (contrato.proxima_actualizacion, contrato.porcentaje_actualizacion, contrato.meses_actualizacion)
+    se_renueva = estado_departamento != EstadoDepartamento.REFACCION
+    ultimo_monto = float(monto_vigente(serie, _periodo_de_indice(fin), contrato.monto_inicial, *reglas, proyectar=True))
+
+    alquiler, renovaciones, mora, vacante = [], [], [], []
+    for periodo in periodos:
+        mes = indice_periodo(periodo)
+        monto = renovado = 0.0
+        if inicio <= mes <= fin:
+            monto = float(monto_vigente(serie, periodo, contrato.monto_inicial, *reglas, proyectar=True))
+        elif mes > fin + meses_vacancia and se_renueva:
+            renovado = ultimo_monto
+        alquiler.append(monto)
+        renovaciones.append(renovado)
+        mora.append(round((monto + renovado) * ratio_mora, 2))
+        vacante.append(mes > fin and not renovado)
+    return {"alquiler": alquiler, "renovaciones": renovaciones, "mora_esperada": mora, "vacante": vacante}
+
+
+def _sumar(destino, origen):
+    for i, valor in enumerate(origen):
+        destino[i] += valor
+
+
+def pronosticar(db: Session, desde: str = None, meses: int = 12, meses_vacancia: int = 2):
+    """
+    Devuelve la cobranza esperada mes a mes: totales de la cartera, por departamento y por propietario.
+    Lanza ValueError si los parámetros no son válidos.
+    """
+    if not 1 <= meses <= MAX_MESES:
+        raise ValueError(f"El horizonte debe estar entre 1 y {MAX_MESES} meses")
+    if meses_vacancia < 0:
+        raise ValueError("meses_vacancia no puede ser negativo")
+    if not desde:
+        hoy = date.today()
+        desde = f"{hoy.year}-{hoy.month:02d}"
+    mes_inicial = indice_mes(*parsear_periodo(desde))
+    periodos = [_periodo_de_indice(mes_inicial + i) for i in range(meses)]
+
+    serie = obtener_serie(db)
+    firma_serie = (serie.inicio, hash(tuple(serie.factores)))
+    ratios, ratio_cartera = _ratios_mora(db)
+    departamentos = db.execute(
+        select(Departamento.id, Departamento.alias, Departamento.propietario_nombre, Departamento.estado)
+        .order_by(Departamento.id)
+    ).all()
+    estados = {d.id: d.estado for d in departamentos}
+    contratos = db.execute(
+        select(
+            Contrato.id, Contrato.departamento_id, Contrato.monto_inicial, Contrato.fecha_inicio, Contrato.fecha_fin,
+            Contrato.proxima_actualizacion, Contrato.porcentaje_actualizacion, Contrato.meses_actualizacion,
+        ).where(Contrato.estado == EstadoContrato.ACTIVO)
+    ).all()
+
+    # 1. Proyección por contrato (solo se recalculan los que cambiaron)
+    proyecciones, recalculados = {}, 0
+    for contrato in contratos:
+        ratio = round(ratios.get(contrato.id, ratio_cartera), 6)
+        firma = (tuple(contrato), estados.get(contrato.departamento_id), firma_serie, ratio,
+                 mes_inicial, meses, meses_vacancia)
+        with _lock:
+            guardado = _proyecciones.get(contrato.id)
+        if guardado and guardado[0] == firma:
+            proyeccion = guardado[1]
+        else:
+            proyeccion = _proyectar_contrato(contrato, estados.get(contrato.departamento_id), serie,
+                                             periodos, meses_vacancia, ratio)
+            recalculados += 1
+            with _lock:
+                _proyecciones[contrato.id] = (firma, proyeccion)
+        proyecciones[contrato.departamento_id] = proyeccion
+
+    with _lock:
+        for contrato_id in set(_proyecciones) - {c.id for c in contratos}:
+            del _proyecciones[contrato_id]
+
+    # 2. Agregados por departamento, propietario y cartera
+    totales = {clave: [0.0] * meses for clave in ("alquiler", "renovaciones", "mora_esperada", "total")}
+    por_departamento, por_propietario = [], {}
+    for d in departamentos:
+        proyeccion = proyecciones.get(d.id)
+        if proyeccion:
+            for clave in ("alquiler", "renovaciones", "mora_esperada"):
+                _sumar(totales[clave], proyeccion[clave])
+            mensual = [a + r + m for a, r, m in zip(proyeccion["alquiler"], proyeccion["renovaciones"], proyeccion["mora_esperada"])]
+            meses_vacantes = sum(proyeccion["vacante"])
+        else:
+            mensual = [0.0] * meses
+            meses_vacantes = meses
+        mensual = [round(v, 2) for v in mensual]
+        por_departamento.append({
+            "departamento_id": d.id,
+            "alias": d.alias,
+            "propietario_nombre": d.propietario_nombre,
+            "estado": d.estado,
+            "mensual": mensual,
+            "total": round(sum(mensual), 2),
+            "meses_vacantes": meses_vacantes,
+        })
+        _sumar(por_propietario.setdefault(d.propietario_nombre or "Sin propietario", [0.0] * meses), mensual)
+
+    for i in range(meses):
+        totales["total"][i] = totales["alquiler"][i] + totales["renovaciones"][i] + totales["mora_esperada"][i]
+    totales = {clave: [round(v, 2) for v in valores] for clave, valores in totales.items()}
+
+    return {
+        "periodos": periodos,
+        "totales": totales,
+        "total_periodo": round(sum(totales["total"]), 2),
+        "por_departamento": por_departamento,
+        "por_propietario": [
+            {"propietario_nombre": nombre, "mensual": [round(v, 2) for v in mensual], "total": round(sum(mensual), 2)}
+            for nombre, mensual in sorted(por_propietario.items())
+        ],
+        "contratos_recalculados": recalculados,
+        "contratos_en_cache": len(contratos) - recalculados,
+    }
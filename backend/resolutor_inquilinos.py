@@ -0,0 +1,148 @@
+"""
+Resolución de nombres de inquilinos ("HUGO", "Eze", "Rocio/verificar") contra la tabla de inquilinos.
+
+El índice se arma una vez; cada búsqueda son unos pocos accesos a diccionarios (sin recorrer los inquilinos):
+- nombres normalizados: sin acentos, en minúsculas y con la puntuación como separador;
+- DNI (solo dígitos), si se conoce;
+- índice invertido token -> inquilinos, para nombres con las palabras en otro orden o incompletos;
+- trie de prefijos de cada token, para abreviaturas ("eze" -> "Ezequiel").
+
+Los criterios se prueban en ese orden y gana el primero que encuentra algo. Si encuentra más de
+un inquilino la resolución es ambigua: se informan los candidatos en lugar de elegir uno.
+"""
+import re
+import unicodedata
+
+MIN_PREFIJO = 3  # prefijos más cortos matchean demasiado como para servir
+
+_SEPARADORES = re.compile(r"[^0-9a-z]+")
+
+
+def normalizar(texto) -> str:
+    if texto is None:
+        return ""
+    sin_acentos = "".join(
+        c for c in unicodedata.normalize("NFKD", str(texto)) if not unicodedata.combining(c)
+    )
+    return " ".join(_SEPARADORES.split(sin_acentos.casefold())).strip()
+
+
+def normalizar_dni(dni) -> str:
+    return "".join(c for c in str(dni or "") if c.isdigit())
+
+
+class Resolucion:
+    """
+    Resultado de una búsqueda. inquilino_id es None si no hubo coincidencias o si fue ambigua;
+    candidatos tiene todos los ids que coincidieron con el criterio ganador.
+    """
+
+    def __init__(self, candidatos=(), criterio=None):
+        self.candidatos = sorted(candidatos)
+        self.criterio = criterio
+        self.inquilino_id = self.candidatos[0] if len(self.candidatos) == 1 else None
+
+    @property
+    def ambigua(self) -> bool:
+        return len(self.candidatos) > 1
+
+    def __repr__(self):
+        return f"Resolucion(inquilino_id={self.inquilino_id}, candidatos={self.candidatos}, criterio={self.criterio!r})"
+
+
+class ResolutorInquilinos:
+    def __init__(self):
+        self.nombres = {}  # id -> nombre original
+        self._por_nombre = {}  # nombre normalizado -> {ids}
+        self._por_dni = {}  # dni -> {ids}
+        self._por_token = {}  # token -> {ids}
+        # carácter -> nodo; cada nodo guarda en "$" los ids bajo ese prefijo. Se arma recién
+        # cuando hace falta (la mayoría de los nombres resuelven por nombre o tokens).
+        self._trie = None
+
+    @classmethod
+    def desde_filas(cls, filas):
+        """
+        Arma el índice a partir de filas (id, nombre_apellido, dni): un resultado de SQLAlchemy o un cursor de sqlite3.
+        """
+        resolutor = cls()
+        for inquilino_id, nombre, dni in filas:
+            resolutor.agregar(inquilino_id, nombre, dni)
+        return resolutor
+
+    def agregar(self, inquilino_id: int, nombre: str, dni=None):
+        self.nombres[inquilino_id] = nombre
+        normalizado = normalizar(nombre)
+        self._por_nombre.setdefault(normalizado, set()).add(inquilino_id)
+        if normalizar_dni(dni):
+            self._por_dni.setdefault(normalizar_dni(dni), set()).add(inquilino_id)
+        for token in set(normalizado.split()):
+            self._por_token.setdefault(token, set()).add(inquilino_id)
+            if self._trie is not None:
+                self._agregar_al_trie(token, {inquilino_id})
+
+    def _agregar_al_trie(self, token: str, ids):
+        nodo = self._trie
+        for profundidad, caracter in enumerate(token, start=1):
+            nodo = nodo.setdefault(caracter, {})
+            if profundidad >= MIN_PREFIJO:
+                nodo.setdefault("$", set()).update(ids)
+
+    def _por_prefijo(self, prefijo: str):
+        if len(prefijo) < MIN_PREFIJO:
+            return set()
+        if self._trie is None:
+            self._trie = {}
+            for token, ids in self._por_token.items():
+                self._agregar_al_trie(token, ids)
+        nodo = self._trie
+        for caracter in prefijo:
+            nodo = nodo.get(caracter)
+            if nodo is None:
+                return set()
+        return nodo.get("$", set())
+
+    @staticmethod
+    def _interseccion(conjuntos):
+        conjuntos = sorted(conjuntos, key=len)
+        if not conjuntos or not conjuntos[0]:
+            return set()
+        resultado = set(conjuntos[0])
+        for conjunto in conjuntos[1:]:
+            resultado &= conjunto
+            if not resultado:
+                break
+        return resultado
+
+    def resolver(self, nombre, dni=None) -> Resolucion:
+        """
+        Busca por DNI, nombre exacto, tokens (todas las palabras del nombre) y prefijos de tokens.
+        """
+        if normalizar_dni(dni) and normalizar_dni(dni) in self._por_dni:
+            return Resolucion(self._por_dni[normalizar_dni(dni)], "dni")
+
+        normalizado = normalizar(nombre)
+        if not normalizado:
+            return Resolucion()
+        if normalizado in self._por_nombre:
+            return Resolucion(self._por_nombre[normalizado], "nombre")
+
+        tokens = set(normalizado.split())
+        candidatos = self._interseccion([self._por_token.get(t, set()) for t in tokens])
+        if candidatos:
+            return Resolucion(candidatos, "tokens")
+
+        candidatos = self._interseccion([self._por_prefijo(t) for t in tokens])
+        if candidatos:
+            return Resolucion(candidatos, "prefijo")
+
+        # Nombres con anotaciones ("Rocio/verificar"): alcanza con que la primera palabra resuelva sola
+        primero = normalizado.split()[0]
+        if len(tokens) > 1:
+            candidatos = self._por_token.get(primero) or self._por_prefijo(primero)
+            if candidatos:
+                return Resolucion(candidatos, "primer_token")
+        return Resolucion()
+
+    def describir(self, resolucion: Resolucion) -> str:
+        return ", ".join(f"{self.nombres[i]} (id {i})" for i in resolucion.candidatos)
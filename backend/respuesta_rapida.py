@@ -0,0 +1,80 @@
+"""
+Camino rápido de serialización para listados grandes (GET /pagos, GET /contratos).
+
+El camino normal de FastAPI valida cada objeto del ORM con Pydantic (from_attributes), lo
+vuelve a validar contra el response_model, lo pasa por jsonable_encoder y recién ahí por json.
+Para filas que salen de nuestra propia base eso es trabajo repetido: acá se arman dicts
+directamente con los campos del schema de respuesta y se serializan con orjson, que maneja
+fechas y enums de forma nativa. Si orjson no está instalado se usa json de la biblioteca estándar.
+
+Cada ruta lo activa por separado con su propia dependencia CaminoRapido y, si está activo,
+devuelve responder(...) en lugar de los objetos; el response_model de la ruta se mantiene para
+la documentación. Para volver al camino normal en una ruta basta con CaminoRapido(False) o con
+app.dependency_overrides sobre la instancia de esa ruta, sin tocar las demás.
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson está en requirements.txt
+    orjson = None
+
+_campos_por_schema = {}
+
+
+def _por_defecto(valor):
+    # Los montos como texto ("1000.00"), igual que en el camino normal: no pierden precisión
+    if isinstance(valor, Decimal):
+        return str(valor)
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    raise TypeError(f"{type(valor).__name__} no es serializable a JSON")
+
+
+class RespuestaRapida(JSONResponse):
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_por_defecto)
+        return json.dumps(content, default=_por_defecto, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class CaminoRapido:
+    """
+    Dependencia que dice si una ruta usa el camino rápido: cada ruta declara su propia instancia
+    (rapido: bool = Depends(JSON_RAPIDO_PAGOS)), así se puede prender o apagar ruta por ruta.
+    """
+
+    def __init__(self, habilitado: bool = True):
+        self.habilitado = habilitado
+
+    def __call__(self) -> bool:
+        return self.habilitado
+
+
+def campos(schema, clase):
+    """Campos de 'schema' que existen en la clase del ORM, calculados una vez por par."""
+    clave = (schema, clase)
+    if clave not in _campos_por_schema:
+        _campos_por_schema[clave] = [nombre for nombre in schema.model_fields if hasattr(clase, nombre)]
+    return _campos_por_schema[clave]
+
+
+def a_dict(objeto, schema) -> dict:
+    """
+    Los campos de 'schema' leídos del objeto del ORM, sin validar: para filas de la propia base.
+    Los campos que el modelo no tiene quedan afuera, igual que con from_attributes y response_model_exclude_unset.
+    """
+    return {nombre: getattr(objeto, nombre) for nombre in campos(schema, type(objeto))}
+
+
+def responder(contenido, response: Response) -> RespuestaRapida:
+    """
+    RespuestaRapida con los headers que el endpoint ya puso en 'response' (X-Next-Cursor, X-Total-Count):
+    al devolver una Response propia FastAPI no los copia.
+    """
+    return RespuestaRapida(contenido, headers=dict(response.headers))
@@ -1,8 +1,8 @@
 from pydantic import BaseModel, Field, EmailStr, validator
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import date, datetime
 from decimal import Decimal
-from models import EstadoDepartamento, EstadoInquilino, EstadoContrato, EstadoPago
+from models import EstadoDepartamento, EstadoInquilino, EstadoContrato, EstadoPago, EstadoEjecucion
 
 #Nota: Mantenemos el sufijo "Response" para evitar conflictos de nombres con los modelos SQLAlchemy en main.py
 
@@ -70,6 +70,22 @@ class PagoResponse(PagoBase):
     class Config:
         from_attributes = True
 
+class PagoUpdateLote(PagoUpdate):
+    id: int
+
+class ResultadoItemLote(BaseModel):
+    indice: int = Field(..., description="Posición del ítem en el lote")
+    ok: bool
+    id: Optional[int] = None
+    codigo: Optional[str] = Field(None, description="Tipo de error (periodo_invalido, contrato_inexistente, cuota_duplicada, ...)")
+    error: Optional[str] = None
+
+class ResultadoLoteResponse(BaseModel):
+    procesados: int
+    correctos: int
+    errores: int
+    resultados: List[ResultadoItemLote]
+
 # ============================================================================
 # SCHEMAS INQUILINOS
 # ============================================================================
@@ -112,6 +128,7 @@ class ContratoBase(BaseModel):
     contrato_firmado_url: Optional[str] = None
     proxima_actualizacion: Optional[date] = None
     porcentaje_actualizacion: Optional[Decimal] = None
+    meses_actualizacion: Optional[int] = Field(6, ge=1, le=24)
     estado: EstadoContrato = EstadoContrato.ACTIVO
 
 class ContratoCreate(ContratoBase):
@@ -128,6 +145,7 @@ class ContratoUpdate(BaseModel):
     contrato_firmado_url: Optional[str] = None
     proxima_actualizacion: Optional[date] = None
     porcentaje_actualizacion: Optional[Decimal] = None
+    meses_actualizacion: Optional[int] = Field(None, ge=1, le=24)
     estado: Optional[EstadoContrato] = None
 
 class ContratoResponse(ContratoBase):
@@ -137,9 +155,162 @@ class ContratoResponse(ContratoBase):
     class Config:
         from_attributes = True
 
-class ContratoResponseDetallado(ContratoResponse):
+class ContratoConRelaciones(ContratoBase):
+    """
+    Contrato con las relaciones pedidas en include=; las no pedidas no aparecen en la respuesta.
+    """
+    id: int
+    pagos: Optional[List[PagoResponse]] = None
     departamento: Optional[DepartamentoResponse] = None
     inquilino: Optional[InquilinoResponse] = None
 
+# ============================================================================
+# SCHEMAS INDEXACIÓN (IPC)
+# ============================================================================
+class IndiceIPCBase(BaseModel):
+    periodo: str = Field(..., pattern=r"^\d{4}-(0[1-9]|1[0-2])$")
+    valor: Decimal
+
+class IndiceIPCResponse(IndiceIPCBase):
+    class Config:
+        from_attributes = True
+
+class MontoContratoResponse(BaseModel):
+    contrato_id: int
+    periodo: str
+    monto_inicial: Decimal
+    ajustes_aplicados: int
+    monto: Optional[Decimal] = None  # None si falta el IPC de algún mes del ajuste
+    ipc_incompleto: bool = False
+    ipc_faltante: List[str] = []
+
+# ============================================================================
+# SCHEMAS SIMULACIONES
+# ============================================================================
+class EscenarioSimulacion(BaseModel):
+    nombre: Optional[str] = None
+    ipc_mensual: Optional[List[float]] = None
+    porcentaje_ajuste: Optional[float] = None
+    meses_actualizacion: Optional[int] = Field(None, ge=1, le=24)
+
+class SimulacionRequest(BaseModel):
+    desde: Optional[str] = None
+    meses: int = Field(12, ge=1, le=120)
+    escenarios: List[EscenarioSimulacion]
+    contrato_ids: Optional[List[int]] = None
+    detalle_contratos: bool = True
+
+class SimulacionContrato(BaseModel):
+    contrato_id: int
+    departamento_id: Optional[int] = None
+    mensual: List[float]
+    total: float
+
+class ResultadoEscenario(BaseModel):
+    nombre: str
+    mensual: List[float]
+    total: float
+    por_contrato: Optional[List[SimulacionContrato]] = None
+
+class SimulacionResponse(BaseModel):
+    periodos: List[str]
+    escenarios: List[ResultadoEscenario]
+
+# ============================================================================
+# SCHEMAS PRONÓSTICO
+# ============================================================================
+class TotalesPronostico(BaseModel):
+    alquiler: List[float]
+    renovaciones: List[float]
+    mora_esperada: List[float]
+    total: List[float]
+
+class PronosticoDepartamento(BaseModel):
+    departamento_id: int
+    alias: str
+    propietario_nombre: Optional[str] = None
+    estado: Optional[EstadoDepartamento] = None
+    mensual: List[float]
+    total: float
+    meses_vacantes: int
+
+class PronosticoPropietario(BaseModel):
+    propietario_nombre: str
+    mensual: List[float]
+    total: float
+
+class PronosticoResponse(BaseModel):
+    periodos: List[str]
+    totales: TotalesPronostico
+    total_periodo: float
+    por_departamento: List[PronosticoDepartamento]
+    por_propietario: List[PronosticoPropietario]
+    contratos_recalculados: int
+    contratos_en_cache: int
+
+# ============================================================================
+# SCHEMAS BÚSQUEDA
+# ============================================================================
+class ResultadoBusqueda(BaseModel):
+    tipo: Literal["departamento", "inquilino", "contrato"]
+    id: int
+    titulo: str
+    detalle: Optional[str] = None
+    rango: float
+
+# ============================================================================
+# SCHEMAS JOBS
+# ============================================================================
+class EjecucionJobResponse(BaseModel):
+    id: int
+    nombre: str
+    propietario: Optional[str] = None
+    inicio: datetime
+    fin: Optional[datetime] = None
+    duracion_ms: Optional[int] = None
+    filas_afectadas: Optional[int] = None
+    filas_omitidas: Optional[int] = None
+    estado: EstadoEjecucion
+    error: Optional[str] = None
+    advertencia: Optional[str] = None
+
     class Config:
         from_attributes = True
+
+class JobEstadoResponse(BaseModel):
+    nombre: str
+    programacion: str
+    proxima_ejecucion: datetime
+    en_curso: bool
+    ultima_ejecucion: Optional[EjecucionJobResponse] = None
+
+# ============================================================================
+# SCHEMAS DASHBOARD
+# ============================================================================
+class DepartamentoDashboard(BaseModel):
+    id: int
+    alias: str
+    direccion: str
+    propietario_nombre: Optional[str] = None
+    tipo: Optional[str] = None
+    estado: Optional[EstadoDepartamento] = None
+    contrato_activo_id: Optional[int] = None
+    inquilino_nombre: Optional[str] = None
+
+class TotalesDashboard(BaseModel):
+    pagos_pendientes: int
+    monto_pendiente: Decimal
+    monto_mora: Decimal
+
+class AlertaDashboard(BaseModel):
+    id: str
+    tipo: str
+    mensaje: str
+    fecha: str
+
+class DashboardResponse(BaseModel):
+    departamentos: List[DepartamentoDashboard]
+    conteos: dict
+    totales: TotalesDashboard
+    alertas: List[AlertaDashboard]
+    generado_en: datetime
@@ -0,0 +1,165 @@
+"""
+Simulación "what-if" de ingresos por alquiler sobre toda la cartera de contratos activos.
+
+Cada escenario define cómo se ajustan los alquileres desde el mes inicial:
+- ipc_mensual: camino de IPC mensual (%) desde 'desde'; si es más corto que el horizonte se
+  repite el último valor. Los meses anteriores usan la serie cargada en indices_ipc.
+- porcentaje_ajuste: porcentaje fijo por ajuste para todos los contratos.
+- ninguno de los dos: las reglas propias de cada contrato con la serie IPC cargada.
+- meses_actualizacion (opcional): reemplaza la frecuencia de ajuste de todos los contratos.
+
+Se calcula con arreglos NumPy de forma (escenarios x contratos x meses), con las mismas reglas
+que indexacion.py: el factor IPC de k ajustes es un cociente de dos productos acumulados.
+"""
+from datetime import date
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from automation_pagos import parsear_periodo
+from indexacion import obtener_serie, indice_mes, MESES_ACTUALIZACION_DEFAULT
+from models import Contrato, EstadoContrato
+
+MAX_MESES = 120
+MAX_ESCENARIOS = 100
+
+
+def _periodo_de_indice(indice: int) -> str:
+    year, month = divmod(indice, 12)
+    return f"{year}-{month + 1:02d}"
+
+
+def _contratos_activos(db: Session, contrato_ids=None):
+    query = select(
+        Contrato.id, Contrato.departamento_id, Contrato.monto_inicial, Contrato.fecha_inicio, Contrato.fecha_fin,
+        Contrato.proxima_actualizacion, Contrato.porcentaje_actualizacion, Contrato.meses_actualizacion,
+    ).where(Contrato.estado == EstadoContrato.ACTIVO).order_by(Contrato.id)
+    if contrato_ids:
+        query = query.where(Contrato.id.in_(contrato_ids))
+    return db.execute(query).all()
+
+
+def simular(db: Session, escenarios, desde: str = None, meses: int = 12, contrato_ids=None, detalle_contratos: bool = True):
+    """
+    Proyecta el ingreso mensual por contrato y por cartera para cada escenario.
+    escenarios: lista de dicts con nombre, ipc_mensual, porcentaje_ajuste, meses_actualizacion.
+    Lanza ValueError si los parámetros no son válidos.
+    """
+    if not 1 <= meses <= MAX_MESES:
+        raise ValueError(f"El horizonte debe estar entre 1 y {MAX_MESES} meses")
+    if not 1 <= len(escenarios) <= MAX_ESCENARIOS:
+        raise ValueError(f"Se admiten entre 1 y {MAX_ESCENARIOS} escenarios")
+    for escenario in escenarios:
+        if escenario.get("ipc_mensual") is not None and escenario.get("porcentaje_ajuste") is not None:
+            raise ValueError(f"Escenario '{escenario.get('nombre')}': usar ipc_mensual o porcentaje_ajuste, no ambos")
+        if escenario.get("ipc_mensual") == []:
+            raise ValueError(f"Escenario '{escenario.get('nombre')}': ipc_mensual está vacío")
+
+    if not desde:
+        hoy = date.today()
+        desde = f"{hoy.year}-{hoy.month:02d}"
+    mes_inicial = indice_mes(*parsear_periodo(desde))
+    periodos = [_periodo_de_indice(mes_inicial + i) for i in range(meses)]
+
+    contratos = _contratos_activos(db, contrato_ids)
+    nombres = [e.get("nombre") or f"Escenario {i + 1}" for i, e in enumerate(escenarios)]
+    if not contratos:
+        return {
+            "periodos": periodos,
+            "escenarios": [
+                {"nombre": n, "mensual": [0.0] * meses, "total": 0.0, **({"por_contrato": []} if detalle_contratos else {})}
+                for n in nombres
+            ],
+        }
+
+    S, C, M = len(escenarios), len(contratos), meses
+    mes = mes_inicial + np.arange(M)                                                    # (M,)
+
+    # --- Datos de contratos (C,) ---
+    monto = np.array([float(c.monto_inicial) for c in contratos])
+    inicio = np.array([indice_mes(c.fecha_inicio.year, c.fecha_inicio.month) for c in contratos])
+    fin = np.array([indice_mes(c.fecha_fin.year, c.fecha_fin.month) for c in contratos])
+    tiene_ajuste = np.array([c.proxima_actualizacion is not None for c in contratos])
+    primer_ajuste = np.array([
+        indice_mes(c.proxima_actualizacion.year, c.proxima_actualizacion.month) if c.proxima_actualizacion else 0
+        for c in contratos
+    ])
+    frecuencia_propia = np.array([c.meses_actualizacion or MESES_ACTUALIZACION_DEFAULT for c in contratos])
+    tiene_porcentaje = np.array([c.porcentaje_actualizacion is not None for c in contratos])
+    porcentaje_propio = np.array([float(c.porcentaje_actualizacion or 0) for c in contratos])
+
+    # --- Parámetros por escenario y contrato (S, C) ---
+    frecuencia = np.empty((S, C), dtype=np.int64)
+    usa_porcentaje = np.empty((S, C), dtype=bool)
+    porcentaje = np.empty((S, C))
+    for s, escenario in enumerate(escenarios):
+        frecuencia[s] = escenario.get("meses_actualizacion") or frecuencia_propia
+        if escenario.get("porcentaje_ajuste") is not None:
+            usa_porcentaje[s] = True
+            porcentaje[s] = float(escenario["porcentaje_ajuste"])
+        elif escenario.get("ipc_mensual") is not None:
+            usa_porcentaje[s] = False
+            porcentaje[s] = 0.0
+        else:
+            usa_porcentaje[s] = tiene_porcentaje
+            porcentaje[s] = porcentaje_propio
+
+    # --- Ajustes aplicados en cada mes (S, C, M) ---
+    desfase = mes[None, None, :] - primer_ajuste[None, :, None]
+    ajustes = np.where(
+        (desfase >= 0) & tiene_ajuste[None, :, None],
+        desfase // frecuencia[:, :, None] + 1,
+        0,
+    )
+
+    # --- Serie IPC por escenario como productos acumulados (S, L+1) ---
+    serie = obtener_serie(db)
+    anclas = (primer_ajuste[None, :] - frecuencia)[:, tiene_ajuste]
+    base = int(min(
+        serie.inicio if serie.factores else mes_inicial,
+        mes_inicial,
+        anclas.min() if anclas.size else mes_inicial,
+    ))
+    largo = mes_inicial + M - base
+    factores = np.ones((S, largo))
+    desde_pos = serie.inicio - base
+    if serie.factores and desde_pos < largo:
+        hasta_pos = min(desde_pos + len(serie.factores), largo)
+        factores[:, desde_pos:hasta_pos] = serie.factores[:hasta_pos - desde_pos]
+    for s, escenario in enumerate(escenarios):
+        camino = escenario.get("ipc_mensual")
+        if camino is not None:
+            camino = np.asarray(camino, dtype=float)[:M]
+            camino = np.concatenate([camino, np.full(M - len(camino), camino[-1])])
+            factores[s, mes_inicial - base:] = 1 + camino / 100
+    prefijo = np.concatenate([np.ones((S, 1)), np.cumprod(factores, axis=1)], axis=1)
+
+    def acumulado_hasta(indices):
+        return np.take_along_axis(prefijo, np.clip(indices - base, 0, largo).reshape(S, -1), axis=1).reshape(indices.shape)
+
+    ultimo_ajuste = primer_ajuste[None, :, None] + (np.maximum(ajustes, 1) - 1) * frecuencia[:, :, None]
+    ancla = np.broadcast_to((primer_ajuste[None, :] - frecuencia)[:, :, None], ajustes.shape)
+    factor_ipc = acumulado_hasta(ultimo_ajuste) / acumulado_hasta(ancla)
+    factor_porcentaje = (1 + porcentaje[:, :, None] / 100) ** ajustes
+    factor = np.where(ajustes == 0, 1.0, np.where(usa_porcentaje[:, :, None], factor_porcentaje, factor_ipc))
+
+    # --- Ingresos: solo los meses dentro de la vigencia de cada contrato ---
+    vigente = (mes[None, :] >= inicio[:, None]) & (mes[None, :] <= fin[:, None])        # (C, M)
+    ingresos = np.round(monto[None, :, None] * factor, 2) * vigente[None, :, :]         # (S, C, M)
+
+    mensual = ingresos.sum(axis=1).round(2)                                               # (S, M)
+    total_contrato = ingresos.sum(axis=2).round(2)                                        # (S, C)
+
+    resultado = {"periodos": periodos, "escenarios": []}
+    for s, nombre in enumerate(nombres):
+        escenario = {"nombre": nombre, "mensual": mensual[s].tolist(), "total": round(float(mensual[s].sum()), 2)}
+        if detalle_contratos:
+            filas = ingresos[s].tolist()
+            totales = total_contrato[s].tolist()
+            escenario["por_contrato"] = [
+                {"contrato_id": c.id, "departamento_id": c.departamento_id, "mensual": filas[i], "total": totales[i]}
+                for i, c in enumerate(contratos)
+            ]
+        resultado["escenarios"].append(escenario)
+    return resultado
@@ -0,0 +1,13 @@
+"""
+Los módulos del backend crean el engine al importarse: la base temporal y el planificador
+apagado se fijan antes de que cualquier test importe main.
+"""
+import os
+import sys
+import tempfile
+
+DIRECTORIO_BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_BACKEND)
+
+os.environ["OIKOS_DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='oikos_tests_')}/tests.db"
+os.environ["OIKOS_PLANIFICADOR"] = "0"
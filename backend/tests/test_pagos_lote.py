@@ -0,0 +1,209 @@
+"""
+POST/PATCH /pagos/batch y PUT /pagos/{id}: validaciones por ítem de crear_pagos y actualizar_pagos.
+"""
+import itertools
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from database import SessionLocal
+from models import Contrato, Departamento, EstadoPago, Inquilino, Pago
+
+_numeros = itertools.count(1)
+
+
+@pytest.fixture(scope="module")
+def cliente():
+    # Como context manager el cliente corre el startup de la app (migraciones)
+    with TestClient(main.app) as cliente:
+        yield cliente
+
+
+@pytest.fixture
+def contrato(cliente):
+    n = next(_numeros)
+    with SessionLocal() as db:
+        departamento = Departamento(alias=f"Test {n}", direccion=f"Calle {n}", tipo="departamento")
+        inquilino = Inquilino(nombre_apellido=f"Inquilino {n}")
+        db.add_all([departamento, inquilino])
+        db.flush()
+        contrato = Contrato(
+            departamento_id=departamento.id, inquilino_id=inquilino.id, monto_inicial=100000,
+            fecha_inicio=date(2024, 1, 1), fecha_fin=date(2025, 12, 31),
+        )
+        db.add(contrato)
+        db.commit()
+        return contrato.id
+
+
+def _cargar(cliente, contrato_id, *periodos):
+    respuesta = cliente.post("/pagos/batch", json=[
+        {"contrato_id": contrato_id, "periodo": periodo, "monto_alquiler": "100000"} for periodo in periodos
+    ])
+    assert respuesta.status_code == 200, respuesta.text
+    return [r["id"] for r in respuesta.json()["resultados"]]
+
+
+def _pago(pago_id):
+    with SessionLocal() as db:
+        return db.get(Pago, pago_id)
+
+
+# ============================================================================
+# POST /pagos/batch
+# ============================================================================
+
+def _crear(cliente, items):
+    respuesta = cliente.post("/pagos/batch", json=items)
+    assert respuesta.status_code == 200, respuesta.text
+    return respuesta.json()
+
+
+def _cuota(contrato_id, periodo):
+    return {"contrato_id": contrato_id, "periodo": periodo, "monto_alquiler": "100000"}
+
+
+def test_alta_devuelve_ids_en_el_orden_del_lote(cliente, contrato):
+    periodos = ["2025-03", "2025-01", "2025-02"]
+
+    cuerpo = _crear(cliente, [_cuota(contrato, periodo) for periodo in periodos])
+
+    assert (cuerpo["procesados"], cuerpo["correctos"], cuerpo["errores"]) == (3, 3, 0)
+    assert [r["indice"] for r in cuerpo["resultados"]] == [0, 1, 2]
+    assert [_pago(r["id"]).periodo for r in cuerpo["resultados"]] == periodos
+
+
+def test_alta_con_periodo_mal_formado(cliente, contrato):
+    cuerpo = _crear(cliente, [_cuota(contrato, "2025-13"), _cuota(contrato, "2025-4")])
+
+    malo, bueno = cuerpo["resultados"]
+    assert (malo["ok"], malo["codigo"], malo["id"]) == (False, "periodo_invalido", None)
+    assert "Periodo inválido '2025-13'" in malo["error"]
+    # Los periodos sin cero a la izquierda se normalizan
+    assert bueno["ok"] and _pago(bueno["id"]).periodo == "2025-04"
+
+
+def test_alta_con_contrato_inexistente(cliente, contrato):
+    cuerpo = _crear(cliente, [_cuota(999_999, "2025-05"), _cuota(contrato, "2025-05")])
+
+    inexistente, valido = cuerpo["resultados"]
+    assert inexistente["codigo"] == "contrato_inexistente"
+    assert inexistente["error"] == "Contrato con ID 999999 no encontrado"
+    assert valido["ok"]
+
+
+def test_alta_con_cuota_repetida_en_el_lote(cliente, contrato):
+    cuerpo = _crear(cliente, [_cuota(contrato, "2025-06"), _cuota(contrato, "2025-6")])
+
+    primera, repetida = cuerpo["resultados"]
+    assert primera["ok"]
+    assert repetida["codigo"] == "cuota_duplicada"
+    assert repetida["error"] == f"Ya existe una cuota del periodo 2025-06 para el contrato {contrato}"
+
+
+def test_alta_de_cuota_ya_cargada(cliente, contrato):
+    (existente,) = _cargar(cliente, contrato, "2025-07")
+
+    cuerpo = _crear(cliente, [_cuota(contrato, "2025-07")])
+
+    assert cuerpo["correctos"] == 0
+    assert cuerpo["resultados"][0]["codigo"] == "cuota_duplicada"
+    assert _pago(existente).periodo == "2025-07"
+
+
+# ============================================================================
+# PATCH /pagos/batch y PUT /pagos/{id}
+# ============================================================================
+
+def test_null_en_campo_obligatorio_es_error_del_item(cliente, contrato):
+    pago_a, pago_b = _cargar(cliente, contrato, "2024-01", "2024-02")
+
+    respuesta = cliente.patch("/pagos/batch", json=[
+        {"id": pago_a, "monto_alquiler": None},
+        {"id": pago_b, "estado": "COBRADO", "fecha_pago": "2024-02-05"},
+    ])
+
+    assert respuesta.status_code == 200
+    cuerpo = respuesta.json()
+    assert (cuerpo["correctos"], cuerpo["errores"]) == (1, 1)
+    assert cuerpo["resultados"][0]["codigo"] == "campo_nulo"
+    assert "monto_alquiler" in cuerpo["resultados"][0]["error"]
+    assert cuerpo["resultados"][1]["ok"]
+    # El ítem válido se escribió aunque el otro fuera rechazado
+    assert _pago(pago_b).estado == EstadoPago.COBRADO
+    assert _pago(pago_a).monto_alquiler == 100000
+
+
+def test_put_con_null_responde_400(cliente, contrato):
+    (pago,) = _cargar(cliente, contrato, "2024-03")
+
+    respuesta = cliente.put(f"/pagos/{pago}", json={"estado": None})
+
+    assert respuesta.status_code == 400
+    assert "estado" in respuesta.json()["detail"]
+    assert _pago(pago).estado == EstadoPago.PENDIENTE
+
+
+def test_put_de_pago_inexistente_responde_404(cliente):
+    respuesta = cliente.put("/pagos/999999", json={"estado": "COBRADO"})
+
+    assert respuesta.status_code == 404
+    assert respuesta.json()["detail"] == "Pago con ID 999999 no encontrado"
+
+
+def test_ids_repetidos(cliente, contrato):
+    (pago,) = _cargar(cliente, contrato, "2024-04")
+
+    cuerpo = cliente.patch("/pagos/batch", json=[
+        {"id": pago, "estado": "COBRADO"},
+        {"id": pago, "estado": "PARCIAL"},
+    ]).json()
+
+    assert cuerpo["correctos"] == 0
+    assert [r["codigo"] for r in cuerpo["resultados"]] == ["pago_repetido", "pago_repetido"]
+    assert all(r["error"] == f"El pago {pago} aparece más de una vez en el lote" for r in cuerpo["resultados"])
+    assert _pago(pago).estado == EstadoPago.PENDIENTE
+
+
+def test_periodo_movido_a_cuota_existente(cliente, contrato):
+    pago_a, _ = _cargar(cliente, contrato, "2024-05", "2024-06")
+
+    cuerpo = cliente.patch("/pagos/batch", json=[{"id": pago_a, "periodo": "2024-06"}]).json()
+
+    assert cuerpo["errores"] == 1
+    assert cuerpo["resultados"][0]["codigo"] == "cuota_duplicada"
+    assert cuerpo["resultados"][0]["error"] == f"Ya existe una cuota del periodo 2024-06 para el contrato {contrato}"
+    assert _pago(pago_a).periodo == "2024-05"
+
+
+def test_dos_items_movidos_al_mismo_periodo(cliente, contrato):
+    pago_a, pago_b = _cargar(cliente, contrato, "2024-07", "2024-08")
+
+    cuerpo = cliente.patch("/pagos/batch", json=[
+        {"id": pago_a, "periodo": "2024-09"},
+        {"id": pago_b, "periodo": "2024-9"},
+    ]).json()
+
+    assert [r["ok"] for r in cuerpo["resultados"]] == [True, False]
+    assert cuerpo["resultados"][1]["codigo"] == "cuota_duplicada"
+    assert _pago(pago_a).periodo == "2024-09"
+    assert _pago(pago_b).periodo == "2024-08"
+
+
+def test_intercambio_de_periodos_no_se_permite_en_un_lote(cliente, contrato):
+    # Cada cambio se valida contra la base antes de escribir: mover a un periodo ocupado es error
+    pago_a, pago_b = _cargar(cliente, contrato, "2024-10", "2024-11")
+
+    cuerpo = cliente.patch("/pagos/batch", json=[
+        {"id": pago_a, "periodo": "2024-11"},
+        {"id": pago_b, "periodo": "2024-10"},
+    ]).json()
+
+    assert cuerpo["correctos"] == 0
+    assert [r["error"] for r in cuerpo["resultados"]] == [
+        f"Ya existe una cuota del periodo 2024-11 para el contrato {contrato}",
+        f"Ya existe una cuota del periodo 2024-10 para el contrato {contrato}",
+    ]
+    assert (_pago(pago_a).periodo, _pago(pago_b).periodo) == ("2024-10", "2024-11")
@@ -102,110 +102,11 @@ function Dashboard() {
 
   const fetchDashboardData = async () => {
     try {
-      const [resDeptos, resPagos, resContratos, resInquilinos] = await Promise.all([
-        api.get('/departamentos'),
-        api.get('/pagos'),
-        api.get('/contratos'),
-        api.get('/inquilinos')
-      ]);
+      // Un solo endpoint agregado: departamentos con inquilino activo + alertas calculadas en el backend
+      const { data } = await api.get('/dashboard');
 
-      let deptos = resDeptos.data;
-      const pagos = resPagos.data;
-      const contratos = resContratos.data;
-      const inquilinos = resInquilinos.data;
-
-      // Enriquecer departamentos con nombre del inquilino activo
-      deptos = deptos.map(d => {
-        const contratoActivo = contratos.find(c => c.departamento_id === d.id && c.estado === 'ACTIVO');
-        let inquilinoNombre = null;
-        if (contratoActivo) {
-          const inquilino = inquilinos.find(i => i.id === contratoActivo.inquilino_id);
-          if (inquilino) inquilinoNombre = inquilino.nombre_apellido;
-        }
-        return { ...d, inquilino: inquilinoNombre };
-      });
-
-      setDepartamentos(deptos);
-
-      // --- GENERACIÓN DE ALERTAS ---
-      const newAlertas = [];
-
-      // A. Pagos Pendientes (MORA)
-      pagos.forEach(p => {
-        if (p.estado === 'PENDIENTE') {
-          const contrato = contratos.find(c => c.id === p.contrato_id);
-          const depto = contrato ? deptos.find(d => d.id === contrato.departamento_id) : null;
-          const alias = depto ? depto.alias : `Contrato #${p.contrato_id}`;
-          newAlertas.push({
-            id: `pago-${p.id}`,
-            tipo: 'MORA',
-            mensaje: `Pago pendiente (${p.periodo}) - ${alias}`,
-            fecha: p.fecha_pago || 'Hoy'
-          });
-        }
-      });
-
-      // B. Contratos por vencer (Próximos 60 días)
-      const now = new Date();
-      const threshold = new Date();
-      threshold.setDate(now.getDate() + 60);
-
-      contratos.forEach(c => {
-        if (c.estado === 'ACTIVO') {
-          // Convertir fecha YYYY-MM-DD a objeto Date
-          const fin = new Date(c.fecha_fin);
-          // Ajuste de zona horaria simple
-          fin.setMinutes(fin.getMinutes() + fin.getTimezoneOffset());
-
-          if (fin > now && fin <= threshold) {
-            const depto = deptos.find(d => d.id === c.departamento_id);
-            newAlertas.push({
-              id: `contrato-${c.id}`,
-              tipo: 'VENCE',
-              mensaje: `Vence pronto - ${depto ? depto.alias : '??'}`,
-              fecha: c.fecha_fin
-            });
-          }
-        }
-      });
-
-      // C. Inconsistencia: Depto Alquilado sin Contrato Activo
-      deptos.forEach(d => {
-        if (d.estado === 'ALQUILADO') {
-          const tieneContratoActivo = contratos.some(c => c.departamento_id === d.id && c.estado === 'ACTIVO');
-          if (!tieneContratoActivo) {
-            newAlertas.push({
-              id: `inconsistencia-${d.id}`,
-              tipo: 'ERROR',
-              mensaje: `Inconsistencia: ${d.alias} figura ALQUILADO sin contrato activo`,
-              fecha: 'Revisar Ahora'
-            });
-          }
-        }
-      });
-
-      // D. Próximos Aumentos (Próximos 45 días)
-      contratos.forEach(c => {
-        if (c.estado === 'ACTIVO' && c.proxima_actualizacion) {
-          const fechaAumento = new Date(c.proxima_actualizacion);
-          fechaAumento.setMinutes(fechaAumento.getMinutes() + fechaAumento.getTimezoneOffset());
-
-          const thresholdAumento = new Date();
-          thresholdAumento.setDate(now.getDate() + 45);
-
-          if (fechaAumento > now && fechaAumento <= thresholdAumento) {
-            const depto = deptos.find(d => d.id === c.departamento_id);
-            newAlertas.push({
-              id: `aumento-${c.id}`,
-              tipo: 'INFO',
-              mensaje: `Aumento Programado: ${depto ? depto.alias : '??'} (${c.porcentaje_actualizacion || '?'}%)`,
-              fecha: c.proxima_actualizacion
-            });
-          }
-        }
-      });
-
-      setAlertas(newAlertas);
+      setDepartamentos(data.departamentos.map(d => ({ ...d, inquilino: d.inquilino_nombre })));
+      setAlertas(data.alertas);
       setLoading(false);
     } catch (error) {
       console.error("Error conectando con TORO Backend:", error);
@@ -37,7 +37,7 @@ export default function Contratos() {
         setLoading(true)
         try {
             const [resContratos, resDeptos, resInquilinos] = await Promise.all([
-                api.get('/contratos'),
+                api.get('/contratos', { params: { include: '' } }),
                 api.get('/departamentos'),
                 api.get('/inquilinos')
             ])
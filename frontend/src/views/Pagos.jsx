@@ -29,7 +29,7 @@ export default function Pagos() {
         try {
             const [resPagos, resContratos] = await Promise.all([
                 api.get('/pagos'),
-                api.get('/contratos')
+                api.get('/contratos', { params: { include: '' } })
             ])
             setPagos(resPagos.data)
             setContratos(resContratos.data)